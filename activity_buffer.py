@@ -0,0 +1,125 @@
+"""
+Buffered last_active tracking.
+
+Requests only record a touch in memory. A background thread flushes the
+buffered timestamps every ACTIVITY_FLUSH_INTERVAL seconds as one bulk
+UPDATE (a CASE on the user id) per batch of users, and pending touches are
+flushed on shutdown. last_active is therefore at most one interval behind.
+"""
+
+import atexit
+import threading
+from datetime import datetime
+from sqlalchemy import case, or_
+from models import db, User
+
+# Upper bound on how long a touch waits in memory before being written
+ACTIVITY_FLUSH_INTERVAL = 30
+
+# Flush early once this many users are waiting
+ACTIVITY_MAX_PENDING = 1000
+
+# Users per UPDATE statement
+ACTIVITY_BATCH_SIZE = 500
+
+_pending = {}  # user id -> latest activity timestamp
+_pending_lock = threading.Lock()
+_wakeup = threading.Event()
+_worker = None
+_worker_lock = threading.Lock()
+
+_stats = {'flushes': 0, 'rows_flushed': 0, 'last_flush_at': None, 'last_error': None}
+
+
+def record_activity(app, user_id, when=None):
+    """Remember that a user was active (no database access)"""
+    when = when or datetime.utcnow()
+    with _pending_lock:
+        if _pending.get(user_id) is None or _pending[user_id] < when:
+            _pending[user_id] = when
+        pending_count = len(_pending)
+
+    _ensure_worker(app)
+    if pending_count >= ACTIVITY_MAX_PENDING:
+        _wakeup.set()
+
+
+def flush_activity():
+    """Write buffered last_active timestamps; returns the number of rows updated"""
+    with _pending_lock:
+        touches = dict(_pending)
+        _pending.clear()
+    if not touches:
+        return 0
+
+    rows = 0
+    user_ids = list(touches)
+    try:
+        with db.engine.begin() as conn:
+            for batch_start in range(0, len(user_ids), ACTIVITY_BATCH_SIZE):
+                batch = {user_id: touches[user_id] for user_id in user_ids[batch_start:batch_start + ACTIVITY_BATCH_SIZE]}
+                new_value = case(batch, value=User.id)
+                result = conn.execute(
+                    User.__table__.update().where(
+                        User.id.in_(list(batch)),
+                        # Never move last_active backwards (another worker may be ahead)
+                        or_(User.last_active.is_(None), User.last_active < new_value)
+                    ).values(last_active=new_value)
+                )
+                rows += result.rowcount
+    except Exception as e:
+        # Put the touches back (newer ones recorded meanwhile win) for the next flush
+        with _pending_lock:
+            for user_id, when in touches.items():
+                if _pending.get(user_id) is None or _pending[user_id] < when:
+                    _pending[user_id] = when
+        _stats['last_error'] = str(e)
+        raise
+
+    _stats['flushes'] += 1
+    _stats['rows_flushed'] += rows
+    _stats['last_flush_at'] = datetime.utcnow()
+    _stats['last_error'] = None
+    return rows
+
+
+def get_activity_stats():
+    """Counters for monitoring the activity buffer"""
+    with _pending_lock:
+        pending = len(_pending)
+    return {
+        'pending_users': pending,
+        'flushes': _stats['flushes'],
+        'rows_flushed': _stats['rows_flushed'],
+        'last_flush_at': _stats['last_flush_at'].isoformat() if _stats['last_flush_at'] else None,
+        'last_error': _stats['last_error'],
+        'flush_interval_seconds': ACTIVITY_FLUSH_INTERVAL
+    }
+
+
+def _flush_in_context(app):
+    with app.app_context():
+        try:
+            flush_activity()
+        except Exception as e:
+            print(f"⚠️  Error flushing last_active updates: {e}")
+
+
+def _flusher_loop(app):
+    while True:
+        _wakeup.wait(ACTIVITY_FLUSH_INTERVAL)
+        _wakeup.clear()
+        _flush_in_context(app)
+
+
+def _ensure_worker(app):
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    with _worker_lock:
+        if _worker is None:
+            # Daemon threads die with the process - write what's left on shutdown
+            atexit.register(_flush_in_context, app)
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_flusher_loop, args=(app,), daemon=True)
+            _worker.start()
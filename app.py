@@ -1,17 +1,36 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory, flash, redirect, url_for
+from flask import Flask, render_template, request, jsonify, send_from_directory, send_file, flash, redirect, url_for, Response, stream_with_context
 from flask_login import LoginManager, current_user, login_required
 from flask_wtf.csrf import CSRFProtect, generate_csrf, CSRFError
-from models import db, User, DonationPurpose, OfflineDonation, MandalaSadhanaRegistration, ChatMessage
+from models import db, User, DonationPurpose, OfflineDonation, MandalaSadhanaRegistration, ChatMessage, SyncJob
 from auth import auth
 from forms import DonationPurposeForm, OfflineDonationForm, DonationSearchForm, MandalaSadhanaRegistrationForm, MandalaSadhanaSearchForm
 from google_sheets import get_sheets_manager
+from sync_jobs import start_sync_job
+from user_cache import load_principal
+from activity_buffer import record_activity, get_activity_stats
+from sheets_outbox import enqueue_donation_write, notify_outbox, start_flusher, flush_outbox
+from local_sheets import generate_synthetic_spreadsheet
+from static_assets import init_static_assets, compress_static_assets, build_asset_manifest, BROTLI_AVAILABLE
+from image_variants import init_image_variants, build_image_variants
+from asset_bundles import init_asset_bundles, build_bundles
+from profile_pictures import avatar_url
+from fragment_cache import render_public_page
+from template_cache import init_template_cache, precompile_templates
+from search_index import init_search_index, build_search_index, save_search_index, save_browser_index, search, SEARCH_RESULTS_LIMIT, MAX_SEARCH_RESULTS
+from chat_stream import (notify_chat_message, notify_chat_read, stream_messages, get_conversation_page, get_chat_users_page,
+                         get_unread_chat_count,
+                         CHAT_PAGE_SIZE, MAX_CHAT_PAGE_SIZE, CHAT_USERS_PAGE_SIZE, MAX_CHAT_USERS_PAGE_SIZE)
+from donation_summary import get_donation_overview, get_worksheet_donations_page, serialize_donation, DONATIONS_PER_WORKSHEET, MAX_DONATIONS_PAGE_SIZE
 import os
+import click
 import socket
 import qrcode
 import io
 import base64
+import hashlib
 import threading
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 try:
     from zeroconf import ServiceInfo, Zeroconf
@@ -62,6 +81,16 @@ else:
 # Network configuration
 NETWORK_PORT = int(os.getenv('PORT', 5000))
 
+# Seconds the detected network identity is reused before detecting it again
+NETWORK_INFO_TTL = 300
+
+# Number of QR code images kept in memory (one per network URL)
+QR_CACHE_SIZE = 8
+
+_network_info = None       # (info, detected_at)
+_qr_codes = OrderedDict()  # digest of the encoded URL -> PNG bytes
+_network_lock = threading.Lock()
+
 def get_local_ip():
     """Get the local IP address of the machine"""
     try:
@@ -95,32 +124,62 @@ def get_all_network_interfaces():
         print(f"⚠️  Error getting network interfaces: {e}")
         return {}
 
-def get_network_info():
-    """Get comprehensive network information"""
+def get_network_info(refresh=False):
+    """Get comprehensive network information
+    
+    Detected once and reused for NETWORK_INFO_TTL seconds (or until
+    refresh=True), so page views do no socket work.
+    """
+    global _network_info
+    with _network_lock:
+        cached = _network_info
+    if cached and not refresh and time.monotonic() - cached[1] < NETWORK_INFO_TTL:
+        return dict(cached[0])
+    
     local_ip = get_local_ip()
-    return {
+    info = {
         'local_ip': local_ip,
         'port': NETWORK_PORT,
         'url': f"http://{local_ip}:{NETWORK_PORT}",
         'network_url': f"http://{local_ip}:{NETWORK_PORT}",
         'hostname': socket.gethostname()
     }
-
-def generate_qr_code(url):
-    """Generate QR code for the network URL"""
-    try:
+    if cached and cached[0] != info:
+        print(f"🌐 Network address changed: {cached[0]['url']} -> {info['url']}")
+    with _network_lock:
+        _network_info = (info, time.monotonic())
+    return dict(info)
+
+def qr_code_digest(url):
+    """Content address of the QR code image for a URL"""
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]
+
+def get_qr_code_png(url):
+    """PNG bytes of the QR code for a URL (generated once per URL)"""
+    digest = qr_code_digest(url)
+    with _network_lock:
+        png = _qr_codes.get(digest)
+    if png is None:
         qr = qrcode.QRCode(version=1, box_size=10, border=5)
         qr.add_data(url)
         qr.make(fit=True)
         
         img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert to base64 for embedding in HTML
         buffer = io.BytesIO()
         img.save(buffer, format='PNG')
-        buffer.seek(0)
-        img_str = base64.b64encode(buffer.getvalue()).decode()
+        png = buffer.getvalue()
         
+        with _network_lock:
+            _qr_codes[digest] = png
+            while len(_qr_codes) > QR_CACHE_SIZE:
+                _qr_codes.popitem(last=False)
+    return png
+
+def generate_qr_code(url):
+    """Generate QR code for the network URL"""
+    try:
+        # Convert to base64 for embedding in HTML
+        img_str = base64.b64encode(get_qr_code_png(url)).decode()
         return f"data:image/png;base64,{img_str}"
     except Exception as e:
         print(f"Error generating QR code: {e}")
@@ -189,6 +248,12 @@ login_manager.login_message_category = 'info'
 # Register blueprints
 app.register_blueprint(auth, url_prefix='/auth')
 
+# Content-hashed static URLs (static_url() in templates)
+init_static_assets(app)
+init_asset_bundles(app)
+init_image_variants(app)
+app.add_template_global(avatar_url)
+
 # Initialize database and create admin user (runs when app starts, including via gunicorn)
 def initialize_database():
     """Initialize database tables and create admin user if needed"""
@@ -231,9 +296,12 @@ initialize_database()
 
 @login_manager.user_loader
 def load_user(user_id):
-    """Load user by ID with connection error handling"""
+    """Load user by ID with connection error handling
+
+    Returns a cached UserPrincipal, so most requests skip the user SELECT.
+    """
     try:
-        return User.query.get(int(user_id))
+        return load_principal(int(user_id))
     except Exception as e:
         # Log connection errors but don't crash the app
         print(f"WARNING: Database connection error in load_user: {e}")
@@ -242,20 +310,20 @@ def load_user(user_id):
 
 @app.before_request
 def update_last_active():
-    """Update user's last_active timestamp on each request"""
+    """Record user activity; last_active is written in batches by activity_buffer"""
+    if request.endpoint in ('static', 'hashed_static', 'image_variant'):
+        return  # Don't load the session for assets (it adds Vary: Cookie)
     if current_user.is_authenticated:
         try:
-            # Only update if last_active is None or more than 1 minute ago
-            # to avoid excessive database writes
-            now = datetime.utcnow()
-            if current_user.last_active is None or \
-               (now - current_user.last_active).total_seconds() > 60:
-                current_user.last_active = now
-                db.session.commit()
+            record_activity(app, current_user.id)
         except Exception as e:
             # Don't let this break the request
-            print(f"⚠️  Error updating last_active: {e}")
-            db.session.rollback()
+            print(f"⚠️  Error recording activity: {e}")
+
+@app.before_request
+def start_sheets_outbox_flusher():
+    """Start this worker's Sheets outbox flusher, which retries pending writes in the background"""
+    start_flusher(app)
 
 # Sample Ashtami dates data
 ASHTAMI_DATES = [
@@ -300,15 +368,15 @@ def home():
 
 @app.route('/documents')
 def documents():
-    return render_template('documents.html', page_title='Documents & Updates - Daiva Anughara')
+    return render_public_page('documents.html', page_title='Documents & Updates - Daiva Anughara')
 
 @app.route('/ashtami')
 def ashtami():
-    return render_template('ashtami.html', page_title='Ashtami Sadhana - Daiva Anughara')
+    return render_public_page('ashtami.html', page_title='Ashtami Sadhana - Daiva Anughara')
 
 @app.route('/devi')
 def devi():
-    return render_template('devi.html', page_title='Devi Maa - Daiva Anughara')
+    return render_public_page('devi.html', page_title='Devi Maa - Daiva Anughara')
 
 @app.route('/devi-padathi')
 @login_required
@@ -362,19 +430,26 @@ def devi_stage_page(stage_num):
 
 @app.route('/guru-bhairava')
 def guru_bhairava():
-    return render_template('guru_bhairava.html', page_title='Guru Bhairava - Daiva Anughara')
+    return render_public_page('guru_bhairava.html', page_title='Guru Bhairava - Daiva Anughara')
 
 @app.route('/prana-pratisthana')
 def prana_pratisthana():
-    return render_template('prana_pratisthana.html', page_title='Prāṇa Pratiṣṭhāna - Daiva Anughara')
+    return render_public_page('prana_pratisthana.html', page_title='Prāṇa Pratiṣṭhāna - Daiva Anughara')
+
+@app.route('/search')
+def site_search():
+    """Search the pages the current user may open (?q=&limit=), from the in-memory index"""
+    query = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', SEARCH_RESULTS_LIMIT, type=int), MAX_SEARCH_RESULTS))
+    return jsonify({'query': query, 'results': search(query, limit, user=current_user) if len(query) >= 2 else []})
 
 @app.route('/about')
 def about():
-    return render_template('about.html', page_title='About - Daiva Anughara')
+    return render_public_page('about.html', page_title='About - Daiva Anughara')
 
 @app.route('/youtube')
 def youtube():
-    return render_template('youtube.html', page_title='YouTube - Daiva Anughara')
+    return render_public_page('youtube.html', page_title='YouTube - Daiva Anughara')
 
 
 @app.route('/padati')
@@ -388,65 +463,15 @@ def bhiksha():
     try:
         data_source = "Local Database"
         
-        # Get ALL donations from local database (both verified and unverified)
-        all_donations = OfflineDonation.query.order_by(
-            OfflineDonation.donation_date.desc()
-        ).all()
-        
-        # Debug: Check total donations
-        total_donations_count = len(all_donations)
-        verified_donations_count = len([d for d in all_donations if d.is_verified])
-        unverified_donations_count = len([d for d in all_donations if not d.is_verified])
-        
-        print(f"🔍 Database Status:")
-        print(f"   Total donations: {total_donations_count}")
-        print(f"   Verified donations: {verified_donations_count}")
-        print(f"   Unverified donations: {unverified_donations_count}")
-        print(f"   Showing: {len(all_donations)} total donations")
+        # Per-worksheet totals come from one GROUP BY query; only the first page
+        # of the active tab is loaded, other tabs fetch from /api/donations
+        all_worksheet_data, total_donations, total_amount, active_worksheet = get_donation_overview(
+            request.args.get('worksheet')
+        )
         
         # Get all purposes for grouping
         purposes = DonationPurpose.query.filter_by(is_active=True).all()
         
-        # Group donations by purpose/worksheet
-        all_worksheet_data = {}
-        total_donations = 0
-        total_amount = 0
-        
-        # Group by worksheet if available, otherwise by purpose
-        worksheets_dict = {}
-        for donation in all_donations:
-            # Use worksheet name if available, otherwise use purpose name
-            if donation.purpose:
-                worksheet_name = donation.worksheet if donation.worksheet else donation.purpose.name
-            else:
-                worksheet_name = donation.worksheet if donation.worksheet else 'Uncategorized'
-            
-            if worksheet_name not in worksheets_dict:
-                worksheets_dict[worksheet_name] = []
-            worksheets_dict[worksheet_name].append(donation)
-        
-        print(f"📊 Grouped into {len(worksheets_dict)} categories: {list(worksheets_dict.keys())}")
-        
-        # Create worksheet data structure
-        for worksheet_name, donations in worksheets_dict.items():
-            worksheet_amount = sum(float(d.amount) for d in donations)
-            verified_count = len([d for d in donations if d.is_verified])
-            
-            all_worksheet_data[worksheet_name] = {
-                'donations': donations,
-                'summary': {
-                    'total_donations': len(donations),
-                    'total_amount': worksheet_amount,
-                    'verified_donations': verified_count,
-                    'pending_donations': len(donations) - verified_count,
-                    'average_donation': worksheet_amount / len(donations) if donations else 0
-                },
-                'all_donations': donations
-            }
-            
-            total_donations += len(donations)
-            total_amount += worksheet_amount
-        
         print(f"✅ Prepared {len(all_worksheet_data)} worksheets with {total_donations} total donations")
         
     except Exception as e:
@@ -456,18 +481,47 @@ def bhiksha():
         # Fallback to empty data
         data_source = "Local Database"
         all_worksheet_data = {}
+        active_worksheet = None
         purposes = []
         total_donations = 0
         total_amount = 0
     
     return render_template('donations.html',
                          all_worksheet_data=all_worksheet_data,
+                         active_worksheet=active_worksheet,
                          purposes=purposes,
                          total_donations=total_donations,
                          total_amount=total_amount,
                          data_source=data_source,
                          page_title="Donations")
 
+@app.route('/api/donations')
+def api_donations():
+    """Paginated donations for one worksheet tab (keyset on donation_date, id)"""
+    worksheet_name = request.args.get('worksheet', '').strip()
+    if not worksheet_name:
+        return jsonify({'error': 'Worksheet required'}), 400
+    
+    limit = request.args.get('limit', DONATIONS_PER_WORKSHEET, type=int)
+    limit = max(1, min(limit, MAX_DONATIONS_PAGE_SIZE))
+    
+    try:
+        donations, next_cursor = get_worksheet_donations_page(
+            worksheet_name,
+            cursor=request.args.get('cursor'),
+            limit=limit
+        )
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({
+        'worksheet': worksheet_name,
+        'donations': [serialize_donation(d) for d in donations],
+        'next_cursor': next_cursor
+    })
+
 @app.route('/admin/donations')
 @login_required
 def admin_donations():
@@ -480,46 +534,22 @@ def admin_donations():
         # Always fetch from local database (after sync)
         data_source = "Local Database"
         
-        # Get all donations from local database
-        all_donations = OfflineDonation.query.order_by(OfflineDonation.donation_date.desc()).all()
-        
-        # Group donations by worksheet
-        all_worksheet_data = {}
-        total_donations = 0
-        total_amount = 0
-        
-        # Group by worksheet
-        worksheets_dict = {}
-        for donation in all_donations:
-            worksheet_name = donation.worksheet if donation.worksheet else (donation.purpose.name if donation.purpose else 'Uncategorized')
-            if worksheet_name not in worksheets_dict:
-                worksheets_dict[worksheet_name] = []
-            worksheets_dict[worksheet_name].append(donation)
-        
-        # Create worksheet data structure
-        for worksheet_name, donations in worksheets_dict.items():
-            worksheet_amount = sum(float(d.amount) for d in donations)
-            all_worksheet_data[worksheet_name] = {
-                'donations': donations,
-                'summary': {
-                    'total_donations': len(donations),
-                    'total_amount': worksheet_amount,
-                    'verified_donations': len([d for d in donations if d.is_verified]),
-                    'pending_donations': len([d for d in donations if not d.is_verified]),
-                    'average_donation': worksheet_amount / len(donations) if donations else 0
-                },
-                'all_donations': donations
-            }
-            
-            total_donations += len(donations)
-            total_amount += worksheet_amount
+        # Summaries are aggregated in SQL; only the active tab's first page is loaded
+        all_worksheet_data, total_donations, total_amount, active_worksheet = get_donation_overview(
+            request.args.get('worksheet')
+        )
         
         # Get all purposes for reference
         all_purposes = DonationPurpose.query.filter_by(is_active=True).all()
         
+        # Make sure queued Google Sheets writes are being flushed in this worker
+        if get_sheets_manager().is_connected():
+            notify_outbox(app)
+        
         # Get recent donations for stats (last 30 days)
         thirty_days_ago = datetime.now().date() - timedelta(days=30)
         recent_donations = OfflineDonation.query.filter(
+            OfflineDonation.deleted_at.is_(None),
             OfflineDonation.donation_date >= thirty_days_ago
         ).order_by(OfflineDonation.donation_date.desc()).limit(10).all()
         
@@ -528,6 +558,7 @@ def admin_donations():
         # Fallback to empty data
         data_source = "Error - No Data Available"
         all_worksheet_data = {}
+        active_worksheet = None
         all_purposes = []
         total_donations = 0
         total_amount = 0
@@ -536,6 +567,7 @@ def admin_donations():
     return render_template('admin/donations.html',
                          page_title='Donation Management - Daiva Anughara',
                          all_worksheet_data=all_worksheet_data,
+                         active_worksheet=active_worksheet,
                          all_purposes=all_purposes,
                          total_donations=total_donations,
                          total_amount=total_amount,
@@ -577,27 +609,17 @@ def add_donation():
             )
             
             db.session.add(donation)
-            db.session.commit()
+            db.session.flush()
             
-            # Add to Google Sheets
+            # Queue the Google Sheets write in the same transaction; the
+            # outbox flusher writes it in the background
             purpose = DonationPurpose.query.get(form.purpose_id.data)
-            donation_data = {
-                'id': donation.id,
-                'donor_name': donation.donor_name,
-                'donor_email': donation.donor_email,
-                'donor_phone': donation.donor_phone,
-                'amount': donation.amount,
-                'currency': donation.currency,
-                'donation_date': donation.donation_date.strftime('%Y-%m-%d'),
-                'payment_method': donation.payment_method,
-                'reference_number': donation.reference_number,
-                'notes': donation.notes,
-                'is_verified': donation.is_verified,
-                'created_at': donation.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                'created_by': current_user.username
-            }
-            
-            get_sheets_manager().add_donation(donation_data, purpose.name)
+            queue_sheet_write = get_sheets_manager().is_connected()
+            if queue_sheet_write:
+                enqueue_donation_write(donation, purpose.name, current_user.username)
+            db.session.commit()
+            if queue_sheet_write:
+                notify_outbox(app)
             
             flash('Donation added successfully!', 'success')
             return redirect(url_for('admin_donations'))
@@ -626,27 +648,15 @@ def verify_donation(donation_id):
         donation.is_verified = True
         donation.verified_at = datetime.now()
         donation.verified_by = current_user.id
-        db.session.commit()
-        
-        # Update Google Sheets
-        purpose = donation.purpose
-        donation_data = {
-            'id': donation.id,
-            'donor_name': donation.donor_name,
-            'donor_email': donation.donor_email,
-            'donor_phone': donation.donor_phone,
-            'amount': donation.amount,
-            'currency': donation.currency,
-            'donation_date': donation.donation_date.strftime('%Y-%m-%d'),
-            'payment_method': donation.payment_method,
-            'reference_number': donation.reference_number,
-            'notes': donation.notes,
-            'is_verified': donation.is_verified,
-            'created_at': donation.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            'created_by': donation.creator.username
-        }
         
-        get_sheets_manager().add_donation(donation_data, purpose.name)
+        # Update the donation's sheet row in place via the outbox (rows already
+        # in the sheet get only their Status cell updated, keyed by donor ID)
+        queue_sheet_write = get_sheets_manager().is_connected()
+        if queue_sheet_write:
+            queue_sheet_write = enqueue_donation_write(donation, donation.purpose.name, donation.creator.username) is not None
+        db.session.commit()
+        if queue_sheet_write:
+            notify_outbox(app)
         
         flash('Donation verified successfully!', 'success')
     
@@ -707,7 +717,7 @@ def toggle_donation_purpose(purpose_id):
 @app.route('/admin/sync-donations')
 @login_required
 def sync_donations():
-    """Admin-only sync donations from Google Sheets to local database"""
+    """Admin-only sync donations from Google Sheets to local database (runs in background)"""
     if not current_user.is_admin():
         flash('Access denied. Admin privileges required.', 'error')
         return redirect(url_for('home'))
@@ -717,23 +727,18 @@ def sync_donations():
         return redirect(url_for('admin_donations'))
     
     try:
-        success, message = get_sheets_manager().sync_donations_from_sheets()
-        if success:
-            flash(f'✅ {message}', 'success')
+        job, started = start_sync_job(app, current_user.id)
+        if started:
+            flash(f'🔄 Sync started in the background (job #{job.id}). Refresh in a moment to see the results.', 'info')
         else:
-            flash(f'❌ {message}', 'error')
+            flash(f'ℹ️ A sync is already in progress (job #{job.id}).', 'info')
     except Exception as e:
-        flash(f'❌ Error syncing donations: {str(e)}', 'error')
+        flash(f'❌ Error starting sync: {str(e)}', 'error')
     
     return redirect(url_for('admin_donations'))
 
-@app.route('/admin/api/sync-donations', methods=['POST'])
-@login_required
-def api_sync_donations():
-    """API endpoint for syncing donations (returns JSON)"""
-    if not current_user.is_admin():
-        return jsonify({'error': 'Access denied'}), 403
-    
+def _start_sync_job_response():
+    """Start (or join) a background sync and describe the job as JSON"""
     if not get_sheets_manager().is_connected():
         return jsonify({
             'success': False,
@@ -741,17 +746,29 @@ def api_sync_donations():
         }), 400
     
     try:
-        success, message = get_sheets_manager().sync_donations_from_sheets()
+        job, started = start_sync_job(app, current_user.id)
         return jsonify({
-            'success': success,
-            'message': message
-        })
+            'success': True,
+            'started': started,
+            'message': 'Sync started' if started else 'A sync is already in progress',
+            'job': job.to_dict(),
+            'status_url': url_for('sync_job_status', job_id=job.id)
+        }), 202
     except Exception as e:
         return jsonify({
             'success': False,
-            'error': f'Error syncing donations: {str(e)}'
+            'error': f'Error starting sync: {str(e)}'
         }), 500
 
+@app.route('/admin/api/sync-donations', methods=['POST'])
+@login_required
+def api_sync_donations():
+    """API endpoint for syncing donations (returns the background job as JSON)"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Access denied'}), 403
+    
+    return _start_sync_job_response()
+
 # Alternative sync endpoint without CSRF protection
 @app.route('/admin/sync-now', methods=['GET'])
 @login_required
@@ -760,23 +777,29 @@ def sync_now():
     if not current_user.is_admin():
         return jsonify({'error': 'Access denied'}), 403
     
-    if not get_sheets_manager().is_connected():
-        return jsonify({
-            'success': False,
-            'error': 'Google Sheets not connected. Please set up credentials first.'
-        }), 400
+    return _start_sync_job_response()
+
+@app.route('/admin/api/sync-jobs/<int:job_id>')
+@login_required
+def sync_job_status(job_id):
+    """Progress and result of a background sync job (admin only)"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Access denied'}), 403
     
-    try:
-        success, message = get_sheets_manager().sync_donations_from_sheets()
-        return jsonify({
-            'success': success,
-            'message': message
-        })
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        })
+    job = SyncJob.query.get(job_id)
+    if not job:
+        return jsonify({'error': 'Sync job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/admin/api/sync-jobs/latest')
+@login_required
+def latest_sync_job():
+    """Most recent background sync job, if any (admin only)"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Access denied'}), 403
+    
+    job = SyncJob.query.order_by(SyncJob.created_at.desc()).first()
+    return jsonify(job.to_dict() if job else None)
 
 @app.route('/admin/sync-status')
 @login_required
@@ -789,6 +812,7 @@ def sync_status():
         # Lightweight check - just verify if credentials exist
         # Don't actually connect to Google Sheets
         credentials_exist = (
+            os.getenv('SHEETS_BACKEND') == 'local' or
             os.path.exists('google_credentials.json') or 
             os.getenv('GOOGLE_CREDENTIALS_JSON') is not None
         )
@@ -803,6 +827,14 @@ def sync_status():
             'error': str(e)
         })
 
+@app.route('/admin/api/activity-stats')
+@login_required
+def admin_api_activity_stats():
+    """Buffered last_active write counters for this worker (admin only)"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Access denied'}), 403
+    return jsonify(get_activity_stats())
+
 @app.route('/admin/api/donations-from-sheets')
 @login_required
 def admin_api_donations_from_sheets():
@@ -1311,16 +1343,36 @@ def api_network_info():
     network_info = get_network_info()
     qr_code = generate_qr_code(network_info['url'])
     network_info['qr_code'] = qr_code
+    network_info['qr_code_url'] = url_for('network_qr_code', digest=qr_code_digest(network_info['url']))
     return jsonify(network_info)
 
+@app.route('/api/network-qr/<digest>.png')
+def network_qr_code(digest):
+    """QR code of the network URL as a cacheable PNG (content-addressed)"""
+    url = get_network_info()['url']
+    if digest != qr_code_digest(url):
+        return jsonify({'error': 'Unknown QR code'}), 404
+    
+    try:
+        png = get_qr_code_png(url)
+    except Exception as e:
+        print(f"Error generating QR code: {e}")
+        return jsonify({'error': 'Could not generate QR code'}), 500
+    
+    # The digest names the content, so the image never changes
+    response = send_file(io.BytesIO(png), mimetype='image/png', etag=digest, max_age=31536000)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
 @app.route('/network-diagnostics')
 def network_diagnostics():
     """Network diagnostics page for troubleshooting"""
     import subprocess
     import platform
     
-    # Get basic network info
-    network_info = get_network_info()
+    # Get basic network info (re-detected, this page is for troubleshooting)
+    network_info = get_network_info(refresh=True)
     
     # Get all network interfaces
     all_interfaces = get_all_network_interfaces()
@@ -1443,41 +1495,67 @@ def send_chat_message():
             sender_id=current_user.id,
             recipient_id=recipient_id if is_from_admin else None, # None implies "to admin"
             message=message_text,
-            is_from_admin=is_from_admin
+            is_from_admin=is_from_admin,
+            conversation_id=recipient_id if is_from_admin else current_user.id
         )
         
         db.session.add(new_message)
         db.session.commit()
+        notify_chat_message(new_message)
         
         return jsonify({'success': True, 'message': new_message.to_dict()})
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def chat_page_args():
+    """Cursor paging arguments for chat history (?after_id= / ?before_id=&limit=)"""
+    limit = request.args.get('limit', CHAT_PAGE_SIZE, type=int)
+    return {
+        'after_id': request.args.get('after_id', type=int),
+        'before_id': request.args.get('before_id', type=int),
+        'limit': max(1, min(limit, MAX_CHAT_PAGE_SIZE))
+    }
+
 @app.route('/api/chat/history', methods=['GET'])
 @login_required
 def get_chat_history():
-    """Get chat history for current user"""
+    """Get a page of the current user's chat (the latest messages by default)"""
     try:
-        # If user is admin, they shouldn't use this endpoint for all chats, 
-        # but they might want to see their own chats if they were a user?
-        # For this simple implementation, let's assume this is for the Chat Widget
-        
-        # Determine effective user ID for the conversation
-        # If admin is spoofing/viewing, that's different. 
-        # For the widget:
-        user_id = current_user.id
-        
-        messages = ChatMessage.query.filter(
-            (ChatMessage.sender_id == user_id) | 
-            (ChatMessage.recipient_id == user_id) |
-            ((ChatMessage.recipient_id == None) & (ChatMessage.sender_id == user_id)) # Messages sent by user to admin
-        ).order_by(ChatMessage.timestamp.asc()).all()
-        
+        # For the Chat Widget: the user's own conversation with the admins
+        messages = get_conversation_page(current_user.id, **chat_page_args())
         return jsonify([m.to_dict() for m in messages])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/chat/stream')
+@login_required
+def chat_stream():
+    """Server-Sent Events stream of new chat messages
+    
+    Pushes messages newer than `since_id` (or the Last-Event-ID header sent
+    by a reconnecting EventSource) as they arrive. Users get their own
+    conversation; admins pass `user_id` for the conversation to follow.
+    """
+    if current_user.is_admin():
+        conversation_id = request.args.get('user_id', type=int)
+        if not conversation_id:
+            return jsonify({'error': 'User ID required'}), 400
+    else:
+        conversation_id = current_user.id
+    
+    since_id = request.headers.get('Last-Event-ID', type=int)
+    if since_id is None:
+        since_id = request.args.get('since_id', 0, type=int)
+    
+    response = Response(
+        stream_with_context(stream_messages(app, conversation_id, since_id)),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Don't let proxies buffer the stream
+    return response
+
 @app.route('/api/chat/mark-read', methods=['POST'])
 @login_required
 def mark_messages_read():
@@ -1493,7 +1571,7 @@ def mark_messages_read():
                 return jsonify({'error': 'User ID required'}), 400
                 
             # Mark messages FROM this user as read
-            ChatMessage.query.filter_by(
+            read_count = ChatMessage.query.filter_by(
                 sender_id=target_user_id, 
                 is_from_admin=False,
                 is_read=False
@@ -1506,8 +1584,10 @@ def mark_messages_read():
                 ChatMessage.is_from_admin == True,
                 ChatMessage.is_read == False
             ).update({'is_read': True})
+            read_count = 0  # Admins' messages don't count towards their badge
             
         db.session.commit()
+        notify_chat_read(read_count)
         return jsonify({'success': True})
     except Exception as e:
         db.session.rollback()
@@ -1531,54 +1611,25 @@ def get_chat_users():
     if not current_user.is_admin():
         return jsonify({'error': 'Access denied'}), 403
         
+    limit = request.args.get('limit', CHAT_USERS_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_CHAT_USERS_PAGE_SIZE))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    
     try:
-        # Get users who have sent messages, ordered by most recent message
-        from sqlalchemy import func
-        
-        # Subquery to find latest message timestamp per user
-        # We look for messages composed by users (is_from_admin=False)
-        latest_msgs = db.session.query(
-            ChatMessage.sender_id,
-            func.max(ChatMessage.timestamp).label('last_active'),
-            func.count(ChatMessage.id).filter(ChatMessage.is_read == False).label('unread_count')
-        ).filter(
-            ChatMessage.is_from_admin == False
-        ).group_by(ChatMessage.sender_id).all()
-        
-        users_data = []
-        for sender_id, last_active, unread_count in latest_msgs:
-            user = User.query.get(sender_id)
-            if user:
-                users_data.append({
-                    'id': user.id,
-                    'full_name': user.full_name,
-                    'username': user.username,
-                    'profile_picture': user.profile_picture,
-                    'last_active': last_active.isoformat(),
-                    'unread_count': unread_count
-                })
-        
-        # Sort by last active desc
-        users_data.sort(key=lambda x: x['last_active'], reverse=True)
-        
-        return jsonify(users_data)
-        
+        # Ordered by most recent message, paged with ?limit=&offset=
+        return jsonify(get_chat_users_page(limit=limit, offset=offset))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/admin/chat/<int:user_id>')
 @login_required
 def get_admin_user_chat(user_id):
-    """Get chat history with a specific user for admin"""
+    """Get a page of the chat with a specific user for admin (latest messages by default)"""
     if not current_user.is_admin():
         return jsonify({'error': 'Access denied'}), 403
         
     try:
-        messages = ChatMessage.query.filter(
-            ((ChatMessage.sender_id == user_id) & (ChatMessage.is_from_admin == False)) | 
-            ((ChatMessage.recipient_id == user_id) & (ChatMessage.is_from_admin == True))
-        ).order_by(ChatMessage.timestamp.asc()).all()
-        
+        messages = get_conversation_page(user_id, **chat_page_args())
         return jsonify([m.to_dict() for m in messages])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1587,13 +1638,92 @@ def get_admin_user_chat(user_id):
 def inject_admin_notifications():
     """Inject unread message count for admin"""
     if current_user.is_authenticated and current_user.is_admin():
-        unread_count = ChatMessage.query.filter_by(
-            is_from_admin=False,
-            is_read=False
-        ).count()
-        return dict(admin_unread_chat_count=unread_count)
+        try:
+            return dict(admin_unread_chat_count=get_unread_chat_count())
+        except Exception as e:
+            print(f"⚠️  Error counting unread chat messages: {e}")
     return dict(admin_unread_chat_count=0)
 
+@app.cli.command('flush-sheets-outbox')
+def flush_sheets_outbox_command():
+    """Write pending Google Sheets outbox entries now"""
+    stats = flush_outbox()
+    print(f"📤 Sheets outbox flushed: {stats}")
+
+@app.cli.command('generate-local-sheets')
+@click.option('--rows', default=100000, help='Total donation rows to generate')
+@click.option('--worksheets', default=5, help='Number of worksheets to spread them over')
+@click.option('--directory', default=None, help='Target directory (defaults to LOCAL_SHEETS_DIR)')
+def generate_local_sheets_command(rows, worksheets, directory):
+    """Create synthetic worksheets for the local Google Sheets stand-in"""
+    directory = directory or os.getenv('LOCAL_SHEETS_DIR', 'local_sheets')
+    titles = generate_synthetic_spreadsheet(directory, rows=rows, worksheets=worksheets)
+    print(f"✅ Generated {rows} donations across {len(titles)} worksheets in {directory}")
+
+@app.cli.command('sheets-benchmark')
+def sheets_benchmark_command():
+    """Time the sheet read, summary and sync paths against the configured backend"""
+    manager = get_sheets_manager()
+    if not manager.is_connected():
+        print("❌ Not connected to Google Sheets (set SHEETS_BACKEND=local for the local stand-in)")
+        return
+    
+    def timed(label, func):
+        started = time.perf_counter()
+        result = func()
+        print(f"⏱️  {label}: {time.perf_counter() - started:.2f}s")
+        return result
+    
+    donations = timed('Read all worksheets', manager.get_all_donations_from_sheets)
+    print(f"   {len(donations)} donations")
+    timed('Donations summary', manager.get_donations_summary)
+    for run in ('first', 'repeat'):
+        success, message = timed(f'Sync ({run})', manager.sync_donations_from_sheets)
+        print(f"   {'✅' if success else '❌'} {message}")
+    if hasattr(manager.spreadsheet, 'request_count'):
+        print(f"📊 Sheet API calls: {manager.spreadsheet.request_count}")
+
+@app.cli.command('compress-assets')
+@click.option('--force', is_flag=True, help='Recompress files whose variants are already up to date')
+def compress_assets_command(force):
+    """Write precompressed .br/.gz variants of text assets under static/"""
+    if not BROTLI_AVAILABLE:
+        print("⚠️  brotli not installed, writing gzip variants only")
+    stats = compress_static_assets(app.static_folder, force=force)
+    build_asset_manifest(app.static_folder)
+    print(f"🗜️  Compressed static assets: {stats}")
+
+@app.cli.command('build-bundles')
+def build_bundles_command():
+    """Rebuild the minified page CSS/JS bundles under static/bundles"""
+    stats = build_bundles(app.static_folder, force=True)
+    print(f"📦 Asset bundles: {stats}")
+
+@app.cli.command('build-image-variants')
+def build_image_variants_command():
+    """Generate the resized AVIF/WebP/fallback variants of static images"""
+    stats = build_image_variants(app.static_folder)
+    print(f"🖼️  Image variants: {stats}")
+
+@app.cli.command('precompile-templates')
+def precompile_templates_command():
+    """Compile all templates into the bytecode cache (run at deploy)"""
+    stats = precompile_templates(app)
+    print(f"📄 Precompiled templates: {stats}")
+
+@app.cli.command('build-search-index')
+def build_search_index_command():
+    """Rebuild the site search index and the public browser index from the page templates"""
+    save_browser_index(build_search_index(app, public_only=True))
+    index = build_search_index(app)
+    save_search_index(index)
+    compress_static_assets(app.static_folder)
+    print(f"🔎 Search index built: {len(index['docs'])} sections, {len(index['terms'])} terms")
+
+# After all routes are defined: the index records page URLs
+init_search_index(app)
+init_template_cache(app)
+
 if __name__ == '__main__':
     # Create admin user on first run
     create_admin_user()
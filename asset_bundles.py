@@ -0,0 +1,138 @@
+"""
+Minified per-page CSS/JS bundles.
+
+The styles and scripts of the largest pages live as ordinary source files
+under static/css/pages and static/js/pages. Each bundle in BUNDLES
+concatenates its sources, minifies them (rcssmin/rjsmin, when installed)
+and writes static/bundles/<name>, which templates link with
+static_url('bundles/<name>'), so it gets a content-hashed, immutable URL
+and precompressed variants like any other asset. Relative url()s in CSS
+are rewritten to the referenced files' hashed URLs, since the bundle is
+served from a different path than its sources.
+
+Bundles are rebuilt at startup when a source changed (and on the next
+request in debug mode); `flask build-bundles` forces a rebuild.
+"""
+
+import os
+import posixpath
+import re
+import threading
+from urllib.parse import quote
+from static_assets import asset_digest, refresh_asset
+try:
+    import rcssmin
+    import rjsmin
+    MINIFY_AVAILABLE = True
+except ImportError:
+    MINIFY_AVAILABLE = False
+
+# Output directory, relative to static/
+BUNDLE_PATH = 'bundles'
+
+# Bundle name -> source files (relative to static/), concatenated in order
+BUNDLES = {
+    'admin_users.css': ['css/pages/admin_users.css'],
+    'admin_users.js': ['js/pages/admin_users.js'],
+    'admin_user_detail.css': ['css/pages/admin_user_detail.css'],
+    'admin_user_detail.js': ['js/pages/admin_user_detail.js'],
+    'padati.css': ['css/pages/padati.css'],
+    'padati.js': ['js/pages/padati.js'],
+    'stage_7.css': ['css/pages/stage_7.css'],
+    'stage_7.js': ['js/pages/stage_7.js'],
+}
+
+_CSS_URL = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+
+_built = {}  # bundle name -> source mtimes it was built from
+_lock = threading.Lock()
+
+
+def _rewrite_css_urls(css, source):
+    """Point relative url()s at the hashed URLs of the files they name"""
+    def replace(match):
+        url = match.group(2)
+        if re.match(r'^(?:[a-z]+:|/|#|%23)', url, re.I):
+            return match.group(0)  # Absolute, data: or fragment reference
+        path = posixpath.normpath(posixpath.join(posixpath.dirname(source), url))
+        digest = asset_digest(path)
+        if digest is None:
+            return f"url('/static/{quote(path)}')"
+        return f"url('/assets/{digest}/{quote(path)}')"
+    return _CSS_URL.sub(replace, css)
+
+
+def _minify(name, text):
+    if not MINIFY_AVAILABLE:
+        return text
+    if name.endswith('.css'):
+        return rcssmin.cssmin(text)
+    return rjsmin.jsmin(text)
+
+
+def _source_mtimes(static_folder, sources):
+    return tuple(os.stat(os.path.join(static_folder, source)).st_mtime for source in sources)
+
+
+def build_bundles(static_folder, force=False):
+    """Write bundles whose sources changed; returns counters
+
+    A bundle file is only rewritten when its content differs, so its
+    hashed URL stays the same across restarts.
+    """
+    stats = {'bundles': 0, 'written': 0, 'unchanged': 0, 'errors': 0}
+    os.makedirs(os.path.join(static_folder, BUNDLE_PATH), exist_ok=True)
+    for name, sources in BUNDLES.items():
+        stats['bundles'] += 1
+        try:
+            mtimes = _source_mtimes(static_folder, sources)
+            if not force and _built.get(name) == mtimes:
+                stats['unchanged'] += 1
+                continue
+
+            parts = []
+            for source in sources:
+                with open(os.path.join(static_folder, source), encoding='utf-8') as f:
+                    text = f.read()
+                if name.endswith('.css'):
+                    text = _rewrite_css_urls(text, source)
+                parts.append(_minify(name, text))
+            content = '\n'.join(parts)
+
+            target = os.path.join(static_folder, BUNDLE_PATH, name)
+            try:
+                with open(target, encoding='utf-8') as f:
+                    current = f.read()
+            except OSError:
+                current = None
+            if content == current:
+                stats['unchanged'] += 1
+            else:
+                tmp_path = f"{target}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(tmp_path, target)
+                refresh_asset(f"{BUNDLE_PATH}/{name}")
+                stats['written'] += 1
+            with _lock:
+                _built[name] = mtimes
+        except Exception as e:
+            stats['errors'] += 1
+            print(f"⚠️  Could not build bundle {name}: {e}")
+    return stats
+
+
+def init_asset_bundles(app):
+    """Build stale bundles (after init_static_assets, whose hashes CSS urls use)"""
+    with app.app_context():
+        stats = build_bundles(app.static_folder)
+    if not MINIFY_AVAILABLE:
+        print("⚠️  rcssmin/rjsmin not installed, bundles are not minified")
+    if stats['written']:
+        print(f"📦 Asset bundles: {stats}")
+
+    if app.debug:
+        @app.before_request
+        def rebuild_bundles():
+            # Pick up edited sources without restarting the dev server
+            build_bundles(app.static_folder)
@@ -1,7 +1,7 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, send_file
 from flask_login import login_user, logout_user, login_required, current_user
 from urllib.parse import urlparse
-from models import db, User, StageAccessRequest
+from models import db, User, StageAccessRequest, UserStageProgress, STAGES, STAGES_BY_ID
 from forms import LoginForm, RegistrationForm, AdminApprovalForm, UserSearchForm, EditProfileForm
 from datetime import datetime
 import os
@@ -10,6 +10,7 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment
 from openpyxl.chart import BarChart, Reference
 from werkzeug.utils import secure_filename
+from profile_pictures import save_profile_picture, delete_profile_picture
 
 
 auth = Blueprint('auth', __name__)
@@ -67,21 +68,12 @@ def register():
         if form.profile_picture.data:
             file = form.profile_picture.data
             if file and file.filename:
-                # Create uploads directory if it doesn't exist
-                upload_dir = os.path.join(os.getcwd(), 'static', 'uploads', 'profiles')
-                os.makedirs(upload_dir, exist_ok=True)
-                
-                # Generate secure filename
-                filename = secure_filename(file.filename)
-                # Add timestamp to make filename unique
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                name, ext = os.path.splitext(filename)
-                filename = f"{name}_{timestamp}{ext}"
-                
-                # Save file
-                file_path = os.path.join(upload_dir, filename)
-                file.save(file_path)
-                profile_picture_path = f"uploads/profiles/{filename}"
+                # Resized, stripped and stored under its content hash
+                try:
+                    profile_picture_path = save_profile_picture(file)
+                except ValueError as e:
+                    flash(str(e), 'error')
+                    return render_template('auth/register.html', title='Register', form=form)
         
         user = User(
             username=form.username.data,
@@ -124,6 +116,8 @@ def admin_users():
     search_term = request.args.get('search_term', '')
     status_filter = request.args.get('status_filter', 'all')
     role_filter = request.args.get('role_filter', 'all')
+    stage_filter = request.args.get('stage_filter', 'all')
+    search_form.stage_filter.data = stage_filter
     
     # Build query
     query = User.query
@@ -150,6 +144,13 @@ def admin_users():
     if role_filter != 'all':
         query = query.filter_by(role=role_filter)
     
+    if stage_filter != 'all':
+        try:
+            query = query.filter(User.stage_access_filter(int(stage_filter)))
+        except (ValueError, KeyError):
+            pass
+    
+    # Stage access flags come from stage_access_mask, no progress rows needed
     users = query.order_by(User.created_at.desc()).all()
     
     # Get all pending stage access requests
@@ -228,37 +229,15 @@ def update_stage_access(user_id):
 
     user = User.query.get_or_404(user_id)
 
-    # Get stage access updates from form (Bhairava stages 1-6)
-    mandala_2_access = request.form.get('mandala_2_access') == 'on'
-    mandala_3_access = request.form.get('mandala_3_access') == 'on'
-    rudraksha_8_mukhi_access = request.form.get('rudraksha_8_mukhi_access') == 'on'
-    rudraksha_11_mukhi_access = request.form.get('rudraksha_11_mukhi_access') == 'on'
-    rudraksha_14_mukhi_access = request.form.get('rudraksha_14_mukhi_access') == 'on'
-    pratham_charana_diksha_access = request.form.get('pratham_charana_diksha_access') == 'on'
-    dutiya_charana_access = request.form.get('dutiya_charana_access') == 'on'
-    tritiya_charana_access = request.form.get('tritiya_charana_access') == 'on'
-
-    # Get Devi Mandala access updates (Kamakhya Sadhana)
-    devi_mandala_2_access = request.form.get('devi_mandala_2_access') == 'on'
-    devi_mandala_3_access = request.form.get('devi_mandala_3_access') == 'on'
-
-    # Update Bhairava stage access
-    user.mandala_2_access = mandala_2_access
-    user.mandala_3_access = mandala_3_access
-    user.rudraksha_8_mukhi_access = rudraksha_8_mukhi_access
-    user.rudraksha_11_mukhi_access = rudraksha_11_mukhi_access
-    user.rudraksha_14_mukhi_access = rudraksha_14_mukhi_access
-    user.pratham_charana_diksha_access = pratham_charana_diksha_access
-    user.dutiya_charana_access = dutiya_charana_access
-    user.tritiya_charana_access = tritiya_charana_access
-
-    # Update Devi Mandala access
-    user.devi_mandala_2_access = devi_mandala_2_access
-    user.devi_mandala_3_access = devi_mandala_3_access
+    # Update access for every stage that is not open by default (Bhairava
+    # stages 2-9 and Devi Mandalas 2-3); form fields use the legacy names
+    for stage in STAGES:
+        if not stage.default_access:
+            user.set_stage_access(stage.stage_id, request.form.get(f'{stage.key}_access') == 'on')
 
     # Check if user should start the next available stage
     next_stage = user.get_next_required_stage()
-    if next_stage and not getattr(user, f'mandala_{next_stage}_started_at' if next_stage <= 3 else f'rudraksha_{5 if next_stage == 4 else 11 if next_stage == 5 else 14}_mukhi_started_at', None):
+    if next_stage and not user.is_stage_started(next_stage):
         user.start_stage(next_stage)
 
     db.session.commit()
@@ -296,17 +275,8 @@ def complete_user_stage(user_id):
     # Grant access to next stage if this is not the last stage
     if stage_number < 6:
         next_stage = stage_number + 1
-        access_fields = {
-            2: 'mandala_2_access',
-            3: 'mandala_3_access',
-            4: 'rudraksha_8_mukhi_access',
-            5: 'rudraksha_11_mukhi_access',
-            6: 'rudraksha_14_mukhi_access'
-        }
-
-        if next_stage in access_fields:
-            setattr(user, access_fields[next_stage], True)
-            user.start_stage(next_stage)
+        user.set_stage_access(next_stage, True)
+        user.start_stage(next_stage)
 
     db.session.commit()
 
@@ -328,45 +298,14 @@ def reset_user_stage(user_id):
         return redirect(url_for('auth.admin_user_detail', user_id=user_id))
 
     # Reset stage completion and dates
-    completion_fields = {
-        1: 'mandala_1_completed_at',
-        2: 'mandala_2_completed_at',
-        3: 'mandala_3_completed_at',
-        4: 'rudraksha_8_mukhi_completed_at',
-        5: 'rudraksha_11_mukhi_completed_at',
-        6: 'rudraksha_14_mukhi_completed_at'
-    }
-
-    start_fields = {
-        1: 'mandala_1_started_at',
-        2: 'mandala_2_started_at',
-        3: 'mandala_3_started_at',
-        4: 'rudraksha_8_mukhi_started_at',
-        5: 'rudraksha_11_mukhi_started_at',
-        6: 'rudraksha_14_mukhi_started_at'
-    }
-
-    if stage_number in completion_fields:
-        setattr(user, completion_fields[stage_number], None)
-        setattr(user, start_fields[stage_number], None)
+    user.reset_stage(stage_number)
 
     # If resetting a stage, also reset all subsequent stages
     for i in range(stage_number + 1, 7):
-        if i in completion_fields:
-            setattr(user, completion_fields[i], None)
-            setattr(user, start_fields[i], None)
+        user.reset_stage(i)
 
         # Remove access to subsequent stages
-        if i == 2:
-            user.mandala_2_access = False
-        elif i == 3:
-            user.mandala_3_access = False
-        elif i == 4:
-            user.rudraksha_8_mukhi_access = False
-        elif i == 5:
-            user.rudraksha_11_mukhi_access = False
-        elif i == 6:
-            user.rudraksha_14_mukhi_access = False
+        user.set_stage_access(i, False)
 
     db.session.commit()
 
@@ -438,31 +377,19 @@ def update_profile_picture(user_id):
             flash('Invalid file type. Only JPG, PNG, and GIF are allowed.', 'error')
             return redirect(url_for('auth.admin_user_detail', user_id=user_id))
         
-        # Create uploads directory if it doesn't exist
-        upload_dir = os.path.join(os.getcwd(), 'static', 'uploads', 'profiles')
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Generate secure filename with timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        name, _ = os.path.splitext(filename)
-        new_filename = f"{name}_{user.id}_{timestamp}.{ext}"
-        
-        # Save file
-        file_path = os.path.join(upload_dir, new_filename)
-        file.save(file_path)
-        
-        # Delete old profile picture if exists
-        if user.profile_picture:
-            old_path = os.path.join(os.getcwd(), 'static', user.profile_picture)
-            if os.path.exists(old_path):
-                try:
-                    os.remove(old_path)
-                except Exception as e:
-                    print(f"Warning: Could not delete old profile picture: {e}")
+        # Resized, stripped and stored under its content hash
+        try:
+            new_path = save_profile_picture(file)
+        except ValueError as e:
+            flash(str(e), 'error')
+            return redirect(url_for('auth.admin_user_detail', user_id=user_id))
         
-        # Update user's profile picture path
-        user.profile_picture = f"uploads/profiles/{new_filename}"
+        # Update user's profile picture path, then delete the old picture if nobody else uses it
+        old_path = user.profile_picture
+        user.profile_picture = new_path
         db.session.commit()
+        if old_path and old_path != new_path:
+            delete_profile_picture(old_path)
         
         flash(f'Profile picture updated successfully for {user.username}!', 'success')
     
@@ -593,8 +520,8 @@ def user_kpi_data():
     pending_users = len([u for u in users if not u.is_approved and u.is_active])
     suspended_users = len([u for u in users if not u.is_active and not u.is_admin()])
 
-    mandala_2_users = len([u for u in users if u.mandala_2_access])
-    mandala_3_users = len([u for u in users if u.mandala_3_access])
+    mandala_2_users = UserStageProgress.users_with_access(2).count()
+    mandala_3_users = UserStageProgress.users_with_access(3).count()
 
     # Calculate average days to approval
     approved_users_with_approval_date = [u for u in users if u.is_approved and u.approved_at and u.created_at]
@@ -659,18 +586,7 @@ def request_stage_access():
         db.session.add(new_request)
         db.session.commit()
         
-        stage_names = {
-            1: 'Mandala 1',
-            2: 'Mandala 2',
-            3: 'Mandala 3',
-            4: 'Rudraksha 8 Mukhi',
-            5: 'Rudraksha 11 Mukhi',
-            6: 'Rudraksha 14 Mukhi',
-            7: 'Pratham Charana Diksha',
-            8: 'Dutiya Charana',
-            9: 'Tritiya Charana'
-        }
-        stage_name = stage_names.get(stage_number, f'Stage {stage_number}')
+        stage_name = new_request.get_stage_name()
         
         return jsonify({
             'success': True,
@@ -746,30 +662,9 @@ def approve_stage_request(request_id):
             # Grant access to the stage
             user = access_request.user
             
-            # Grant access based on stage number
-            if access_request.stage_number == 2:
-                user.mandala_2_access = True
-            elif access_request.stage_number == 3:
-                user.mandala_3_access = True
-            elif access_request.stage_number == 4:
-                user.rudraksha_8_mukhi_access = True
-            elif access_request.stage_number == 5:
-                user.rudraksha_11_mukhi_access = True
-            elif access_request.stage_number == 6:
-                user.rudraksha_14_mukhi_access = True
-            elif access_request.stage_number == 7:
-                user.pratham_charana_diksha_access = True
-            elif access_request.stage_number == 8:
-                user.dutiya_charana_access = True
-            elif access_request.stage_number == 9:
-                user.tritiya_charana_access = True
-            # Devi Mandala stages (Devi Padathi - Kamakhya Sadhana)
-            elif access_request.stage_number == 101:
-                user.devi_mandala_1_access = True
-            elif access_request.stage_number == 102:
-                user.devi_mandala_2_access = True
-            elif access_request.stage_number == 103:
-                user.devi_mandala_3_access = True
+            # Grant access based on stage number (Bhairava 2-9, Devi 101-103)
+            if access_request.stage_number in STAGES_BY_ID:
+                user.set_stage_access(access_request.stage_number, True)
             
             # Start the stage if it's the next one
             next_stage = user.get_next_required_stage()
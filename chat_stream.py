@@ -0,0 +1,323 @@
+"""
+Chat history paging, the cached admin chat user list and Server-Sent
+Events fan-out for chat messages.
+
+History is read one page at a time by message id within a conversation
+(ChatMessage.conversation_id), so long threads load in O(page).
+
+The admin chat user list is cached per page and keyed by a chat version:
+a counter bumped by every send/read seen by this process, plus the newest
+message id (one primary key lookup, catching messages sent through other
+workers). Read-status changes made by other workers show up within
+CHAT_USERS_CACHE_TTL.
+
+The admins' unread message counter is kept in memory and maintained by
+this process's sends and mark-reads. It is tagged with the newest message
+id it accounts for: when MAX(id) (a primary key lookup) differs, another
+worker sent something and the counter is recounted from a partial index of
+unread user messages. Reads through other workers, and messages committed
+out of id order, are picked up by the recount every UNREAD_CHAT_COUNT_TTL.
+
+Open chat widgets keep one /api/chat/stream connection and are pushed only
+messages newer than their cursor, instead of re-fetching the whole
+conversation every few seconds.
+
+Each process runs at most one watcher thread, and only while streams are
+open. It notices new messages, whether sent through this process
+(notify_chat_message) or through another gunicorn worker (one cheap
+`id > last seen` query per CHAT_WATCH_INTERVAL), and wakes the streams of the
+affected conversations. Streams only query the database when woken for
+their own conversation.
+"""
+
+import json
+import threading
+import time
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+from models import db, User, ChatMessage
+from profile_pictures import avatar_url
+
+# Seconds between checks for messages sent through other worker processes
+CHAT_WATCH_INTERVAL = 1
+
+# Streams are closed after this many seconds; EventSource reconnects with Last-Event-ID
+CHAT_STREAM_TIMEOUT = 55
+
+# Seconds between keep-alive comments on an idle stream
+CHAT_KEEPALIVE_INTERVAL = 15
+
+# Milliseconds the browser waits before reconnecting a closed stream
+CHAT_RETRY_MS = 2000
+
+# Messages per history page by default, and the most a client may ask for
+CHAT_PAGE_SIZE = 50
+MAX_CHAT_PAGE_SIZE = 200
+
+# Users per admin chat list page by default, and the most a client may ask for
+CHAT_USERS_PAGE_SIZE = 100
+MAX_CHAT_USERS_PAGE_SIZE = 500
+
+# Seconds a cached chat user list is trusted without a version change
+CHAT_USERS_CACHE_TTL = 60
+
+# Seconds before the unread counter is fully recounted
+UNREAD_CHAT_COUNT_TTL = 30
+
+_condition = threading.Condition()
+_latest_ids = {}    # conversation (user id) -> newest message id seen by this process
+_listeners = 0      # open streams in this process
+_last_seen_id = 0   # newest chat_message id the watcher has looked at
+_watcher = None
+_watcher_ready = threading.Event()  # set once the watcher has read its starting id
+_chat_version = 0   # bumped on every chat change seen by this process
+
+_chat_users_cache = {}  # (limit, offset) -> (version, loaded_at, users)
+_chat_users_lock = threading.Lock()
+
+_unread_count = None  # (count, newest message id accounted for, counted_at) for the admins' badge
+_unread_lock = threading.Lock()
+
+
+def _record(conversation_id, message_id):
+    # Caller holds _condition
+    if message_id > _latest_ids.get(conversation_id, 0):
+        _latest_ids[conversation_id] = message_id
+
+
+def notify_chat_message(message):
+    """Wake streams for a just-committed message (no database access)"""
+    global _chat_version, _unread_count
+    with _condition:
+        _record(message.conversation_id, message.id)
+        _chat_version += 1
+        _condition.notify_all()
+    with _unread_lock:
+        # Only the next id can be added safely; after a gap another worker's
+        # message may be missing, so the next read recounts instead
+        if _unread_count and message.id == _unread_count[1] + 1:
+            count, _, counted_at = _unread_count
+            _unread_count = (count + (0 if message.is_from_admin else 1), message.id, counted_at)
+
+
+def notify_chat_read(user_messages_read=None):
+    """Record that messages were just marked read (unread counts changed)
+
+    user_messages_read is how many unread user messages were marked read;
+    None (unknown) makes the next unread count a full recount.
+    """
+    global _chat_version, _unread_count
+    with _condition:
+        _chat_version += 1
+    with _unread_lock:
+        if user_messages_read is None or not _unread_count:
+            _unread_count = None
+        elif user_messages_read:
+            count, max_id, counted_at = _unread_count
+            _unread_count = (max(count - user_messages_read, 0), max_id, counted_at)
+
+
+def _watch_once(conn):
+    """Pick up messages committed by other processes since the last check"""
+    global _last_seen_id, _chat_version
+    rows = conn.execute(
+        select(ChatMessage.id, ChatMessage.conversation_id)
+        .where(ChatMessage.id > _last_seen_id)
+        .order_by(ChatMessage.id)
+    ).all()
+    if rows:
+        with _condition:
+            for row in rows:
+                _record(row.conversation_id, row.id)
+            _last_seen_id = rows[-1].id
+            _chat_version += 1
+            _condition.notify_all()
+
+
+def _watcher_loop(app):
+    global _watcher, _last_seen_id
+    with app.app_context():
+        try:
+            with db.engine.connect() as conn:
+                _last_seen_id = conn.execute(select(func.max(ChatMessage.id))).scalar() or 0
+            _watcher_ready.set()
+        except Exception as e:
+            print(f"⚠️  Chat watcher could not start: {e}")
+            with _condition:
+                _watcher = None
+            return
+
+        while True:
+            with _condition:
+                if _listeners == 0:
+                    # Nobody is listening - stop until the next stream opens
+                    _watcher = None
+                    _watcher_ready.clear()
+                    return
+            time.sleep(CHAT_WATCH_INTERVAL)
+            try:
+                with db.engine.connect() as conn:
+                    _watch_once(conn)
+            except Exception as e:
+                print(f"⚠️  Error checking for new chat messages: {e}")
+
+
+def _add_listener(app):
+    global _listeners, _watcher
+    with _condition:
+        _listeners += 1
+        if _watcher is None:
+            _watcher_ready.clear()
+            _watcher = threading.Thread(target=_watcher_loop, args=(app,), daemon=True)
+            _watcher.start()
+
+
+def _remove_listener():
+    global _listeners
+    with _condition:
+        _listeners -= 1
+
+
+def _wait_for_message(conversation_id, since_id, timeout):
+    """Block until this process knows of a message newer than since_id (or timeout)"""
+    deadline = time.monotonic() + timeout
+    with _condition:
+        while _latest_ids.get(conversation_id, 0) <= since_id:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _condition.wait(remaining)
+    return True
+
+
+def get_conversation_page(conversation_id, after_id=None, before_id=None, limit=CHAT_PAGE_SIZE):
+    """One page of a conversation's messages, oldest first
+
+    With after_id: the first `limit` messages after it (catching up).
+    Otherwise: the newest `limit` messages, before before_id if given
+    (scrolling back). A full page means there may be more.
+    """
+    query = ChatMessage.query.options(joinedload(ChatMessage.sender)).filter(
+        ChatMessage.conversation_id == conversation_id
+    )
+    if after_id is not None:
+        return query.filter(ChatMessage.id > after_id).order_by(ChatMessage.id.asc()).limit(limit).all()
+    if before_id is not None:
+        query = query.filter(ChatMessage.id < before_id)
+    return list(reversed(query.order_by(ChatMessage.id.desc()).limit(limit).all()))
+
+
+def get_chat_users_page(limit=CHAT_USERS_PAGE_SIZE, offset=0):
+    """Users who have written to the admins, most recently active first
+
+    One query: per-sender last message time and unread count, joined to
+    the user columns the chat list shows. Cached until the chat changes.
+    """
+    now = time.monotonic()
+    with _condition:
+        local_version = _chat_version
+    version = (local_version, db.session.query(func.max(ChatMessage.id)).scalar())
+
+    key = (limit, offset)
+    with _chat_users_lock:
+        cached = _chat_users_cache.get(key)
+        if cached and cached[0] == version and now - cached[1] < CHAT_USERS_CACHE_TTL:
+            return cached[2]
+
+    stats = db.session.query(
+        ChatMessage.sender_id.label('user_id'),
+        func.max(ChatMessage.timestamp).label('last_active'),
+        func.count(ChatMessage.id).filter(ChatMessage.is_read == False).label('unread_count')
+    ).filter(
+        ChatMessage.is_from_admin == False
+    ).group_by(ChatMessage.sender_id).subquery()
+
+    rows = db.session.query(
+        User.id, User.full_name, User.username, User.profile_picture,
+        stats.c.last_active, stats.c.unread_count
+    ).join(
+        stats, stats.c.user_id == User.id
+    ).order_by(
+        stats.c.last_active.desc(), User.id.desc()
+    ).limit(limit).offset(offset).all()
+
+    users = [{
+        'id': row.id,
+        'full_name': row.full_name,
+        'username': row.username,
+        'profile_picture': row.profile_picture,
+        'avatar_url': avatar_url(row.profile_picture),
+        'last_active': row.last_active.isoformat() if row.last_active else None,
+        'unread_count': row.unread_count
+    } for row in rows]
+
+    with _chat_users_lock:
+        # Entries for older versions are useless now
+        for stale_key in [k for k, entry in _chat_users_cache.items() if entry[0] != version]:
+            del _chat_users_cache[stale_key]
+        _chat_users_cache[key] = (version, now, users)
+    return users
+
+
+def get_unread_chat_count():
+    """Number of unread messages from users, for the admin notification badge"""
+    global _unread_count
+    now = time.monotonic()
+    max_id = db.session.query(func.max(ChatMessage.id)).scalar() or 0
+
+    with _unread_lock:
+        cached = _unread_count
+    if cached and cached[1] == max_id and now - cached[2] < UNREAD_CHAT_COUNT_TTL:
+        return cached[0]
+
+    # Recount; matches the ix_chat_message_unread partial index
+    count = db.session.query(func.count(ChatMessage.id)).filter(
+        ChatMessage.is_from_admin == False,
+        ChatMessage.is_read == False,
+        ChatMessage.id <= max_id
+    ).scalar()
+    with _unread_lock:
+        # Don't overwrite a send or read recorded meanwhile
+        if _unread_count is cached:
+            _unread_count = (count, max_id, now)
+    return count
+
+
+def _event(message):
+    return f"id: {message['id']}\nevent: message\ndata: {json.dumps(message)}\n\n"
+
+
+def stream_messages(app, conversation_id, since_id):
+    """Generator of SSE chunks for one conversation, starting after since_id
+
+    Must run inside the request's app context (stream_with_context). The
+    database connection is released while waiting for new messages.
+    """
+    _add_listener(app)
+    try:
+        yield f"retry: {CHAT_RETRY_MS}\n\n"
+
+        # Catch up on anything sent before the stream (re)connected. Waiting
+        # for the watcher first means later messages are seen by one or the other.
+        _watcher_ready.wait(CHAT_WATCH_INTERVAL * 5)
+        deadline = time.monotonic() + CHAT_STREAM_TIMEOUT
+        while True:
+            messages = [
+                m.to_dict() for m in get_conversation_page(conversation_id, after_id=since_id, limit=MAX_CHAT_PAGE_SIZE)
+            ]
+            db.session.rollback()
+            for message in messages:
+                since_id = message['id']
+                yield _event(message)
+            if len(messages) == MAX_CHAT_PAGE_SIZE:
+                continue  # More to catch up on
+
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                if _wait_for_message(conversation_id, since_id, min(remaining, CHAT_KEEPALIVE_INTERVAL)):
+                    break
+                yield ": keep-alive\n\n"
+    finally:
+        _remove_listener()
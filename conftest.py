@@ -0,0 +1,25 @@
+"""
+Shared pytest fixtures.
+"""
+
+import pytest
+from flask import Flask
+from models import db, User, DonationPurpose
+
+
+@pytest.fixture
+def app():
+    """Flask app on an empty in-memory database with an admin user and the Annadan purpose (both id 1)"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        # password_hash is set directly: hashing a real password is slow and not needed here
+        db.session.add(User(username='admin', email='admin@example.com', full_name='Administrator',
+                            role='admin', purpose='Administrator', password_hash='-'))
+        db.session.add(DonationPurpose(name='Annadan', created_by=1))
+        db.session.commit()
+        yield app
+        db.session.remove()
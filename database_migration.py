@@ -13,13 +13,18 @@ New Fields Added:
 - Stage completion dates for all 6 stages
 - Stage start dates for duration tracking
 - Devi Mandala access permissions (1, 2, 3) for Devi Padathi/Kamakhya Sadhana
+- Google Sheets sync fingerprint and soft-delete columns on offline donations
+- user_stage_progress table, backfilled from the per-stage User columns
+- User stage access bitmask, recomputed from user_stage_progress
+- Chat message conversation key and indexes for paged chat history
+- Partial index of unread user chat messages (admin unread counter)
 """
 
 import sys
 from flask import Flask
-from models import db, User
+from models import db, User, STAGES, STAGE_BITS, DEFAULT_STAGE_ACCESS_MASK
 from datetime import datetime
-from sqlalchemy import text
+from sqlalchemy import text, inspect
 
 def create_app():
     """Create Flask app for migration"""
@@ -150,6 +155,189 @@ def add_stage_tracking_columns():
 
     return True
 
+def add_donation_sync_columns():
+    """Add incremental Google Sheets sync columns to the OfflineDonation table"""
+    print("🔄 Adding incremental sync fields to offline donations...")
+
+    statements = [
+        ('sheet_fingerprint', "ALTER TABLE offline_donation ADD COLUMN sheet_fingerprint VARCHAR(64)"),
+        ('deleted_at', "ALTER TABLE offline_donation ADD COLUMN deleted_at TIMESTAMP"),
+        ('ix_offline_donation_sheet_fingerprint',
+         "CREATE INDEX IF NOT EXISTS ix_offline_donation_sheet_fingerprint ON offline_donation (sheet_fingerprint)")
+    ]
+
+    for name, statement in statements:
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(text(statement))
+                conn.commit()
+            print(f"   ✓ {name} added")
+        except Exception as e:
+            print(f"   ⚠️ {name}: {e}")
+
+    print("   ℹ️  The first sync after this migration fingerprints every row once.")
+    return True
+
+def migrate_stage_progress():
+    """Create user_stage_progress and copy the per-stage User columns into it
+
+    Safe to re-run: users that already have a row for a stage are skipped.
+    The legacy User columns are left in place (no longer read by the app)
+    and can be dropped once the migrated data has been checked.
+    """
+    print("🪷 Moving stage access and progress to user_stage_progress...")
+
+    try:
+        db.create_all()  # Creates user_stage_progress if it does not exist yet
+        user_columns = {column['name'] for column in inspect(db.engine).get_columns('user')}
+    except Exception as e:
+        print(f"❌ Error preparing user_stage_progress: {e}")
+        return False
+
+    for stage in STAGES:
+        access_column = f'{stage.key}_access'
+        if access_column not in user_columns:
+            print(f"   ⚠️ {stage.name}: no {access_column} column, users keep the default access")
+            continue
+
+        started_column = f'{stage.key}_started_at'
+        completed_column = f'{stage.key}_completed_at'
+        started = f'u.{started_column}' if started_column in user_columns else 'NULL'
+        completed = f'u.{completed_column}' if completed_column in user_columns else 'NULL'
+
+        try:
+            with db.engine.connect() as conn:
+                result = conn.execute(text(f"""
+                    INSERT INTO user_stage_progress (user_id, stage_id, has_access, started_at, completed_at)
+                    SELECT u.id, :stage_id, COALESCE(u.{access_column}, FALSE), {started}, {completed}
+                    FROM "user" u
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM user_stage_progress p
+                        WHERE p.user_id = u.id AND p.stage_id = :stage_id
+                    )
+                """), {'stage_id': stage.stage_id})
+                conn.commit()
+            print(f"   ✓ {stage.name}: {result.rowcount} users copied")
+        except Exception as e:
+            print(f"   ⚠️ {stage.name}: {e}")
+
+    return True
+
+def add_stage_access_mask():
+    """Add User.stage_access_mask and recompute it from user_stage_progress
+
+    Safe to re-run: the mask is always rebuilt from the progress rows.
+    Stages with default access stay granted unless a row revokes them.
+    """
+    print("🔢 Adding stage access bitmask to users...")
+
+    statements = [
+        ('stage_access_mask',
+         f'ALTER TABLE "user" ADD COLUMN stage_access_mask INTEGER NOT NULL DEFAULT {DEFAULT_STAGE_ACCESS_MASK}'),
+        ('ix_user_stage_access_mask',
+         'CREATE INDEX IF NOT EXISTS ix_user_stage_access_mask ON "user" (stage_access_mask)')
+    ]
+    for name, statement in statements:
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(text(statement))
+                conn.commit()
+            print(f"   ✓ {name} added")
+        except Exception as e:
+            print(f"   ⚠️ {name}: {e}")
+
+    terms = []
+    for stage in STAGES:
+        if stage.default_access:
+            condition = f"NOT EXISTS (SELECT 1 FROM user_stage_progress p WHERE p.user_id = u.id AND p.stage_id = {stage.stage_id} AND NOT p.has_access)"
+        else:
+            condition = f"EXISTS (SELECT 1 FROM user_stage_progress p WHERE p.user_id = u.id AND p.stage_id = {stage.stage_id} AND p.has_access)"
+        terms.append(f"CASE WHEN {condition} THEN {STAGE_BITS[stage.stage_id]} ELSE 0 END")
+
+    try:
+        with db.engine.connect() as conn:
+            result = conn.execute(text(f'UPDATE "user" AS u SET stage_access_mask = {" + ".join(terms)}'))
+            conn.commit()
+        print(f"   ✓ stage_access_mask recomputed for {result.rowcount} users")
+    except Exception as e:
+        print(f"❌ Error recomputing stage_access_mask: {e}")
+        return False
+
+    return True
+
+def add_chat_conversation_column():
+    """Add ChatMessage.conversation_id (backfilled) and the chat history indexes"""
+    print("💬 Adding conversation key and indexes to chat messages...")
+
+    statements = [
+        ('conversation_id', 'ALTER TABLE chat_message ADD COLUMN conversation_id INTEGER REFERENCES "user" (id)'),
+        ('conversation_id backfill',
+         "UPDATE chat_message SET conversation_id = CASE WHEN is_from_admin THEN recipient_id ELSE sender_id END "
+         "WHERE conversation_id IS NULL"),
+        ('ix_chat_message_conversation_id',
+         "CREATE INDEX IF NOT EXISTS ix_chat_message_conversation_id ON chat_message (conversation_id, id)"),
+        ('ix_chat_message_sender_timestamp',
+         "CREATE INDEX IF NOT EXISTS ix_chat_message_sender_timestamp ON chat_message (sender_id, timestamp)"),
+        ('ix_chat_message_recipient_admin_timestamp',
+         "CREATE INDEX IF NOT EXISTS ix_chat_message_recipient_admin_timestamp ON chat_message (recipient_id, is_from_admin, timestamp)")
+    ]
+
+    for name, statement in statements:
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(text(statement))
+                conn.commit()
+            print(f"   ✓ {name} added")
+        except Exception as e:
+            print(f"   ⚠️ {name}: {e}")
+
+    return True
+
+def add_chat_unread_index():
+    """Add the partial index behind the admins' unread chat message count"""
+    print("🔔 Adding unread chat message index...")
+
+    # Must match the query's rendering of the booleans for the index to be used
+    false = '0' if db.engine.dialect.name == 'sqlite' else 'false'
+    try:
+        with db.engine.connect() as conn:
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_chat_message_unread ON chat_message (id) "
+                f"WHERE is_from_admin = {false} AND is_read = {false}"
+            ))
+            conn.commit()
+        print("   ✓ ix_chat_message_unread added")
+    except Exception as e:
+        print(f"   ⚠️ ix_chat_message_unread: {e}")
+
+    return True
+
+def add_sync_job_single_flight_index():
+    """Add the partial unique index that allows one active sync job at a time"""
+    print("🔄 Adding sync job single-flight index...")
+
+    statements = [
+        # Older duplicates would make the unique index fail to build
+        ('duplicate active jobs',
+         "UPDATE sync_job SET status = 'failed', message = 'Superseded by another active sync job' "
+         "WHERE status IN ('pending', 'running') "
+         "AND id < (SELECT MAX(id) FROM sync_job WHERE status IN ('pending', 'running'))"),
+        ('ix_sync_job_single_flight',
+         "CREATE UNIQUE INDEX IF NOT EXISTS ix_sync_job_single_flight ON sync_job ((status IN ('pending', 'running'))) "
+         "WHERE status IN ('pending', 'running')")
+    ]
+
+    for name, statement in statements:
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(text(statement))
+                conn.commit()
+            print(f"   ✓ {name} handled")
+        except Exception as e:
+            print(f"   ⚠️ {name}: {e}")
+
+    return True
+
 def reset_database_for_testing():
     """Optional: Reset database for testing (WARNING: This will delete all data!)"""
     print("⚠️ WARNING: This will delete all existing data!")
@@ -177,6 +365,12 @@ if __name__ == "__main__":
             reset_database_for_testing()
         else:
             success = add_stage_tracking_columns()
+            success = add_donation_sync_columns() and success
+            success = migrate_stage_progress() and success
+            success = add_stage_access_mask() and success
+            success = add_chat_conversation_column() and success
+            success = add_chat_unread_index() and success
+            success = add_sync_job_single_flight_index() and success
 
             if success:
                 print("\n🎉 Migration completed! The spiritual progress tracking system is ready.")
@@ -0,0 +1,160 @@
+"""
+Donation summary queries for the Bhiksha and admin donation pages.
+
+Per-worksheet totals are computed by the database in a single GROUP BY
+statement, and donation rows are loaded one keyset page at a time, so page
+cost follows what is displayed rather than the size of the donations table.
+"""
+
+from collections import OrderedDict
+from datetime import date
+from sqlalchemy import func, case, literal_column, or_, and_
+from models import db, DonationPurpose, OfflineDonation
+
+# Number of donation rows rendered per worksheet tab (and per API page)
+DONATIONS_PER_WORKSHEET = 50
+MAX_DONATIONS_PAGE_SIZE = 200
+
+
+def worksheet_label():
+    """SQL expression for the worksheet a donation is grouped under.
+
+    Mirrors the old Python grouping: the synced worksheet name, falling back
+    to the purpose name and finally to 'Uncategorized'. A literal column is
+    used for the fallback so the SELECT and GROUP BY expressions are identical
+    on PostgreSQL (bound parameters would not be).
+    """
+    return func.coalesce(
+        func.nullif(OfflineDonation.worksheet, ''),
+        DonationPurpose.name,
+        literal_column("'Uncategorized'")
+    )
+
+
+def get_worksheet_summaries():
+    """Get totals, verified/pending counts and averages for every worksheet.
+
+    Returns an OrderedDict of worksheet name -> summary dict, ordered by the
+    most recent donation date in each worksheet (newest first).
+    """
+    label = worksheet_label()
+    verified = func.sum(case((OfflineDonation.is_verified.is_(True), 1), else_=0))
+
+    rows = db.session.query(
+        label.label('worksheet_name'),
+        func.count(OfflineDonation.id),
+        func.coalesce(func.sum(OfflineDonation.amount), 0),
+        verified
+    ).outerjoin(
+        DonationPurpose, OfflineDonation.purpose_id == DonationPurpose.id
+    ).filter(
+        OfflineDonation.deleted_at.is_(None)
+    ).group_by(label).order_by(
+        func.max(OfflineDonation.donation_date).desc(),
+        label
+    ).all()
+
+    summaries = OrderedDict()
+    for worksheet_name, count, amount, verified_count in rows:
+        amount = float(amount or 0)
+        verified_count = int(verified_count or 0)
+        summaries[worksheet_name] = {
+            'total_donations': count,
+            'total_amount': amount,
+            'verified_donations': verified_count,
+            'pending_donations': count - verified_count,
+            'average_donation': amount / count if count else 0
+        }
+    return summaries
+
+
+def encode_cursor(donation):
+    """Encode the keyset position of a donation as '<donation_date>_<id>'"""
+    return f"{donation.donation_date.isoformat()}_{donation.id}"
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor; raises ValueError if malformed"""
+    donation_date, _, donation_id = cursor.partition('_')
+    return date.fromisoformat(donation_date), int(donation_id)
+
+
+def get_worksheet_donations_page(worksheet_name, cursor=None, limit=DONATIONS_PER_WORKSHEET):
+    """Load one page of a worksheet's donations, newest first.
+
+    Pages are keyed on (donation_date, id) rather than OFFSET, so every page
+    costs the same regardless of how deep the reader has scrolled. Returns
+    (donations, next_cursor); next_cursor is None on the last page.
+    """
+    query = db.session.query(OfflineDonation).outerjoin(
+        DonationPurpose, OfflineDonation.purpose_id == DonationPurpose.id
+    ).filter(
+        OfflineDonation.deleted_at.is_(None),
+        worksheet_label() == worksheet_name
+    )
+
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            OfflineDonation.donation_date < cursor_date,
+            and_(OfflineDonation.donation_date == cursor_date, OfflineDonation.id < cursor_id)
+        ))
+
+    donations = query.order_by(
+        OfflineDonation.donation_date.desc(),
+        OfflineDonation.id.desc()
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(donations) > limit:
+        donations = donations[:limit]
+        next_cursor = encode_cursor(donations[-1])
+    return donations, next_cursor
+
+
+def serialize_donation(donation):
+    """Convert a donation to the JSON shape rendered by the donation tabs"""
+    return {
+        'id': donation.id,
+        'donor_name': donation.donor_name,
+        'donor_email': donation.donor_email,
+        'amount': float(donation.amount),
+        'currency': donation.currency,
+        'payment_method': donation.payment_method,
+        'donation_date': donation.donation_date.isoformat() if donation.donation_date else None,
+        'donation_date_display': donation.donation_date.strftime('%B %d, %Y') if donation.donation_date else None,
+        'is_verified': bool(donation.is_verified)
+    }
+
+
+def get_donation_overview(active_worksheet=None, limit=DONATIONS_PER_WORKSHEET):
+    """Build the worksheet data used by donations.html and admin/donations.html.
+
+    Every worksheet gets its summary, but donation rows are only loaded for
+    the active tab (the requested worksheet, or the first one); the other
+    tabs fetch their rows on demand from /api/donations.
+
+    Returns (all_worksheet_data, total_donations, total_amount, active_worksheet),
+    where all_worksheet_data maps worksheet name -> {'donations', 'summary',
+    'next_cursor'}.
+    """
+    summaries = get_worksheet_summaries()
+    if active_worksheet not in summaries:
+        active_worksheet = next(iter(summaries), None)
+
+    all_worksheet_data = OrderedDict()
+    total_donations = 0
+    total_amount = 0
+    for worksheet_name, summary in summaries.items():
+        donations, next_cursor = [], None
+        if worksheet_name == active_worksheet:
+            donations, next_cursor = get_worksheet_donations_page(worksheet_name, limit=limit)
+        all_worksheet_data[worksheet_name] = {
+            'donations': donations,
+            'summary': summary,
+            'next_cursor': next_cursor
+        }
+        total_donations += summary['total_donations']
+        total_amount += summary['total_amount']
+
+    return all_worksheet_data, total_donations, total_amount, active_worksheet
@@ -3,6 +3,7 @@ from flask_wtf.file import FileField, FileAllowed
 from wtforms import StringField, PasswordField, BooleanField, SelectField, TextAreaField, RadioField, DateField
 from wtforms.validators import DataRequired, Email, Length, EqualTo, ValidationError, Optional
 from datetime import datetime
+from models import STAGES
 
 class LoginForm(FlaskForm):
     username = StringField('Username', validators=[DataRequired(), Length(min=3, max=80)])
@@ -71,6 +72,9 @@ class UserSearchForm(FlaskForm):
         ('admin', 'Admin'),
         ('user', 'User')
     ])
+    stage_filter = SelectField('Stage Filter', choices=[('all', 'All Stages')] + [
+        (str(stage.stage_id), stage.name) for stage in STAGES
+    ])
 
 class DonationPurposeForm(FlaskForm):
     name = StringField('Purpose Name', validators=[DataRequired(), Length(max=100)])
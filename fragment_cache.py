@@ -0,0 +1,75 @@
+"""
+Rendered-fragment cache for public pages.
+
+Pages like About or Guru Bhairava have bodies that are the same for every
+visitor; only base.html (the nav, user menu and CSRF meta tag) depends on
+who is logged in. render_public_page() renders a template's blocks once,
+keeps the HTML in memory, and on later requests renders just the base
+layout around it (cached_page.html), so a page view costs a dictionary
+lookup plus the small per-user shell.
+
+A fragment is tied to its content version: the compiled template it came
+from (a reloaded template is a new object) and the hashed asset URLs it
+contains. If any of those assets was re-hashed since, the fragment is
+rendered again. Only use this for templates whose blocks don't read
+current_user, the session or the request.
+"""
+
+import re
+import threading
+from urllib.parse import unquote
+from flask import current_app, render_template
+from markupsafe import Markup
+from static_assets import asset_digest
+
+# Shell template that extends base.html and fills its blocks from fragments
+FRAGMENT_SHELL_TEMPLATE = 'cached_page.html'
+
+# Fingerprinted URLs embedded in a fragment: /assets/<digest>/<path> and /img/<digest>/<width>/<path>
+_ASSET_URL = re.compile(r'''/(?:assets|img)/([0-9a-f]+)/(?:\d+/)?([^\s'"()?#]+)''')
+
+_fragments = {}  # (template name, context items) -> (template, blocks, asset digests)
+_lock = threading.Lock()
+
+
+def _asset_digests(blocks):
+    """{path: digest} of the hashed asset URLs in rendered blocks"""
+    digests = {}
+    for html in blocks.values():
+        for digest, path in _ASSET_URL.findall(html):
+            digests[unquote(path)] = digest
+    return digests
+
+
+def _is_current(entry, template):
+    if entry[0] is not template:
+        return False
+    return all(asset_digest(path) == digest for path, digest in entry[2].items())
+
+
+def _render_blocks(template, context):
+    """Render every block of a template on its own; returns {block name: html}"""
+    app = current_app._get_current_object()
+    context = dict(context)
+    app.update_template_context(context)
+    jinja_context = template.new_context(context)
+    return {name: Markup(''.join(block(jinja_context))) for name, block in template.blocks.items()}
+
+
+def render_public_page(template_name, **context):
+    """render_template() for a page whose blocks are the same for every user"""
+    template = current_app.jinja_env.get_template(template_name)
+    try:
+        key = (template_name, tuple(sorted(context.items())))
+        hash(key)
+    except TypeError:
+        return render_template(template_name, **context)  # Unhashable context, can't key a fragment
+
+    entry = _fragments.get(key)
+    if entry is None or not _is_current(entry, template):
+        blocks = _render_blocks(template, context)
+        entry = (template, blocks, _asset_digests(blocks))
+        with _lock:
+            _fragments[key] = entry
+    return render_template(FRAGMENT_SHELL_TEMPLATE, fragments=entry[1], **context)
+
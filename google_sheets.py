@@ -1,28 +1,129 @@
 import gspread
+from gspread.utils import absolute_range_name, fill_gaps, numericise_all, rowcol_to_a1
 from google.oauth2.service_account import Credentials
 from datetime import datetime
 import os
 import json
+import hashlib
+
+# Number of ids per UPDATE ... WHERE id IN (...) statement during sync
+SYNC_BATCH_SIZE = 500
+
+# Donation fields that make up a sheet row's fingerprint
+FINGERPRINT_FIELDS = [
+    'purpose', 'id', 'donor_name', 'donor_email', 'donor_phone', 'amount', 'currency',
+    'donation_date', 'payment_method', 'reference_number', 'notes', 'status'
+]
+
+# Header row of worksheets created by the app (columns A:N)
+WORKSHEET_HEADERS = [
+    'ID', 'Donor Name', 'Donor Email', 'Donor Phone', 'Amount',
+    'Currency', 'Purpose', 'Donation Date', 'Payment Method',
+    'Reference Number', 'Notes', 'Status', 'Created At', 'Created By'
+]
+
+def donation_fingerprint(donation_data, occurrence=0):
+    """Hash a parsed sheet row (worksheet + content) into a stable fingerprint
+
+    `occurrence` distinguishes otherwise identical rows in the same worksheet.
+    """
+    content = [str(donation_data.get(field, '')).strip() for field in FINGERPRINT_FIELDS]
+    if occurrence:
+        content.append(str(occurrence))
+    return hashlib.sha256(json.dumps(content).encode('utf-8')).hexdigest()
+
+def values_to_records(values):
+    """Turn a values.batchGet range (header row + rows) into record dicts
+
+    Mirrors gspread's Worksheet.get_all_records: rows are padded to the
+    header width, cells are numericised and the header must be unique.
+    """
+    if not values:
+        return []
+
+    keys = list(values[0])
+    rows = values[1:]
+    width = max([len(keys)] + [len(row) for row in rows])
+    keys.extend([''] * (width - len(keys)))
+    if len(keys) != len(set(keys)):
+        raise ValueError("the header row in the worksheet is not unique")
+
+    rows = fill_gaps(rows, cols=width) if rows else []
+    return [dict(zip(keys, numericise_all(row))) for row in rows]
+
+def record_to_donation(record, worksheet_title, id_column='ID'):
+    """Map a sheet record to the donation dict shape, or None for an empty row"""
+    # Handle different column name formats
+    donor_name = record.get('Donor Name') or record.get('Donors Name', '')
+    amount = record.get('Amount') or record.get('Amount Collected', '')
+    if not donor_name and not amount:
+        return None
+
+    return {
+        'id': record.get(id_column, ''),
+        'row_id': record.get('ID', ''),  # Column A, where the app writes its donation ID
+        'donor_name': donor_name,
+        'donor_email': record.get('Donor Email', ''),
+        'donor_phone': record.get('Donor Phone', ''),
+        'amount': float(amount) if amount else 0,
+        'currency': record.get('Currency', 'INR'),
+        'purpose': worksheet_title,
+        'donation_date': record.get('Donation Date', ''),
+        'payment_method': record.get('Payment Method', 'Cash'),
+        'reference_number': record.get('Reference Number', ''),
+        'notes': record.get('Notes', ''),
+        'status': record.get('Status', 'Verified'),  # Default to verified for existing data
+        'created_at': record.get('Created At', ''),
+        'created_by': record.get('Created By', '')
+    }
+
+def build_donation_row(donation_data, purpose_name):
+    """Build a worksheet row (columns A:N) for a donation"""
+    return [
+        donation_data.get('id', ''),
+        donation_data.get('donor_name', ''),
+        donation_data.get('donor_email', ''),
+        donation_data.get('donor_phone', ''),
+        donation_data.get('amount', ''),
+        donation_data.get('currency', 'INR'),
+        purpose_name,
+        donation_data.get('donation_date', ''),
+        donation_data.get('payment_method', ''),
+        donation_data.get('reference_number', ''),
+        donation_data.get('notes', ''),
+        'Verified' if donation_data.get('is_verified', False) else 'Pending',
+        donation_data.get('created_at', datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+        donation_data.get('created_by', '')
+    ]
 
 class GoogleSheetsManager:
     """Manages Google Sheets integration for donation tracking"""
     
-    def __init__(self, credentials_file=None, spreadsheet_id=None):
+    def __init__(self, credentials_file=None, spreadsheet_id=None, backend=None, local_dir=None):
         """
         Initialize Google Sheets manager
         
         Args:
             credentials_file: Path to Google service account credentials JSON file
             spreadsheet_id: Google Sheets spreadsheet ID
+            backend: 'google' (default) or 'local' for the file-backed stand-in
+                (defaults to the SHEETS_BACKEND environment variable)
+            local_dir: Directory of CSV worksheets used by the local backend
+                (defaults to LOCAL_SHEETS_DIR, then 'local_sheets')
         """
         self.credentials_file = credentials_file or 'google_credentials.json'
         self.spreadsheet_id = spreadsheet_id or '1AwipeokLOKRFZFLaz8lz9c5J-68Wskeo79YfimEncH4'
+        self.backend = backend or os.getenv('SHEETS_BACKEND', 'google')
+        self.local_dir = local_dir or os.getenv('LOCAL_SHEETS_DIR', 'local_sheets')
         self.client = None
         self.spreadsheet = None
         self._connect()
     
     def _connect(self):
-        """Connect to Google Sheets"""
+        """Connect to Google Sheets (or open the local stand-in)"""
+        if self.backend == 'local':
+            return self._connect_local()
+        
         try:
             # Define the scopes
             scopes = [
@@ -67,6 +168,50 @@ class GoogleSheetsManager:
             print("ℹ️  Google Sheets integration disabled. Using local database only.")
             return False
     
+    def _connect_local(self):
+        """Open the file-backed spreadsheet used for offline testing and benchmarks"""
+        try:
+            from local_sheets import LocalSpreadsheet
+            latency = float(os.getenv('LOCAL_SHEETS_LATENCY', 0))
+            self.spreadsheet = LocalSpreadsheet(self.local_dir, latency=latency)
+            print(f"✅ Using local Google Sheets stand-in: {self.local_dir}")
+            return True
+        except Exception as e:
+            print(f"❌ Error opening local sheets directory {self.local_dir}: {e}")
+            return False
+    
+    def _ensure_connected(self):
+        """Reuse the authorized client; only connect if not connected yet"""
+        return self.is_connected() or self._connect()
+    
+    def get_worksheet_titles(self):
+        """List donation worksheet titles (one metadata request)"""
+        return [ws.title for ws in self.spreadsheet.worksheets() if ws.title != 'Sheet1']
+    
+    def batch_get_records(self, worksheet_titles=None):
+        """Fetch the records of many worksheets with a single values.batchGet call
+        
+        Returns a dict of worksheet title -> list of record dicts (same shape
+        as get_all_records). Worksheets that cannot be parsed are skipped.
+        """
+        if worksheet_titles is None:
+            worksheet_titles = self.get_worksheet_titles()
+        if not worksheet_titles:
+            return {}
+        
+        response = self.spreadsheet.values_batch_get(
+            [absolute_range_name(title) for title in worksheet_titles]
+        )
+        
+        records_by_worksheet = {}
+        # valueRanges come back in the same order as the requested ranges
+        for title, value_range in zip(worksheet_titles, response.get('valueRanges', [])):
+            try:
+                records_by_worksheet[title] = values_to_records(value_range.get('values', []))
+            except Exception as e:
+                print(f"⚠️  Error reading worksheet {title}: {e}")
+        return records_by_worksheet
+    
     def get_or_create_worksheet(self, worksheet_name):
         """Get existing worksheet or create new one"""
         try:
@@ -82,12 +227,7 @@ class GoogleSheetsManager:
                 worksheet = self.spreadsheet.add_worksheet(title=worksheet_name, rows=1000, cols=20)
                 
                 # Add headers
-                headers = [
-                    'ID', 'Donor Name', 'Donor Email', 'Donor Phone', 'Amount', 
-                    'Currency', 'Purpose', 'Donation Date', 'Payment Method', 
-                    'Reference Number', 'Notes', 'Status', 'Created At', 'Created By'
-                ]
-                worksheet.append_row(headers)
+                worksheet.append_row(WORKSHEET_HEADERS)
                 
                 print(f"✅ Created new worksheet: {worksheet_name}")
                 return worksheet
@@ -109,22 +249,7 @@ class GoogleSheetsManager:
                 return False
             
             # Prepare row data
-            row_data = [
-                donation_data.get('id', ''),
-                donation_data.get('donor_name', ''),
-                donation_data.get('donor_email', ''),
-                donation_data.get('donor_phone', ''),
-                donation_data.get('amount', ''),
-                donation_data.get('currency', 'INR'),
-                purpose_name,
-                donation_data.get('donation_date', ''),
-                donation_data.get('payment_method', ''),
-                donation_data.get('reference_number', ''),
-                donation_data.get('notes', ''),
-                'Verified' if donation_data.get('is_verified', False) else 'Pending',
-                donation_data.get('created_at', datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
-                donation_data.get('created_by', '')
-            ]
+            row_data = build_donation_row(donation_data, purpose_name)
             
             # Add row to worksheet
             worksheet.append_row(row_data)
@@ -135,6 +260,85 @@ class GoogleSheetsManager:
             print(f"❌ Error adding donation to Google Sheets: {e}")
             return False
     
+    def upsert_donations(self, purpose_name, donations):
+        """Write many donations to one worksheet with at most three API calls
+        
+        Rows are matched by donation ID (column A) and donor name (column B):
+        matching rows are updated in place with one batch_update, the rest are
+        appended with one append_rows. Raises on API errors so callers can retry.
+        
+        Returns (updated_count, appended_count).
+        """
+        if not self.spreadsheet:
+            raise RuntimeError("Not connected to Google Sheets")
+        
+        worksheet = self.get_or_create_worksheet(purpose_name)
+        if not worksheet:
+            raise RuntimeError(f"Worksheet {purpose_name} is not available")
+        
+        # Sheet row number (1-based) keyed by (donation ID, donor name)
+        row_numbers = {}
+        for row_number, row in enumerate(worksheet.get('A:B'), start=1):
+            if row:
+                row_numbers.setdefault((str(row[0]), row[1] if len(row) > 1 else ''), row_number)
+        
+        updates = []
+        appends = []
+        for donation_data in donations:
+            row_data = build_donation_row(donation_data, purpose_name)
+            row_number = row_numbers.get((str(donation_data.get('id', '')), donation_data.get('donor_name', '')))
+            if row_number:
+                updates.append({'range': f'A{row_number}:N{row_number}', 'values': [row_data]})
+            else:
+                appends.append(row_data)
+        
+        if updates:
+            worksheet.batch_update(updates)
+        if appends:
+            worksheet.append_rows(appends)
+        
+        print(f"✅ Wrote donations to Google Sheets: {purpose_name} ({len(updates)} updated, {len(appends)} appended)")
+        return len(updates), len(appends)
+    
+    def update_donation_statuses(self, purpose_name, donations):
+        """Set the Status cell of existing rows, leaving the rest of each row alone
+        
+        Used for rows imported by the sync, which keep the sheet's own column
+        layout. Rows are matched like upsert_donations, by ID (column A) and
+        donor name (column B); unmatched donations are not written. Raises on
+        API errors so callers can retry.
+        
+        Returns the set of (ID, donor name) keys that were updated.
+        """
+        if not self.spreadsheet:
+            raise RuntimeError("Not connected to Google Sheets")
+        
+        worksheet = self.spreadsheet.worksheet(purpose_name)
+        header = (worksheet.get('1:1') or [[]])[0]
+        if 'Status' not in header:
+            raise RuntimeError(f"Worksheet {purpose_name} has no Status column")
+        status_column = header.index('Status') + 1
+        
+        row_numbers = {}
+        for row_number, row in enumerate(worksheet.get('A:B'), start=1):
+            if row:
+                row_numbers.setdefault((str(row[0]), row[1] if len(row) > 1 else ''), row_number)
+        
+        updates = []
+        updated = set()
+        for donation_data in donations:
+            key = (str(donation_data.get('id', '')), donation_data.get('donor_name', ''))
+            row_number = row_numbers.get(key)
+            if row_number:
+                status = 'Verified' if donation_data.get('is_verified', False) else 'Pending'
+                updates.append({'range': rowcol_to_a1(row_number, status_column), 'values': [[status]]})
+                updated.add(key)
+        
+        if updates:
+            worksheet.batch_update(updates)
+        print(f"✅ Updated donation statuses in Google Sheets: {purpose_name} ({len(updates)} of {len(donations)} found)")
+        return updated
+    
     def update_donation(self, donation_data, purpose_name, row_index):
         """Update an existing donation record"""
         try:
@@ -146,22 +350,7 @@ class GoogleSheetsManager:
                 return False
             
             # Update the specific row
-            row_data = [
-                donation_data.get('id', ''),
-                donation_data.get('donor_name', ''),
-                donation_data.get('donor_email', ''),
-                donation_data.get('donor_phone', ''),
-                donation_data.get('amount', ''),
-                donation_data.get('currency', 'INR'),
-                purpose_name,
-                donation_data.get('donation_date', ''),
-                donation_data.get('payment_method', ''),
-                donation_data.get('reference_number', ''),
-                donation_data.get('notes', ''),
-                'Verified' if donation_data.get('is_verified', False) else 'Pending',
-                donation_data.get('created_at', datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
-                donation_data.get('created_by', '')
-            ]
+            row_data = build_donation_row(donation_data, purpose_name)
             
             # Update the row (row_index + 2 because of header row and 1-based indexing)
             worksheet.update(f'A{row_index + 2}:N{row_index + 2}', [row_data])
@@ -192,17 +381,14 @@ class GoogleSheetsManager:
                         'pending_donations': len([r for r in records if r.get('Status') == 'Pending'])
                     }
             else:
-                # Get summary for all purposes
-                worksheets = self.spreadsheet.worksheets()
-                for worksheet in worksheets:
-                    if worksheet.title != 'Sheet1':  # Skip default sheet
-                        records = worksheet.get_all_records()
-                        summary[worksheet.title] = {
-                            'total_donations': len(records),
-                            'total_amount': sum(float(record.get('Amount', 0)) for record in records if record.get('Amount')),
-                            'verified_donations': len([r for r in records if r.get('Status') == 'Verified']),
-                            'pending_donations': len([r for r in records if r.get('Status') == 'Pending'])
-                        }
+                # Get summary for all purposes (one batch read for every worksheet)
+                for title, records in self.batch_get_records().items():
+                    summary[title] = {
+                        'total_donations': len(records),
+                        'total_amount': sum(float(record.get('Amount', 0)) for record in records if record.get('Amount')),
+                        'verified_donations': len([r for r in records if r.get('Status') == 'Verified']),
+                        'pending_donations': len([r for r in records if r.get('Status') == 'Pending'])
+                    }
             
             return summary
             
@@ -217,46 +403,14 @@ class GoogleSheetsManager:
                 return []
             
             all_donations = []
-            worksheets = self.spreadsheet.worksheets()
             
-            for worksheet in worksheets:
-                if worksheet.title == 'Sheet1':  # Skip default sheet
-                    continue
-                
-                try:
-                    records = worksheet.get_all_records()
-                    for record in records:
-                        # Skip empty rows
-                        donor_name = record.get('Donor Name') or record.get('Donors Name', '')
-                        amount = record.get('Amount') or record.get('Amount Collected', '')
-                        if not donor_name and not amount:
-                            continue
-                        
-                        # Handle different column name formats
-                        donor_name = record.get('Donor Name') or record.get('Donors Name', '')
-                        amount = record.get('Amount') or record.get('Amount Collected', 0)
-                        
-                        donation_data = {
-                            'id': record.get('Doner_ID', ''),  # Use correct column name
-                            'donor_name': donor_name,
-                            'donor_email': record.get('Donor Email', ''),
-                            'donor_phone': record.get('Donor Phone', ''),
-                            'amount': float(amount) if amount else 0,
-                            'currency': record.get('Currency', 'INR'),
-                            'purpose': worksheet.title,
-                            'donation_date': record.get('Donation Date', ''),
-                            'payment_method': record.get('Payment Method', 'Cash'),
-                            'reference_number': record.get('Reference Number', ''),
-                            'notes': record.get('Notes', ''),
-                            'status': record.get('Status', 'Verified'),  # Default to verified for existing data
-                            'created_at': record.get('Created At', ''),
-                            'created_by': record.get('Created By', '')
-                        }
+            # One values.batchGet request for every worksheet instead of a
+            # get_all_records() round trip per tab
+            for title, records in self.batch_get_records().items():
+                for record in records:
+                    donation_data = record_to_donation(record, title, id_column='Doner_ID')  # Use correct column name
+                    if donation_data:
                         all_donations.append(donation_data)
-                        
-                except Exception as e:
-                    print(f"⚠️  Error reading worksheet {worksheet.title}: {e}")
-                    continue
             
             # Sort by donation date (most recent first)
             all_donations.sort(key=lambda x: x.get('donation_date', ''), reverse=True)
@@ -316,53 +470,118 @@ class GoogleSheetsManager:
             print(f"❌ Error fetching donations for purpose {purpose_name}: {e}")
             return []
     
-    def sync_donations_from_sheets(self):
-        """Sync donations from Google Sheets to local database - COMPLETE REFRESH"""
+    def sync_donations_from_sheets(self, progress=None):
+        """Sync donations from Google Sheets to local database - INCREMENTAL
+
+        Every sheet row is fingerprinted (worksheet + row content hash). Rows
+        whose fingerprint is already stored are left untouched, new rows are
+        inserted (or restored if they were soft-deleted earlier) and rows that
+        vanished from the sheet are soft-deleted. Donations whose sheet row was
+        written by the outbox (fingerprint cleared) are matched back to
+        their row by worksheet, donor ID and donor name instead. Everything happens in one
+        transaction, so readers never see a half-synced or empty table.
+        
+        Args:
+            progress: Optional callable receiving keyword counters (phase,
+                rows_read, rows_upserted, rows_skipped, rows_removed). It is
+                only called while the sync transaction has no pending writes.
+        """
         try:
             if not self.spreadsheet:
                 return False, "Not connected to Google Sheets"
             
             from models import DonationPurpose, OfflineDonation, db
-            from datetime import datetime
-            
-            print("🔄 Starting complete refresh sync...")
             
-            # STEP 1: Clear all existing donation data
-            print("🗑️  Clearing existing donation data...")
-            OfflineDonation.query.delete()
-            DonationPurpose.query.delete()
-            db.session.commit()
-            print("✅ Cleared all existing data")
+            print("🔄 Starting incremental sync...")
             
-            # STEP 2: Get all donations from Google Sheets
+            # STEP 1: Get all donations from Google Sheets
             print("📥 Fetching all data from Google Sheets...")
             all_donations = self.get_all_donations_from_sheets()
             print(f"📊 Found {len(all_donations)} donations in Google Sheets")
+            if progress:
+                progress(phase='reading', rows_read=len(all_donations))
             
-            synced_count = 0
-            purposes_created = set()
+            if not all_donations:
+                # An empty read is far more likely a Sheets/API problem than a
+                # deliberately emptied spreadsheet - keep the existing data
+                return False, "No donations found in Google Sheets - existing data kept"
             
-            # STEP 3: Re-import all data fresh
+            # STEP 2: Fingerprint every sheet row (identical rows get an occurrence suffix)
+            sheet_rows = {}
+            occurrences = {}
             for donation_data in all_donations:
+                content_hash = donation_fingerprint(donation_data)
+                occurrence = occurrences.get(content_hash, 0)
+                occurrences[content_hash] = occurrence + 1
+                fingerprint = donation_fingerprint(donation_data, occurrence) if occurrence else content_hash
+                sheet_rows[fingerprint] = donation_data
+            
+            # STEP 3: Load stored fingerprints (ids and flags only, no full rows).
+            # Donations still waiting in the Sheets outbox are not in the sheet
+            # yet, so they must not be treated as vanished.
+            from sheets_outbox import pending_donation_ids
+            unsent_ids = pending_donation_ids()
+            existing = {}
+            stale_ids = []
+            rewritten = {}  # (worksheet, donor ID, donor name) -> ids of rows the outbox rewrote
+            for donation_id, fingerprint, deleted_at, donor_id, worksheet, donor_name in db.session.query(
+                OfflineDonation.id,
+                OfflineDonation.sheet_fingerprint,
+                OfflineDonation.deleted_at,
+                OfflineDonation.donor_id,
+                OfflineDonation.worksheet,
+                OfflineDonation.donor_name
+            ):
+                if fingerprint and fingerprint in sheet_rows and fingerprint not in existing:
+                    existing[fingerprint] = (donation_id, deleted_at)
+                elif fingerprint is None and deleted_at is None and donor_id:
+                    rewritten.setdefault((worksheet, donor_id, donor_name), []).append(donation_id)
+                elif deleted_at is None and donation_id not in unsent_ids:
+                    # Gone from the sheet (or never synced) - soft-delete it
+                    stale_ids.append(donation_id)
+            
+            restore_ids = [donation_id for donation_id, deleted_at in existing.values() if deleted_at is not None]
+            new_fingerprints = []
+            matched = {}  # fingerprint -> id of the rewritten donation it belongs to
+            for fingerprint, donation_data in sheet_rows.items():
+                if fingerprint in existing:
+                    continue
+                # Rows appended by the outbox have no sheet donor ID, only the app's ID in column A
+                row_key = str(donation_data.get('id', '')).strip() or str(donation_data.get('row_id', '')).strip()
+                key = (donation_data['purpose'], row_key, str(donation_data['donor_name']))
+                if rewritten.get(key):
+                    matched[fingerprint] = rewritten[key].pop()
+                else:
+                    new_fingerprints.append(fingerprint)
+            stale_ids.extend(
+                donation_id for donation_ids in rewritten.values() for donation_id in donation_ids
+                if donation_id not in unsent_ids
+            )
+            unchanged_count = len(existing) - len(restore_ids)
+            if progress:
+                progress(phase='writing', rows_read=len(all_donations), rows_skipped=unchanged_count)
+            
+            # STEP 4: Make sure every worksheet has a purpose (flushed, not committed)
+            purposes = {p.name: p for p in DonationPurpose.query.all()}
+            for fingerprint in new_fingerprints:
+                purpose_name = sheet_rows[fingerprint]['purpose']
+                if purpose_name not in purposes:
+                    purpose = DonationPurpose(
+                        name=purpose_name,
+                        description=f"Purpose synced from Google Sheets - {purpose_name}",
+                        created_by=1  # Admin user
+                    )
+                    db.session.add(purpose)
+                    purposes[purpose_name] = purpose
+                    print(f"✅ Created purpose: {purpose_name}")
+            db.session.flush()
+            
+            # STEP 5: Insert new rows
+            inserted_count = 0
+            for fingerprint in new_fingerprints:
+                donation_data = sheet_rows[fingerprint]
                 try:
-                    # Find or create purpose
-                    purpose_name = donation_data['purpose']
-                    if purpose_name not in purposes_created:
-                        purpose = DonationPurpose(
-                            name=purpose_name,
-                            description=f"Purpose synced from Google Sheets - {purpose_name}",
-                            created_by=1  # Admin user
-                        )
-                        db.session.add(purpose)
-                        db.session.commit()
-                        purposes_created.add(purpose_name)
-                        print(f"✅ Created purpose: {purpose_name}")
-                    else:
-                        purpose = DonationPurpose.query.filter_by(name=purpose_name).first()
-                    
-                    # Create new donation record
                     donor_id = str(donation_data.get('id', '')).strip()
-                    worksheet_name = donation_data.get('purpose', '')
                     
                     donation_date = datetime.now().date()
                     if donation_data.get('donation_date'):
@@ -371,34 +590,63 @@ class GoogleSheetsManager:
                         except ValueError:
                             pass
                     
-                    new_donation = OfflineDonation(
+                    db.session.add(OfflineDonation(
                         donor_id=donor_id if donor_id else None,
-                        worksheet=worksheet_name,
+                        worksheet=donation_data.get('purpose', ''),
                         donor_name=donation_data['donor_name'],
                         donor_email=donation_data['donor_email'],
                         donor_phone=donation_data['donor_phone'],
                         amount=donation_data['amount'],
                         currency=donation_data['currency'],
-                        purpose_id=purpose.id,
+                        purpose_id=purposes[donation_data['purpose']].id,
                         donation_date=donation_date,
                         payment_method=donation_data['payment_method'],
                         reference_number=donation_data['reference_number'],
                         notes=donation_data['notes'],
                         is_verified=donation_data['status'] == 'Verified',
-                        created_by=1  # Admin user
-                    )
-                    db.session.add(new_donation)
-                    synced_count += 1
+                        created_by=1,  # Admin user
+                        sheet_fingerprint=fingerprint
+                    ))
+                    inserted_count += 1
                     
                 except Exception as e:
                     print(f"⚠️  Error syncing donation: {e}")
                     continue
             
-            # STEP 4: Commit all changes
+            # STEP 6: Re-link rewritten rows, restore reappeared rows and soft-delete vanished ones
+            for fingerprint, donation_id in matched.items():
+                OfflineDonation.query.filter_by(id=donation_id).update({
+                    'sheet_fingerprint': fingerprint,
+                    'is_verified': sheet_rows[fingerprint]['status'] == 'Verified'
+                }, synchronize_session=False)
+            now = datetime.utcnow()
+            for batch_start in range(0, len(restore_ids), SYNC_BATCH_SIZE):
+                batch = restore_ids[batch_start:batch_start + SYNC_BATCH_SIZE]
+                OfflineDonation.query.filter(OfflineDonation.id.in_(batch)).update(
+                    {'deleted_at': None}, synchronize_session=False
+                )
+            for batch_start in range(0, len(stale_ids), SYNC_BATCH_SIZE):
+                batch = stale_ids[batch_start:batch_start + SYNC_BATCH_SIZE]
+                OfflineDonation.query.filter(OfflineDonation.id.in_(batch)).update(
+                    {'deleted_at': now}, synchronize_session=False
+                )
+            
+            # STEP 7: Commit everything at once
             db.session.commit()
-            
-            print(f"✅ Complete refresh successful: {synced_count} donations imported")
-            return True, f"Complete refresh: {synced_count} donations imported from {len(purposes_created)} worksheets"
+            if progress:
+                progress(
+                    phase='committed',
+                    rows_read=len(all_donations),
+                    rows_upserted=inserted_count + len(restore_ids) + len(matched),
+                    rows_skipped=unchanged_count,
+                    rows_removed=len(stale_ids)
+                )
+            
+            worksheet_count = len({d['purpose'] for d in all_donations})
+            print(f"✅ Incremental sync successful: {inserted_count} added, {len(matched)} updated, {len(restore_ids)} restored, "
+                  f"{len(stale_ids)} removed, {unchanged_count} unchanged")
+            return True, (f"Incremental sync: {inserted_count} added, {len(matched)} updated, {len(restore_ids)} restored, "
+                          f"{len(stale_ids)} removed, {unchanged_count} unchanged across {worksheet_count} worksheets")
             
         except Exception as e:
             db.session.rollback()
@@ -406,7 +654,7 @@ class GoogleSheetsManager:
     
     def is_connected(self):
         """Check if Google Sheets is connected"""
-        return self.spreadsheet is not None and self.client is not None
+        return self.spreadsheet is not None
     
     def get_sync_statistics(self):
         """Get statistics about the last sync operation"""
@@ -419,12 +667,15 @@ class GoogleSheetsManager:
                     'last_sync': None
                 }
             
-            worksheets = self.get_available_worksheets()
-            total_donations = 0
-            
-            for worksheet_name in worksheets:
-                donations = self.get_donations_by_worksheet(worksheet_name)
-                total_donations += len(donations)
+            # Reuse the connected client and read every worksheet in one batch
+            worksheets = self.get_worksheet_titles()
+            records_by_worksheet = self.batch_get_records(worksheets)
+            total_donations = sum(
+                1
+                for title, records in records_by_worksheet.items()
+                for record in records
+                if record_to_donation(record, title)
+            )
             
             return {
                 'connected': True,
@@ -461,65 +712,34 @@ class GoogleSheetsManager:
 
     def get_available_worksheets(self):
         """Get list of available worksheets"""
-        if not self._connect():
+        if not self._ensure_connected():
             return []
         
         try:
-            worksheets = self.spreadsheet.worksheets()
             # Filter out default 'Sheet1' and return only meaningful worksheet names
-            return [ws.title for ws in worksheets if ws.title != 'Sheet1']
+            return self.get_worksheet_titles()
         except Exception as e:
             print(f"❌ Error fetching worksheets: {e}")
             return []
 
     def get_donations_by_worksheet(self, worksheet_name):
         """Get donations from a specific worksheet"""
-        if not self._connect():
+        if not self._ensure_connected():
             return []
         
         try:
-            # Find the specific worksheet
-            worksheet = None
-            for ws in self.spreadsheet.worksheets():
-                if ws.title == worksheet_name:
-                    worksheet = ws
-                    break
-            
-            if not worksheet:
+            # Read just this worksheet's range; no worksheet listing needed
+            records_by_worksheet = self.batch_get_records([worksheet_name])
+            if worksheet_name not in records_by_worksheet:
                 print(f"⚠️  Worksheet '{worksheet_name}' not found")
                 return []
             
-            # Get all records from the worksheet
-            records = worksheet.get_all_records()
             donations = []
-            
-            for record in records:
-                # Skip empty rows
-                donor_name = record.get('Donor Name') or record.get('Donors Name', '')
-                amount = record.get('Amount') or record.get('Amount Collected', '')
-                if not donor_name and not amount:
-                    continue
-                
-                # Map the record to our donation format
-                donation = {
-                    'id': record.get('ID', ''),
-                    'donor_name': donor_name,
-                    'donor_email': record.get('Donor Email', ''),
-                    'donor_phone': record.get('Donor Phone', ''),
-                    'amount': float(amount) if amount else 0,
-                    'currency': record.get('Currency', 'INR'),
-                    'purpose': worksheet.title,
-                    'donation_date': record.get('Donation Date', ''),
-                    'payment_method': record.get('Payment Method', 'Cash'),
-                    'reference_number': record.get('Reference Number', ''),
-                    'notes': record.get('Notes', ''),
-                    'status': record.get('Status', 'Verified'),
-                    'created_at': record.get('Created At', ''),
-                    'created_by': record.get('Created By', ''),
-                    'worksheet': worksheet.title
-                }
-                
-                donations.append(donation)
+            for record in records_by_worksheet[worksheet_name]:
+                donation = record_to_donation(record, worksheet_name)
+                if donation:
+                    donation['worksheet'] = worksheet_name
+                    donations.append(donation)
             
             # Sort by donation date (most recent first)
             donations.sort(key=lambda x: x.get('donation_date', ''), reverse=True)
@@ -531,7 +751,7 @@ class GoogleSheetsManager:
 
     def get_worksheet_summary(self, worksheet_name):
         """Get summary statistics for a specific worksheet"""
-        if not self._connect():
+        if not self._ensure_connected():
             return {}
         
         try:
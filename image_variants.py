@@ -0,0 +1,224 @@
+"""
+Resized, re-encoded variants of the photos under static/images.
+
+Templates embed images through image_attrs(), which emits src plus a
+srcset of /img/<hash>/<width>/<path> URLs, sizes, and lazy-loading
+attributes, so browsers download only the width they will display. Each
+variant is generated on first request with Pillow, in the best format the
+browser accepts (AVIF, then WebP, else the source format), and cached on
+disk in IMAGE_CACHE_DIR under the source's content hash: a changed source
+gets new URLs and new files, and old variants are never served for it.
+`flask build-image-variants` generates everything ahead of time.
+"""
+
+import os
+import threading
+from io import BytesIO
+from flask import current_app, request, url_for, send_file, redirect, abort
+from markupsafe import Markup, escape
+from static_assets import asset_digest, static_url, ASSET_MAX_AGE
+try:
+    from PIL import Image, ImageOps, ExifTags, features
+    PILLOW_AVAILABLE = True
+except ImportError:
+    PILLOW_AVAILABLE = False
+
+# Variant widths in pixels; sources are never upscaled
+IMAGE_WIDTHS = (64, 128, 256, 480, 768, 1280, 1920)
+
+# Only photos under these static paths get variants
+IMAGE_PATHS = ('images/',)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Where generated variants are kept (outside static/, so they aren't fingerprinted)
+IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'image_cache'))
+
+# Output formats, most preferred first: (mimetype, file extension, Pillow format, save options)
+VARIANT_FORMATS = (
+    ('image/avif', 'avif', 'AVIF', {'quality': 55, 'speed': 6}),
+    ('image/webp', 'webp', 'WEBP', {'quality': 80, 'method': 6}),
+)
+
+# For browsers that accept neither, keyed by the source's Pillow format
+FALLBACK_FORMATS = {
+    'JPEG': ('image/jpeg', 'jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'PNG': ('image/png', 'png', 'PNG', {'optimize': True}),
+}
+
+# EXIF orientations that turn the image sideways
+_ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+_sources = {}     # source digest -> (upright width, upright height, Pillow format)
+_locks = {}       # variant path -> lock, so each variant is encoded once per process
+_lock = threading.Lock()
+
+
+def _supported_formats():
+    if not PILLOW_AVAILABLE:
+        return ()
+    return tuple(fmt for fmt in VARIANT_FORMATS if features.check(fmt[1]))
+
+
+def _fallback_format(image_format):
+    return FALLBACK_FORMATS.get(image_format, FALLBACK_FORMATS['JPEG'])
+
+
+def _has_variants(filename):
+    return (
+        PILLOW_AVAILABLE
+        and filename.startswith(IMAGE_PATHS)
+        and filename.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def _source_info(filename, digest):
+    """(width, height, format) of a source image, read from its header once"""
+    info = _sources.get(digest)
+    if info is None:
+        try:
+            with Image.open(os.path.join(current_app.static_folder, filename)) as image:
+                width, height = image.size
+                if image.getexif().get(ExifTags.Base.Orientation) in _ROTATED_ORIENTATIONS:
+                    # Variants are stored upright
+                    width, height = height, width
+                info = (width, height, image.format)
+        except Exception as e:
+            print(f"⚠️  Could not read image {filename}: {e}")
+            return None
+        with _lock:
+            _sources[digest] = info
+    return info
+
+
+def variant_widths(filename, digest):
+    """Widths offered for an image: the fixed widths below its own, plus its own"""
+    info = _source_info(filename, digest)
+    if info is None:
+        return ()
+    width = info[0]
+    widths = [w for w in IMAGE_WIDTHS if w < width]
+    if width <= IMAGE_WIDTHS[-1]:
+        widths.append(width)
+    return tuple(widths)
+
+
+def image_attrs(filename, sizes='100vw', lazy=True):
+    """src, srcset, sizes and loading attributes for an <img> of a static image
+
+    sizes is the displayed width (a CSS length or media-query list). Pass
+    lazy=False for images visible on load, such as page headers.
+    """
+    attrs = [('src', static_url(filename))]
+    digest = asset_digest(filename)
+    if digest and _has_variants(filename):
+        widths = variant_widths(filename, digest)
+        if widths:
+            attrs.append(('srcset', ', '.join(
+                f"{url_for('image_variant', digest=digest, width=w, filename=filename)} {w}w" for w in widths
+            )))
+            attrs.append(('sizes', sizes))
+    if lazy:
+        attrs.append(('loading', 'lazy'))
+    attrs.append(('decoding', 'async'))
+    return Markup(' '.join(f'{name}="{escape(value)}"' for name, value in attrs))
+
+
+def _encode_variant(source_path, width, fmt):
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        if fmt[2] == 'JPEG' or not has_alpha:
+            image = image.convert('RGB')
+        elif image.mode != 'RGBA':
+            image = image.convert('RGBA')
+        buffer = BytesIO()
+        # Saved without EXIF: the variant is already upright and metadata is just weight
+        image.save(buffer, format=fmt[2], **fmt[3])
+    return buffer.getvalue()
+
+
+def get_variant(filename, digest, width, fmt):
+    """Path of a cached variant, generating it if needed"""
+    target = os.path.join(IMAGE_CACHE_DIR, digest, f"{width}.{fmt[1]}")
+    if os.path.exists(target):
+        return target
+
+    with _lock:
+        lock = _locks.setdefault(target, threading.Lock())
+    with lock:
+        if not os.path.exists(target):
+            data = _encode_variant(os.path.join(current_app.static_folder, filename), width, fmt)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # Write to a temp file and swap it in, so other workers never serve a partial file
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+    with _lock:
+        _locks.pop(target, None)
+    return target
+
+
+def image_variant(digest, width, filename):
+    """Serve one width of a static image in the best format the browser accepts"""
+    current = asset_digest(filename)
+    if current is None or not _has_variants(filename):
+        abort(404)
+    if digest != current:
+        # Rendered before the image changed - send the current version
+        return redirect(static_url(filename))
+    if width not in variant_widths(filename, digest):
+        abort(404)
+
+    # Exact matches only: */* doesn't mean the browser can decode AVIF
+    accept = {value for value, quality in request.accept_mimetypes if quality > 0}
+    fmt = next(
+        (fmt for fmt in _supported_formats() if fmt[0] in accept),
+        _fallback_format(_source_info(filename, digest)[2])
+    )
+    try:
+        path = get_variant(filename, digest, width, fmt)
+    except Exception as e:
+        print(f"⚠️  Could not generate {fmt[1]} variant of {filename} at {width}px: {e}")
+        return redirect(static_url(filename))
+
+    response = send_file(path, mimetype=fmt[0], max_age=ASSET_MAX_AGE)
+    response.vary.add('Accept')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def build_image_variants(static_folder):
+    """Generate every variant of every image ahead of time; returns counters"""
+    stats = {'images': 0, 'variants': 0, 'errors': 0}
+    for root, dirs, files in os.walk(static_folder):
+        for name in files:
+            filename = os.path.relpath(os.path.join(root, name), static_folder).replace(os.sep, '/')
+            digest = asset_digest(filename)
+            if digest is None or not _has_variants(filename):
+                continue
+            stats['images'] += 1
+            try:
+                widths = variant_widths(filename, digest)
+                if not widths:
+                    raise ValueError("unreadable image")
+                formats = _supported_formats() + (_fallback_format(_source_info(filename, digest)[2]),)
+                for width in widths:
+                    for fmt in formats:
+                        get_variant(filename, digest, width, fmt)
+                        stats['variants'] += 1
+            except Exception as e:
+                stats['errors'] += 1
+                print(f"⚠️  Could not generate variants of {filename}: {e}")
+    return stats
+
+
+def init_image_variants(app):
+    """Register image_attrs() and the /img/ route (after init_static_assets)"""
+    app.add_template_global(image_attrs)
+    app.add_url_rule('/img/<digest>/<int:width>/<path:filename>', 'image_variant', image_variant)
+    if not PILLOW_AVAILABLE:
+        print("⚠️  Pillow not installed, images are served at full size only")
@@ -0,0 +1,201 @@
+"""
+Local, file-backed stand-in for the Google Sheets spreadsheet.
+
+Each worksheet is a CSV file (header row first) in a directory. The classes
+implement the part of gspread's Spreadsheet/Worksheet API that
+GoogleSheetsManager uses, so sync, append and summary code paths run
+unchanged without credentials or network. Select it with
+SHEETS_BACKEND=local (and LOCAL_SHEETS_DIR for the directory).
+
+Every API-equivalent call is counted in `request_count`, and an optional
+per-call `latency` (seconds) can emulate Google API round trips.
+"""
+
+import csv
+import os
+import random
+import time
+from datetime import date, timedelta
+import gspread
+from gspread.utils import a1_range_to_grid_range
+
+
+def _trim(values):
+    """Drop trailing empty cells and rows, like the Sheets API does"""
+    trimmed = []
+    for row in values:
+        row = list(row)
+        while row and row[-1] == '':
+            row.pop()
+        trimmed.append(row)
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+
+def _cell(value):
+    """Store a cell the way Sheets formats it (booleans as TRUE/FALSE)"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    return str(value)
+
+
+class LocalWorksheet:
+    """A worksheet backed by one CSV file"""
+
+    def __init__(self, spreadsheet, title):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.path = os.path.join(spreadsheet.directory, f"{title}.csv")
+
+    def _read(self):
+        with open(self.path, newline='', encoding='utf-8') as f:
+            return [row for row in csv.reader(f)]
+
+    def _write(self, rows):
+        # Write to a temp file and swap it in, so readers never see a partial file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(rows)
+        os.replace(tmp_path, self.path)
+
+    def get(self, range_name=None):
+        """Values of an A1 range ('A:B', 'A2:N10') or of the whole sheet"""
+        self.spreadsheet._request()
+        rows = self._read()
+        if range_name:
+            grid = a1_range_to_grid_range(range_name)
+            rows = rows[grid.get('startRowIndex', 0):grid.get('endRowIndex')]
+            rows = [row[grid.get('startColumnIndex', 0):grid.get('endColumnIndex')] for row in rows]
+        return _trim(rows)
+
+    def get_all_values(self):
+        return self.get()
+
+    def get_all_records(self):
+        from google_sheets import values_to_records
+        return values_to_records(self.get())
+
+    def append_row(self, values):
+        self.append_rows([values])
+
+    def append_rows(self, values):
+        self.spreadsheet._request()
+        with open(self.path, 'a', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows([[_cell(value) for value in row] for row in values])
+
+    def update(self, range_name, values):
+        self.batch_update([{'range': range_name, 'values': values}])
+
+    def batch_update(self, data):
+        """Write several A1 ranges in one call, growing the sheet as needed"""
+        self.spreadsheet._request()
+        rows = self._read()
+        for update in data:
+            grid = a1_range_to_grid_range(update['range'])
+            start_row = grid.get('startRowIndex', 0)
+            start_col = grid.get('startColumnIndex', 0)
+            for row_offset, values in enumerate(update['values']):
+                row_index = start_row + row_offset
+                while len(rows) <= row_index:
+                    rows.append([])
+                row = rows[row_index]
+                end_col = start_col + len(values)
+                if len(row) < end_col:
+                    row.extend([''] * (end_col - len(row)))
+                row[start_col:end_col] = [_cell(value) for value in values]
+        self._write(rows)
+
+
+class LocalSpreadsheet:
+    """A spreadsheet backed by a directory of CSV worksheets"""
+
+    def __init__(self, directory, latency=0):
+        self.directory = directory
+        self.latency = latency
+        self.request_count = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _request(self):
+        self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _titles(self):
+        return sorted(
+            name[:-len('.csv')] for name in os.listdir(self.directory) if name.endswith('.csv')
+        )
+
+    def worksheets(self):
+        self._request()
+        return [LocalWorksheet(self, title) for title in self._titles()]
+
+    def worksheet(self, title):
+        self._request()
+        if title not in self._titles():
+            raise gspread.WorksheetNotFound(title)
+        return LocalWorksheet(self, title)
+
+    def add_worksheet(self, title, rows=1000, cols=20):
+        self._request()
+        worksheet = LocalWorksheet(self, title)
+        open(worksheet.path, 'a', encoding='utf-8').close()
+        return worksheet
+
+    def values_batch_get(self, ranges, params=None):
+        """Read whole worksheets named by absolute ranges ("'Title'") in one call"""
+        self._request()
+        value_ranges = []
+        for range_name in ranges:
+            title = range_name
+            if title.startswith("'") and title.endswith("'"):
+                title = title[1:-1].replace("''", "'")
+            worksheet = LocalWorksheet(self, title)
+            if not os.path.exists(worksheet.path):
+                raise gspread.WorksheetNotFound(title)
+            value_ranges.append({'range': range_name, 'values': _trim(worksheet._read())})
+        return {'valueRanges': value_ranges}
+
+
+def generate_synthetic_spreadsheet(directory, rows=100000, worksheets=5, seed=0):
+    """Fill a local spreadsheet directory with synthetic donation worksheets
+
+    Rows are spread evenly across the worksheets and use the same columns
+    as worksheets created by GoogleSheetsManager. Existing worksheets with
+    the same names are replaced. Returns the list of worksheet titles.
+    """
+    from google_sheets import WORKSHEET_HEADERS
+
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    titles = [f"Synthetic Purpose {n + 1}" for n in range(worksheets)]
+    first_date = date.today() - timedelta(days=3 * 365)
+
+    donation_id = 1
+    for index, title in enumerate(titles):
+        count = rows // worksheets + (1 if index < rows % worksheets else 0)
+        with open(os.path.join(directory, f"{title}.csv"), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(WORKSHEET_HEADERS + ['Doner_ID'])
+            for _ in range(count):
+                writer.writerow([
+                    donation_id,
+                    f"Donor {rng.randint(1, rows)}",
+                    f"donor{donation_id}@example.com",
+                    f"9{rng.randint(100000000, 999999999)}",
+                    rng.choice([101, 251, 501, 1001, 2100, 5001]),
+                    'INR',
+                    title,
+                    (first_date + timedelta(days=rng.randint(0, 3 * 365))).isoformat(),
+                    rng.choice(['Cash', 'UPI', 'Bank Transfer', 'Cheque']),
+                    f"REF{donation_id:08d}",
+                    '',
+                    'Verified' if rng.random() < 0.8 else 'Pending',
+                    '',
+                    'synthetic',
+                    donation_id
+                ])
+                donation_id += 1
+    return titles
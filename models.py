@@ -2,9 +2,49 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from collections import namedtuple
+from types import MappingProxyType
 
 db = SQLAlchemy()
 
+StageDefinition = namedtuple('StageDefinition', ['stage_id', 'key', 'name', 'path', 'default_access'])
+
+# Stage registry. Adding a stage only needs a new entry here - access and
+# progress rows live in UserStageProgress, so no schema change is required.
+# `key` is the prefix of the legacy User columns (e.g. mandala_2_access).
+STAGES = [
+    # Bhairava Padathi
+    StageDefinition(1, 'mandala_1', 'Mandala 1', 'bhairava', True),  # All users get access to Mandala 1
+    StageDefinition(2, 'mandala_2', 'Mandala 2', 'bhairava', False),
+    StageDefinition(3, 'mandala_3', 'Mandala 3', 'bhairava', False),
+    StageDefinition(4, 'rudraksha_8_mukhi', 'Rudraksha 8 Mukhi', 'bhairava', False),
+    StageDefinition(5, 'rudraksha_11_mukhi', 'Rudraksha 11 Mukhi', 'bhairava', False),
+    StageDefinition(6, 'rudraksha_14_mukhi', 'Rudraksha 14 Mukhi', 'bhairava', False),
+    StageDefinition(7, 'pratham_charana_diksha', 'Pratham Charana Diksha', 'bhairava', False),
+    StageDefinition(8, 'dutiya_charana', 'Dutiya Charana', 'bhairava', False),
+    StageDefinition(9, 'tritiya_charana', 'Tritiya Charana', 'bhairava', False),
+    # Devi Padathi - Kamakhya Sadhana
+    StageDefinition(101, 'devi_mandala_1', 'Devi Mandala 1 (33 days)', 'devi', True),  # All approved users get access
+    StageDefinition(102, 'devi_mandala_2', 'Devi Mandala 2 (66 days)', 'devi', False),
+    StageDefinition(103, 'devi_mandala_3', 'Devi Mandala 3 (99 days)', 'devi', False),
+]
+STAGES_BY_ID = {stage.stage_id: stage for stage in STAGES}
+
+# Bit of each stage in User.stage_access_mask (registry order - only append new stages)
+STAGE_BITS = {stage.stage_id: 1 << index for index, stage in enumerate(STAGES)}
+DEFAULT_STAGE_ACCESS_MASK = sum(STAGE_BITS[stage.stage_id] for stage in STAGES if stage.default_access)
+
+def current_stage_from_mask(access_mask):
+    """Get the current Bhairava stage (1-6) for a stage access mask"""
+    for stage in [1, 2, 3, 4, 5, 6]:
+        if not access_mask & STAGE_BITS[stage]:
+            return stage - 1 if stage > 1 else 1
+    return 6  # All stages completed
+
+# Immutable per-request view of a user's stage progress. `stages` maps
+# stage id -> read-only get_stage_info() mapping.
+StageProgressSnapshot = namedtuple('StageProgressSnapshot', ['access_mask', 'current_stage', 'next_required_stage', 'stages'])
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -28,51 +68,10 @@ class User(UserMixin, db.Model):
     # Profile picture
     profile_picture = db.Column(db.String(255), nullable=True)  # Path to profile picture
     
-    # Mandala access permissions
-    mandala_1_access = db.Column(db.Boolean, default=True)  # All users get access to Mandala 1
-    mandala_2_access = db.Column(db.Boolean, default=False)  # Admin must approve
-    mandala_3_access = db.Column(db.Boolean, default=False)  # Admin must approve
-
-    # Rudraksha access permissions
-    rudraksha_8_mukhi_access = db.Column(db.Boolean, default=False)  # Admin must approve
-    rudraksha_11_mukhi_access = db.Column(db.Boolean, default=False)  # Admin must approve
-    rudraksha_14_mukhi_access = db.Column(db.Boolean, default=False)  # Admin must approve
-    
-    # Pratham Charana Diksha (Stage 7) - Introduction to Rudraksha Diksha
-    pratham_charana_diksha_access = db.Column(db.Boolean, default=False)  # Admin must approve
-    
-    # Dutiya Charana (Stage 8) - Second Phase
-    dutiya_charana_access = db.Column(db.Boolean, default=False)  # Admin must approve
-    
-    # Tritiya Charana (Stage 9) - Third Phase
-    tritiya_charana_access = db.Column(db.Boolean, default=False)  # Admin must approve
-
-    # Devi Mandala access permissions (for Devi Padathi - Kamakhya Sadhana)
-    devi_mandala_1_access = db.Column(db.Boolean, default=True)  # All approved users get access
-    devi_mandala_2_access = db.Column(db.Boolean, default=False)  # Admin must approve
-    devi_mandala_3_access = db.Column(db.Boolean, default=False)  # Admin must approve
-
-    # Stage completion dates
-    mandala_1_completed_at = db.Column(db.DateTime, nullable=True)
-    mandala_2_completed_at = db.Column(db.DateTime, nullable=True)
-    mandala_3_completed_at = db.Column(db.DateTime, nullable=True)
-    rudraksha_8_mukhi_completed_at = db.Column(db.DateTime, nullable=True)
-    rudraksha_11_mukhi_completed_at = db.Column(db.DateTime, nullable=True)
-    rudraksha_14_mukhi_completed_at = db.Column(db.DateTime, nullable=True)
-    pratham_charana_diksha_completed_at = db.Column(db.DateTime, nullable=True)
-    dutiya_charana_completed_at = db.Column(db.DateTime, nullable=True)
-    tritiya_charana_completed_at = db.Column(db.DateTime, nullable=True)
-
-    # Stage start dates (for duration calculation)
-    mandala_1_started_at = db.Column(db.DateTime, nullable=True)
-    mandala_2_started_at = db.Column(db.DateTime, nullable=True)
-    mandala_3_started_at = db.Column(db.DateTime, nullable=True)
-    rudraksha_8_mukhi_started_at = db.Column(db.DateTime, nullable=True)
-    rudraksha_11_mukhi_started_at = db.Column(db.DateTime, nullable=True)
-    rudraksha_14_mukhi_started_at = db.Column(db.DateTime, nullable=True)
-    pratham_charana_diksha_started_at = db.Column(db.DateTime, nullable=True)
-    dutiya_charana_started_at = db.Column(db.DateTime, nullable=True)
-    tritiya_charana_started_at = db.Column(db.DateTime, nullable=True)
+    # Stage access and progress live in UserStageProgress (see STAGES); the
+    # access flags are mirrored in a bitmask (STAGE_BITS) for O(1) checks
+    stage_access_mask = db.Column(db.Integer, nullable=False, default=DEFAULT_STAGE_ACCESS_MASK, index=True)
+    stage_progress = db.relationship('UserStageProgress', backref='user', cascade='all, delete-orphan')
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -86,35 +85,48 @@ class User(UserMixin, db.Model):
     def can_login(self):
         return self.is_active and (self.is_admin() or self.is_approved)
     
+    def get_stage_progress(self, stage_number, create=False):
+        """Get the progress row for a stage, optionally creating it with the stage defaults"""
+        for progress in self.stage_progress:
+            if progress.stage_id == stage_number:
+                return progress
+        stage = STAGES_BY_ID.get(stage_number)
+        if create and stage:
+            progress = UserStageProgress(stage_id=stage_number, has_access=stage.default_access)
+            self.stage_progress.append(progress)
+            return progress
+        return None
+
+    def get_stage_access_mask(self):
+        """Stage access bitmask (the column default until the user is saved)"""
+        if self.stage_access_mask is None:
+            return DEFAULT_STAGE_ACCESS_MASK
+        return self.stage_access_mask
+
     def has_mandala_access(self, stage_number):
-        """Check if user has access to a specific stage (mandala or rudraksha)"""
-        if stage_number == 1:
-            return self.mandala_1_access
-        elif stage_number == 2:
-            return self.mandala_2_access
-        elif stage_number == 3:
-            return self.mandala_3_access
-        elif stage_number == 4:  # Rudraksha 8 Mukhi
-            return self.rudraksha_8_mukhi_access
-        elif stage_number == 5:  # Rudraksha 11 Mukhi
-            return self.rudraksha_11_mukhi_access
-        elif stage_number == 6:  # Rudraksha 14 Mukhi
-            return self.rudraksha_14_mukhi_access
-        elif stage_number == 7:  # Pratham Charana Diksha
-            return self.pratham_charana_diksha_access
-        elif stage_number == 8:  # Dutiya Charana
-            return self.dutiya_charana_access
-        elif stage_number == 9:  # Tritiya Charana
-            return self.tritiya_charana_access
-        return False
+        """Check if user has access to a specific stage (mandala, rudraksha, charana or devi)"""
+        stage_bit = STAGE_BITS.get(stage_number, 0)
+        return bool(self.get_stage_access_mask() & stage_bit)
+
+    def set_stage_access(self, stage_number, has_access):
+        """Grant or revoke access to a stage"""
+        progress = self.get_stage_progress(stage_number, create=True)
+        if progress:
+            progress.has_access = bool(has_access)
+            if has_access:
+                self.stage_access_mask = self.get_stage_access_mask() | STAGE_BITS[stage_number]
+            else:
+                self.stage_access_mask = self.get_stage_access_mask() & ~STAGE_BITS[stage_number]
+            self._clear_progress_snapshot()
+
+    @classmethod
+    def stage_access_filter(cls, stage_number):
+        """Query filter for users with access to a stage (a bit test on stage_access_mask)"""
+        return cls.stage_access_mask.op('&')(STAGE_BITS[stage_number]) != 0
 
     def get_current_stage(self):
         """Get the current stage the user is on (1-6)"""
-        stages = [1, 2, 3, 4, 5, 6]
-        for stage in stages:
-            if not self.has_mandala_access(stage):
-                return stage - 1 if stage > 1 else 1
-        return 6  # All stages completed
+        return current_stage_from_mask(self.get_stage_access_mask())
 
     def get_next_required_stage(self):
         """Get the next stage that needs to be completed"""
@@ -123,147 +135,150 @@ class User(UserMixin, db.Model):
             return current + 1
         return None  # All stages completed
 
+    def get_progress_snapshot(self):
+        """Get the user's stage progress, computed once and reused until it changes"""
+        snapshot = self.__dict__.get('_progress_snapshot')
+        if snapshot is None:
+            access_mask = self.get_stage_access_mask()
+            progress_by_stage = {progress.stage_id: progress for progress in self.stage_progress}
+            now = datetime.utcnow()
+
+            stages = {}
+            for stage in STAGES:
+                progress = progress_by_stage.get(stage.stage_id)
+                start_date = progress.started_at if progress else None
+                completion_date = progress.completed_at if progress else None
+                if start_date:
+                    # Stage still in progress counts up to now
+                    duration_days = ((completion_date or now) - start_date).days
+                else:
+                    duration_days = 0
+                stages[stage.stage_id] = MappingProxyType({
+                    'stage_number': stage.stage_id,
+                    'stage_name': stage.name,
+                    'has_access': bool(access_mask & STAGE_BITS[stage.stage_id]),
+                    'is_completed': completion_date is not None,
+                    'completion_date': completion_date,
+                    'start_date': start_date,
+                    'duration_days': duration_days
+                })
+
+            current_stage = current_stage_from_mask(access_mask)
+            snapshot = StageProgressSnapshot(
+                access_mask=access_mask,
+                current_stage=current_stage,
+                next_required_stage=current_stage + 1 if current_stage < 6 else None,
+                stages=MappingProxyType(stages)
+            )
+            self._progress_snapshot = snapshot
+        return snapshot
+
+    def _clear_progress_snapshot(self):
+        self.__dict__.pop('_progress_snapshot', None)
+
+    def is_stage_started(self, stage_number):
+        """Check if a specific stage has been started"""
+        return self.get_stage_info(stage_number)['start_date'] is not None
+
     def is_stage_completed(self, stage_number):
         """Check if a specific stage is completed"""
-        completion_dates = {
-            1: self.mandala_1_completed_at,
-            2: self.mandala_2_completed_at,
-            3: self.mandala_3_completed_at,
-            4: self.rudraksha_8_mukhi_completed_at,
-            5: self.rudraksha_11_mukhi_completed_at,
-            6: self.rudraksha_14_mukhi_completed_at,
-            7: self.pratham_charana_diksha_completed_at,
-            8: self.dutiya_charana_completed_at,
-            9: self.tritiya_charana_completed_at
-        }
-        return completion_dates.get(stage_number) is not None
+        return self.get_stage_info(stage_number)['is_completed']
 
     def get_stage_duration_days(self, stage_number):
         """Get duration spent on a specific stage in days"""
-        start_dates = {
-            1: self.mandala_1_started_at,
-            2: self.mandala_2_started_at,
-            3: self.mandala_3_started_at,
-            4: self.rudraksha_8_mukhi_started_at,
-            5: self.rudraksha_11_mukhi_started_at,
-            6: self.rudraksha_14_mukhi_started_at,
-            7: self.pratham_charana_diksha_started_at,
-            8: self.dutiya_charana_started_at,
-            9: self.tritiya_charana_started_at
-        }
-        completion_dates = {
-            1: self.mandala_1_completed_at,
-            2: self.mandala_2_completed_at,
-            3: self.mandala_3_completed_at,
-            4: self.rudraksha_8_mukhi_completed_at,
-            5: self.rudraksha_11_mukhi_completed_at,
-            6: self.rudraksha_14_mukhi_completed_at,
-            7: self.pratham_charana_diksha_completed_at,
-            8: self.dutiya_charana_completed_at,
-            9: self.tritiya_charana_completed_at
-        }
-
-        start_date = start_dates.get(stage_number)
-        completion_date = completion_dates.get(stage_number)
-
-        if start_date and completion_date:
-            return (completion_date - start_date).days
-        elif start_date and not completion_date:
-            # Stage started but not completed
-            return (datetime.utcnow() - start_date).days
-        return 0
+        return self.get_stage_info(stage_number)['duration_days']
 
     def complete_stage(self, stage_number):
         """Mark a stage as completed and set completion date"""
-        from datetime import datetime
-
-        completion_dates = {
-            1: 'mandala_1_completed_at',
-            2: 'mandala_2_completed_at',
-            3: 'mandala_3_completed_at',
-            4: 'rudraksha_8_mukhi_completed_at',
-            5: 'rudraksha_11_mukhi_completed_at',
-            6: 'rudraksha_14_mukhi_completed_at',
-            7: 'pratham_charana_diksha_completed_at',
-            8: 'dutiya_charana_completed_at',
-            9: 'tritiya_charana_completed_at'
-        }
-
-        field_name = completion_dates.get(stage_number)
-        if field_name:
-            setattr(self, field_name, datetime.utcnow())
+        progress = self.get_stage_progress(stage_number, create=True)
+        if progress:
+            progress.completed_at = datetime.utcnow()
+            self._clear_progress_snapshot()
 
     def start_stage(self, stage_number):
         """Mark a stage as started and set start date"""
-        from datetime import datetime
-
-        start_dates = {
-            1: 'mandala_1_started_at',
-            2: 'mandala_2_started_at',
-            3: 'mandala_3_started_at',
-            4: 'rudraksha_8_mukhi_started_at',
-            5: 'rudraksha_11_mukhi_started_at',
-            6: 'rudraksha_14_mukhi_started_at',
-            7: 'pratham_charana_diksha_started_at',
-            8: 'dutiya_charana_started_at',
-            9: 'tritiya_charana_started_at'
-        }
+        progress = self.get_stage_progress(stage_number, create=True)
+        if progress:
+            progress.started_at = datetime.utcnow()
+            self._clear_progress_snapshot()
 
-        field_name = start_dates.get(stage_number)
-        if field_name:
-            setattr(self, field_name, datetime.utcnow())
+    def reset_stage(self, stage_number):
+        """Clear the start and completion dates of a stage"""
+        progress = self.get_stage_progress(stage_number)
+        if progress:
+            progress.started_at = None
+            progress.completed_at = None
+            self._clear_progress_snapshot()
 
     def get_stage_info(self, stage_number):
-        """Get comprehensive info about a stage"""
-        stage_names = {
-            1: 'Mandala 1',
-            2: 'Mandala 2',
-            3: 'Mandala 3',
-            4: 'Rudraksha 8 Mukhi',
-            5: 'Rudraksha 11 Mukhi',
-            6: 'Rudraksha 14 Mukhi',
-            7: 'Pratham Charana Diksha',
-            8: 'Dutiya Charana',
-            9: 'Tritiya Charana'
-        }
+        """Get comprehensive info about a stage (read-only, from the progress snapshot)"""
+        info = self.get_progress_snapshot().stages.get(stage_number)
+        if info is None:
+            return MappingProxyType({
+                'stage_number': stage_number,
+                'stage_name': 'Unknown',
+                'has_access': False,
+                'is_completed': False,
+                'completion_date': None,
+                'start_date': None,
+                'duration_days': 0
+            })
+        return info
+    
+    def __repr__(self):
+        return f'<User {self.username}>'
 
-        # Get completion and start dates based on stage number
-        completion_dates = {
-            1: self.mandala_1_completed_at,
-            2: self.mandala_2_completed_at,
-            3: self.mandala_3_completed_at,
-            4: self.rudraksha_8_mukhi_completed_at,
-            5: self.rudraksha_11_mukhi_completed_at,
-            6: self.rudraksha_14_mukhi_completed_at,
-            7: self.pratham_charana_diksha_completed_at,
-            8: self.dutiya_charana_completed_at,
-            9: self.tritiya_charana_completed_at
-        }
+class UserStageProgress(db.Model):
+    """Model for a user's access to and progress through one stage of STAGES"""
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'stage_id', name='uq_user_stage_progress_user_stage'),
+        db.Index('ix_user_stage_progress_stage_access', 'stage_id', 'has_access'),
+    )
 
-        start_dates = {
-            1: self.mandala_1_started_at,
-            2: self.mandala_2_started_at,
-            3: self.mandala_3_started_at,
-            4: self.rudraksha_8_mukhi_started_at,
-            5: self.rudraksha_11_mukhi_started_at,
-            6: self.rudraksha_14_mukhi_started_at,
-            7: self.pratham_charana_diksha_started_at,
-            8: self.dutiya_charana_started_at,
-            9: self.tritiya_charana_started_at
-        }
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    stage_id = db.Column(db.Integer, nullable=False)  # STAGES registry id (1-9, 101-103)
+    has_access = db.Column(db.Boolean, default=False, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    @classmethod
+    def users_with_access(cls, stage_id):
+        """Query users with access to a stage (indexed on stage_id, has_access)"""
+        if STAGES_BY_ID[stage_id].default_access:
+            # Users without a row have the default (open) access
+            revoked = db.session.query(cls.user_id).filter(cls.stage_id == stage_id, cls.has_access.is_(False))
+            return User.query.filter(~User.id.in_(revoked))
+        return User.query.join(cls, cls.user_id == User.id).filter(
+            cls.stage_id == stage_id, cls.has_access.is_(True)
+        )
 
-        return {
-            'stage_number': stage_number,
-            'stage_name': stage_names.get(stage_number, 'Unknown'),
-            'has_access': self.has_mandala_access(stage_number),
-            'is_completed': self.is_stage_completed(stage_number),
-            'completion_date': completion_dates.get(stage_number),
-            'start_date': start_dates.get(stage_number),
-            'duration_days': self.get_stage_duration_days(stage_number)
-        }
-    
     def __repr__(self):
-        return f'<User {self.username}>'
+        return f'<UserStageProgress user={self.user_id} stage={self.stage_id}>'
+
+def _stage_field_property(stage_id, field):
+    """Expose a stage progress field under its legacy User column name"""
+    def getter(self):
+        if field == 'has_access':
+            return self.has_mandala_access(stage_id)
+        progress = self.get_stage_progress(stage_id)
+        return getattr(progress, field) if progress else None
+
+    def setter(self, value):
+        if field == 'has_access':
+            self.set_stage_access(stage_id, value)
+        else:
+            setattr(self.get_stage_progress(stage_id, create=True), field, value)
+            self._clear_progress_snapshot()
+
+    return property(getter, setter)
+
+# Keep user.mandala_2_access, user.rudraksha_8_mukhi_started_at, ... working
+# for templates and existing callers
+for _stage in STAGES:
+    setattr(User, f'{_stage.key}_access', _stage_field_property(_stage.stage_id, 'has_access'))
+    setattr(User, f'{_stage.key}_started_at', _stage_field_property(_stage.stage_id, 'started_at'))
+    setattr(User, f'{_stage.key}_completed_at', _stage_field_property(_stage.stage_id, 'completed_at'))
 
 class DonationPurpose(db.Model):
     """Model for donation purposes/categories"""
@@ -301,6 +316,10 @@ class OfflineDonation(db.Model):
     verified_at = db.Column(db.DateTime, nullable=True)
     verified_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     
+    # Google Sheets sync tracking
+    sheet_fingerprint = db.Column(db.String(64), nullable=True, index=True)  # Hash of worksheet + row content
+    deleted_at = db.Column(db.DateTime, nullable=True)  # Soft delete when the row vanishes from the sheet
+    
     # Relationships
     purpose = db.relationship('DonationPurpose', backref='donations')
     creator = db.relationship('User', foreign_keys=[created_by], backref='created_donations')
@@ -359,28 +378,24 @@ class StageAccessRequest(db.Model):
     
     def get_stage_name(self):
         """Get human-readable stage name"""
-        stage_names = {
-            1: 'Mandala 1',
-            2: 'Mandala 2',
-            3: 'Mandala 3',
-            4: 'Rudraksha 8 Mukhi',
-            5: 'Rudraksha 11 Mukhi',
-            6: 'Rudraksha 14 Mukhi',
-            7: 'Pratham Charana Diksha',
-            8: 'Dutiya Charana',
-            9: 'Tritiya Charana',
-            # Devi Mandala stages (Devi Padathi - Kamakhya Sadhana)
-            101: 'Devi Mandala 1 (33 days)',
-            102: 'Devi Mandala 2 (66 days)',
-            103: 'Devi Mandala 3 (99 days)'
-        }
-        return stage_names.get(self.stage_number, f'Stage {self.stage_number}')
+        stage = STAGES_BY_ID.get(self.stage_number)
+        return stage.name if stage else f'Stage {self.stage_number}'
     
     def __repr__(self):
         return f'<StageAccessRequest {self.user.username} - Stage {self.stage_number} - {self.status}>'
 
 class ChatMessage(db.Model):
     """Model for chat messages between users and admin"""
+    __table_args__ = (
+        db.Index('ix_chat_message_conversation_id', 'conversation_id', 'id'),
+        db.Index('ix_chat_message_sender_timestamp', 'sender_id', 'timestamp'),
+        db.Index('ix_chat_message_recipient_admin_timestamp', 'recipient_id', 'is_from_admin', 'timestamp'),
+        # Partial index: only unread messages from users (the admins' unread count)
+        db.Index('ix_chat_message_unread', 'id',
+                 postgresql_where=db.text('is_from_admin = false AND is_read = false'),
+                 sqlite_where=db.text('is_from_admin = 0 AND is_read = 0')),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     # If recipient is null, it's a broadcast or general message, but for this app:
@@ -391,6 +406,9 @@ class ChatMessage(db.Model):
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     is_read = db.Column(db.Boolean, default=False)
     is_from_admin = db.Column(db.Boolean, default=False)
+    # The regular user whose thread this is (sender of user messages, recipient
+    # of admin replies); a thread is one range of ix_chat_message_conversation_id
+    conversation_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     
     # Relationships
     sender = db.relationship('User', foreign_keys=[sender_id], backref='sent_messages')
@@ -407,3 +425,64 @@ class ChatMessage(db.Model):
             'is_from_admin': self.is_from_admin,
             'sender_name': self.sender.full_name if self.sender else 'Unknown'
         }
+
+class SyncJob(db.Model):
+    """Model for background Google Sheets sync jobs"""
+    __table_args__ = (
+        # Single-flight across workers: at most one pending/running job
+        db.Index('ix_sync_job_single_flight', db.text("(status IN ('pending', 'running'))"), unique=True,
+                 postgresql_where=db.text("status IN ('pending', 'running')"),
+                 sqlite_where=db.text("status IN ('pending', 'running')")),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), default='pending')  # 'pending', 'running', 'completed', 'failed'
+    phase = db.Column(db.String(20), nullable=True)  # 'reading', 'writing', 'committed'
+    rows_read = db.Column(db.Integer, default=0)
+    rows_upserted = db.Column(db.Integer, default=0)
+    rows_skipped = db.Column(db.Integer, default=0)
+    rows_removed = db.Column(db.Integer, default=0)
+    message = db.Column(db.Text, nullable=True)
+    requested_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def is_active(self):
+        return self.status in ('pending', 'running')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'phase': self.phase,
+            'rows_read': self.rows_read or 0,
+            'rows_upserted': self.rows_upserted or 0,
+            'rows_skipped': self.rows_skipped or 0,
+            'rows_removed': self.rows_removed or 0,
+            'message': self.message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<SyncJob {self.id} - {self.status}>'
+
+class SheetsOutbox(db.Model):
+    """Model for pending Google Sheets writes (write-behind outbox)"""
+    id = db.Column(db.Integer, primary_key=True)
+    donation_id = db.Column(db.Integer, db.ForeignKey('offline_donation.id'), nullable=False, index=True)
+    worksheet = db.Column(db.String(100), nullable=False)  # Worksheet (purpose name) to write to
+    payload = db.Column(db.Text, nullable=False)  # JSON donation data for the sheet row
+    status = db.Column(db.String(20), default='pending', index=True)  # 'pending', 'processing', 'done', 'failed'
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    claim_token = db.Column(db.String(36), nullable=True)  # Set by the flusher that is writing this entry
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<SheetsOutbox {self.id} - donation {self.donation_id} - {self.status}>'
@@ -0,0 +1,143 @@
+"""
+Profile picture uploads.
+
+An upload is streamed to a temporary file in chunks (hashing it on the
+way), decoded once with Pillow, and stored under static/uploads/profiles
+as a stripped, upright WebP of at most PROFILE_PICTURE_MAX_SIZE pixels plus
+square avatar thumbnails (AVATAR_SIZES). Files are named after the upload's
+content hash, so the same picture uploaded twice is stored once and a
+stored file never changes. avatar_url() picks the thumbnail for a display
+size; pictures uploaded before this pipeline are used as they are.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from flask import current_app, url_for
+from models import User
+try:
+    from PIL import Image, ImageOps
+    PILLOW_AVAILABLE = True
+except ImportError:
+    PILLOW_AVAILABLE = False
+
+# Where profile pictures are stored, relative to static/
+PROFILE_UPLOAD_PATH = 'uploads/profiles'
+
+# Longest side of the stored picture
+PROFILE_PICTURE_MAX_SIZE = 1024
+
+# Square avatar thumbnails (2x the largest size they are shown at)
+AVATAR_SIZES = {'small': 128, 'large': 320}
+
+# Uploads with more pixels than this are rejected before decoding
+PROFILE_PICTURE_MAX_PIXELS = 50_000_000
+
+PROFILE_PICTURE_QUALITY = 82
+
+# Chunk size used when streaming an upload to disk
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+_PROCESSED_NAME = re.compile(r'^[0-9a-f]{16}\.webp$')
+
+
+def _upload_dir():
+    return os.path.join(current_app.static_folder, *PROFILE_UPLOAD_PATH.split('/'))
+
+
+def _thumbnail_name(name, size):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}_{AVATAR_SIZES[size]}{ext}"
+
+
+def _stream_to_disk(file, directory):
+    """Copy an upload to a temp file in chunks; returns (path, sha256 hex)"""
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.upload')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for chunk in iter(lambda: file.stream.read(UPLOAD_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                out.write(chunk)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest()
+
+
+def _write_image(image, path):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    image.save(tmp_path, format='WEBP', quality=PROFILE_PICTURE_QUALITY, method=6)
+    os.replace(tmp_path, path)
+
+
+def _process(source_path, directory, name):
+    with Image.open(source_path) as image:
+        if image.width * image.height > PROFILE_PICTURE_MAX_PIXELS:
+            raise ValueError('Image is too large.')
+        # JPEGs can be decoded straight at a reduced scale
+        image.draft('RGB', (PROFILE_PICTURE_MAX_SIZE, PROFILE_PICTURE_MAX_SIZE))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        image.thumbnail((PROFILE_PICTURE_MAX_SIZE, PROFILE_PICTURE_MAX_SIZE), Image.LANCZOS)
+
+    # Thumbnails first: the full picture existing marks the set as complete
+    for size in AVATAR_SIZES:
+        pixels = AVATAR_SIZES[size]
+        _write_image(ImageOps.fit(image, (pixels, pixels), Image.LANCZOS), os.path.join(directory, _thumbnail_name(name, size)))
+    _write_image(image, os.path.join(directory, name))
+
+
+def save_profile_picture(file):
+    """Store an uploaded picture; returns its path relative to static/
+
+    Raises ValueError if the upload isn't a readable image.
+    """
+    if not PILLOW_AVAILABLE:
+        raise ValueError('Image processing is not available.')
+    directory = _upload_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    tmp_path, digest = _stream_to_disk(file, directory)
+    try:
+        name = f"{digest[:16]}.webp"
+        if not os.path.exists(os.path.join(directory, name)):
+            try:
+                _process(tmp_path, directory, name)
+            except ValueError:
+                raise
+            except Exception as e:
+                raise ValueError('Could not read the image. Please upload a JPG, PNG or GIF file.') from e
+    finally:
+        os.remove(tmp_path)
+    return f"{PROFILE_UPLOAD_PATH}/{name}"
+
+
+def delete_profile_picture(path):
+    """Remove a stored picture and its thumbnails, unless a user still uses it"""
+    if not path:
+        return
+    if User.query.filter(User.profile_picture == path).first() is not None:
+        return  # Shared through deduplication
+
+    full_path = os.path.join(current_app.static_folder, path)
+    paths = [full_path]
+    if _PROCESSED_NAME.match(os.path.basename(path)):
+        paths += [os.path.join(os.path.dirname(full_path), _thumbnail_name(os.path.basename(path), size)) for size in AVATAR_SIZES]
+    for file_path in paths:
+        try:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        except Exception as e:
+            print(f"⚠️  Could not delete old profile picture {file_path}: {e}")
+
+
+def avatar_url(path, size='small'):
+    """URL of a profile picture for display at an avatar size ('small' or 'large')"""
+    if not path:
+        return None
+    directory, name = os.path.split(path)
+    if _PROCESSED_NAME.match(name):
+        path = f"{directory}/{_thumbnail_name(name, size)}"
+    return url_for('static', filename=path)
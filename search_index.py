@@ -0,0 +1,402 @@
+"""
+Site search over the text of the page templates.
+
+The visible text of each page in SEARCH_PAGES is extracted straight from
+its Jinja template (tags, expressions, scripts and styles removed) and
+split into sections at every heading. Sections go into an inverted index:
+term -> [(section, BM25 weight)], with headings weighted up. The index is
+saved to SEARCH_INDEX_FILE, loaded into memory, and queried with no
+database or template work: every query word must match a term exactly or
+as a prefix (so "sadh" finds "sadhana"), and sections are ranked by the
+summed weights. Pages behind a login or stage access keep that
+requirement in the index, and search() leaves out sections the user may
+not open. The full index is saved to SEARCH_INDEX_FILE, outside static/.
+
+The saved index is rebuilt at startup when the templates have changed, and
+`flask build-search-index` rebuilds it on demand; running processes pick
+up a rebuilt file within SEARCH_INDEX_CHECK_INTERVAL.
+
+Anonymous visitors search in the browser from static/search-index.json,
+an index of the public pages only (anything in it is readable by anyone):
+static/js/search.js downloads it once from its content-hashed URL, the
+service worker precaches it for offline use, and queries run locally with
+the same tokenizer and ranking (keep the two in step). Signed-in users
+query /search, which knows their access.
+"""
+
+import bisect
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from html.parser import HTMLParser
+from static_assets import refresh_asset
+
+# Searchable pages: (page key, page title, template, endpoint, URL values, access)
+# access is 'public', 'login' (any signed-in user) or the stage number the page needs
+SEARCH_PAGES = [
+    ('home', 'Home', 'home.html', 'home', {}, 'public'),
+    ('documents', 'Documents & Updates', 'documents.html', 'documents', {}, 'public'),
+    ('ashtami', 'Ashtami', 'ashtami.html', 'ashtami', {}, 'public'),
+    ('devi', 'Devi', 'devi.html', 'devi', {}, 'public'),
+    ('devi_padathi', 'Devi Padathi', 'devi_padathi.html', 'devi_padathi', {}, 'login'),
+    ('vishesh_sadhana', 'Vishesh Sādhana', 'vishesh_sadhana.html', 'vishesh_sadhana', {}, 'login'),
+    ('guru_bhairava', 'Guru Bhairava', 'guru_bhairava.html', 'guru_bhairava', {}, 'public'),
+    ('prana_pratisthana', 'Prāṇa Pratiṣṭhāna', 'prana_pratisthana.html', 'prana_pratisthana', {}, 'public'),
+    ('padati', 'Padati', 'padati.html', 'padati', {}, 'login'),
+    ('stage_7', 'Pratham Charana', 'stage_7.html', 'stage_page', {'stage_num': 7}, 7),
+    ('bhiksha', 'Bhiksha', 'donations.html', 'bhiksha', {}, 'public'),
+    ('youtube', 'YouTube', 'youtube.html', 'youtube', {}, 'public'),
+    ('about', 'About', 'about.html', 'about', {}, 'public'),
+]
+
+# Saved full index (all pages; never served)
+SEARCH_INDEX_FILE = os.getenv('SEARCH_INDEX_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'search_index.json'))
+
+# Browser index of the public pages, relative to static/
+BROWSER_INDEX_PATH = 'search-index.json'
+BROWSER_INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', BROWSER_INDEX_PATH)
+
+# Seconds between checks for a rebuilt index file
+SEARCH_INDEX_CHECK_INTERVAL = 30
+
+# Results per query by default, and the most a client may ask for
+SEARCH_RESULTS_LIMIT = 20
+MAX_SEARCH_RESULTS = 50
+
+# Characters of section text kept for result snippets
+SNIPPET_LENGTH = 200
+
+# Weight of a heading word relative to a body word
+HEADING_BOOST = 3
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Score multiplier for prefix-only matches
+PREFIX_MATCH_WEIGHT = 0.7
+
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or that the this to was were will with you your'.split()
+)
+
+# Elements whose text is never shown as page content
+SKIPPED_TAGS = frozenset(['script', 'style', 'svg', 'noscript', 'template', 'select', 'textarea', 'button'])
+HEADING_TAGS = frozenset(['h1', 'h2', 'h3', 'h4'])
+VOID_TAGS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'])
+
+_JINJA_COMMENT = re.compile(r'{#.*?#}', re.S)
+_JINJA_STYLE_BLOCKS = re.compile(r'{%-?\s*block\s+(extra_styles|extra_scripts|title)\s*-?%}.*?{%-?\s*endblock\b.*?%}', re.S)
+_JINJA_TAG = re.compile(r'{%.*?%}|{{.*?}}', re.S)
+# Letters and digits; Indic scripts keep their vowel signs inside words
+_WORD = re.compile(r'(?:[^\W_]|[\u0900-\u0dff])+')
+_WHITESPACE = re.compile(r'\s+')
+
+_index = None            # loaded index (see _load)
+_index_mtime = None
+_checked_at = 0
+_lock = threading.Lock()
+
+
+def normalize(text):
+    """Lowercase, with Latin diacritics removed (Sādhanā -> sadhana)"""
+    folded = []
+    for char in text.lower():
+        if 0xa0 <= ord(char) < 0x2b0 or 0x1e00 <= ord(char) <= 0x1eff:
+            # Latin: drop accents; other scripts keep their combining signs
+            folded.extend(c for c in unicodedata.normalize('NFKD', char) if not unicodedata.combining(c))
+        else:
+            folded.append(char)
+    return ''.join(folded)
+
+
+def tokenize(text):
+    return [word for word in _WORD.findall(normalize(text)) if len(word) > 1 and word not in STOPWORDS]
+
+
+class _SectionParser(HTMLParser):
+    """Splits page HTML into (heading, anchor, text) sections"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.sections = []
+        self._open = []          # (tag, id) of open elements
+        self._skip_depth = 0
+        self._heading = None     # text parts of the heading being read
+        self._current = {'heading': '', 'anchor': None, 'text': []}
+
+    def _anchor(self):
+        return next((element_id for _, element_id in reversed(self._open) if element_id), None)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        self._open.append((tag, dict(attrs).get('id')))
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in HEADING_TAGS and self._skip_depth == 0:
+            self._close_section()
+            self._heading = []
+            self._current['anchor'] = self._anchor()
+
+    def handle_endtag(self, tag):
+        # Template branches can leave tags unbalanced; close back to the match
+        for position in range(len(self._open) - 1, -1, -1):
+            if self._open[position][0] == tag:
+                for open_tag, _ in self._open[position:]:
+                    if open_tag in SKIPPED_TAGS:
+                        self._skip_depth -= 1
+                    elif open_tag in HEADING_TAGS and self._heading is not None:
+                        self._current['heading'] = ' '.join(self._heading)
+                        self._heading = None
+                del self._open[position:]
+                return
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        text = _WHITESPACE.sub(' ', data).strip()
+        if text:
+            (self._heading if self._heading is not None else self._current['text']).append(text)
+
+    def _close_section(self):
+        if self._current['heading'] or self._current['text']:
+            self.sections.append((self._current['heading'], self._current['anchor'], ' '.join(self._current['text'])))
+        self._current = {'heading': '', 'anchor': None, 'text': []}
+
+    def close(self):
+        super().close()
+        if self._heading is not None:
+            self._current['heading'] = ' '.join(self._heading)
+            self._heading = None
+        self._close_section()
+
+
+def extract_sections(source):
+    """Visible (heading, anchor, text) sections of a Jinja page template"""
+    source = _JINJA_COMMENT.sub(' ', source)
+    source = _JINJA_STYLE_BLOCKS.sub(' ', source)
+    source = _JINJA_TAG.sub(' ', source)
+    parser = _SectionParser()
+    parser.feed(source)
+    parser.close()
+    return parser.sections
+
+
+def _template_sources(template_folder):
+    sources = {}
+    for page, page_title, template, endpoint, values, access in SEARCH_PAGES:
+        with open(os.path.join(template_folder, template), encoding='utf-8') as f:
+            sources[template] = f.read()
+    return sources
+
+
+def _sources_version(sources):
+    digest = hashlib.sha256(repr(SEARCH_PAGES).encode())
+    for template in sorted(sources):
+        digest.update(template.encode())
+        digest.update(sources[template].encode())
+    return digest.hexdigest()[:12]
+
+
+def build_search_index(app, public_only=False):
+    """Extract the pages' text and build the inverted index
+
+    With public_only, only pages anyone may open are indexed (the browser
+    index).
+
+    Returns the index dict (saved as JSON): version, docs as
+    [page, page title, section title, url, snippet, access], and terms as
+    {term: [[doc, weight], ...]}.
+    """
+    sources = _template_sources(os.path.join(app.root_path, app.template_folder))
+    urls = app.url_map.bind('')
+
+    docs = []
+    doc_terms = []
+    for page, page_title, template, endpoint, values, access in SEARCH_PAGES:
+        if public_only and access != 'public':
+            continue
+        page_url = urls.build(endpoint, values)
+        for heading, anchor, text in extract_sections(sources[template]):
+            terms = Counter(tokenize(text))
+            for term in tokenize(heading):
+                terms[term] += HEADING_BOOST
+            if not terms:
+                continue
+            title = heading or page_title
+            url = f"{page_url}#{anchor}" if anchor else page_url
+            snippet = text[:SNIPPET_LENGTH].rsplit(' ', 1)[0] + '…' if len(text) > SNIPPET_LENGTH else text
+            docs.append([page, page_title, title, url, snippet, access])
+            doc_terms.append(terms)
+
+    average_length = sum(sum(terms.values()) for terms in doc_terms) / max(len(doc_terms), 1)
+    postings = {}
+    for doc, terms in enumerate(doc_terms):
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * sum(terms.values()) / average_length)
+        for term, count in terms.items():
+            weight = count * (BM25_K1 + 1) / (count + length_norm)
+            postings.setdefault(term, []).append([doc, round(weight, 3)])
+
+    return {'version': _sources_version(sources), 'docs': docs, 'terms': postings}
+
+
+def _write_index(index, path):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def _read_index(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_search_index(index, path=SEARCH_INDEX_FILE):
+    """Write the full index where running processes will pick it up"""
+    _write_index(index, path)
+
+
+def save_browser_index(index):
+    """Write the public browser index and re-hash its static URL"""
+    if any(doc[5] != 'public' for doc in index['docs']):
+        raise ValueError('The browser index may only contain public pages')
+    _write_index(index, BROWSER_INDEX_FILE)
+    refresh_asset(BROWSER_INDEX_PATH)
+
+
+def _load(index, mtime):
+    """Keep an index in memory with its sorted vocabulary and term IDF"""
+    global _index, _index_mtime
+    doc_count = len(index['docs'])
+    idf = {
+        term: math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+        for term, postings in index['terms'].items()
+    }
+    loaded = dict(index, vocabulary=sorted(index['terms']), idf=idf)
+    with _lock:
+        _index = loaded
+        _index_mtime = mtime
+
+
+def get_search_index():
+    """The in-memory index, reloaded if the saved file was rebuilt"""
+    global _checked_at
+    now = time.monotonic()
+    if now - _checked_at < SEARCH_INDEX_CHECK_INTERVAL:
+        return _index
+    _checked_at = now
+    try:
+        mtime = os.stat(SEARCH_INDEX_FILE).st_mtime
+        if mtime != _index_mtime:
+            with open(SEARCH_INDEX_FILE, encoding='utf-8') as f:
+                _load(json.load(f), mtime)
+            # Rebuilt together with the browser index
+            refresh_asset(BROWSER_INDEX_PATH)
+    except FileNotFoundError:
+        pass  # Not saved (read-only deploy) - keep the index built at startup
+    except Exception as e:
+        print(f"⚠️  Could not reload search index: {e}")
+    return _index
+
+
+def _matching_terms(index, word):
+    """(term, score weight) pairs for a query word: exact, then prefix matches"""
+    vocabulary = index['vocabulary']
+    matches = []
+    position = bisect.bisect_left(vocabulary, word)
+    while position < len(vocabulary) and vocabulary[position].startswith(word):
+        term = vocabulary[position]
+        matches.append((term, 1.0 if term == word else PREFIX_MATCH_WEIGHT))
+        position += 1
+    return matches
+
+
+def can_view(access, user):
+    """Whether a user (or None/anonymous) may see a page with this access requirement"""
+    if access == 'public':
+        return True
+    if user is None or not user.is_authenticated:
+        return False
+    return access == 'login' or user.has_mandala_access(access)
+
+
+def search(query, limit=SEARCH_RESULTS_LIMIT, user=None):
+    """Best-matching sections a user may see, as dicts for the /search API"""
+    index = get_search_index()
+    words = list(dict.fromkeys(tokenize(query)))
+    if index is None or not words:
+        return []
+    visible = {access: can_view(access, user) for access in {doc[5] for doc in index['docs']}}
+
+    scores = None
+    for word in words:
+        word_scores = {}
+        for term, match_weight in _matching_terms(index, word):
+            term_weight = index['idf'][term] * match_weight
+            for doc, weight in index['terms'][term]:
+                if not visible[index['docs'][doc][5]]:
+                    continue
+                score = term_weight * weight
+                if score > word_scores.get(doc, 0):
+                    word_scores[doc] = score
+        if scores is None:
+            scores = word_scores
+        else:
+            # Every query word must match
+            scores = {doc: score + word_scores[doc] for doc, score in scores.items() if doc in word_scores}
+        if not scores:
+            return []
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    results = []
+    for doc, score in ranked:
+        page, page_title, title, url, snippet, access = index['docs'][doc]
+        results.append({
+            'page': page,
+            'page_title': page_title,
+            'title': title,
+            'url': url,
+            'snippet': snippet,
+            'score': round(score, 3)
+        })
+    return results
+
+
+def init_search_index(app):
+    """Load the saved search index, rebuilding it (and the browser index) if the templates changed"""
+    global _checked_at
+    try:
+        sources = _template_sources(os.path.join(app.root_path, app.template_folder))
+        version = _sources_version(sources)
+
+        browser_index = _read_index(BROWSER_INDEX_FILE)
+        if browser_index is None or browser_index.get('version') != version:
+            try:
+                save_browser_index(build_search_index(app, public_only=True))
+            except OSError as e:
+                print(f"⚠️  Could not save browser search index: {e}")
+
+        index = _read_index(SEARCH_INDEX_FILE)
+        if index is None or index.get('version') != version:
+            index = build_search_index(app)
+            print(f"🔎 Search index built: {len(index['docs'])} sections, {len(index['terms'])} terms")
+            try:
+                save_search_index(index)
+            except OSError as e:
+                print(f"⚠️  Could not save search index (kept in memory): {e}")
+        mtime = os.stat(SEARCH_INDEX_FILE).st_mtime if os.path.exists(SEARCH_INDEX_FILE) else None
+        _load(index, mtime)
+        _checked_at = time.monotonic()
+    except Exception as e:
+        print(f"⚠️  Search index unavailable: {e}")
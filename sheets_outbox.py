@@ -0,0 +1,260 @@
+"""
+Write-behind outbox for Google Sheets donation writes.
+
+Admin requests only record the write in the SheetsOutbox table, in the same
+transaction as the donation change. A background flusher later coalesces
+pending entries per worksheet into one batch_update (rows already in the
+sheet, matched by donation ID) and one append_rows (new rows), retrying
+failed worksheets with exponential backoff. start.sh flushes entries left
+by the previous deploy once before the server starts. Each worker starts
+its flusher thread on its first request (no I/O in the request); the thread
+retries what is still waiting, and only connects to Google Sheets when
+there is something to write.
+
+Donations imported by the sync are written back to their own row, keyed
+by the sheet's donor ID, and only their Status cell is changed. Once a
+write lands the donation's fingerprint is cleared, and a donation added in
+the app records its own ID as donor ID along with the worksheet, so the
+next sync links the written row to the same donation instead of treating
+it as new.
+"""
+
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import or_, and_
+from models import db, SheetsOutbox, OfflineDonation
+from google_sheets import get_sheets_manager
+
+# Seconds between flushes when nobody pokes the flusher
+OUTBOX_FLUSH_INTERVAL = 30
+
+# Retry policy: delay doubles per attempt, capped, until the entry is marked failed
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_BACKOFF_BASE = 30
+OUTBOX_BACKOFF_MAX = 3600
+
+# Entries claimed longer ago than this are assumed abandoned by a dead worker
+OUTBOX_CLAIM_TIMEOUT = timedelta(minutes=5)
+
+# Maximum entries handled per flush
+OUTBOX_BATCH_SIZE = 500
+
+_wakeup = threading.Event()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def donation_sheet_data(donation, created_by):
+    """Build the donation data written to the sheet row"""
+    return {
+        'id': donation.id,
+        'donor_name': donation.donor_name,
+        'donor_email': donation.donor_email,
+        'donor_phone': donation.donor_phone,
+        'amount': donation.amount,
+        'currency': donation.currency,
+        'donation_date': donation.donation_date.strftime('%Y-%m-%d'),
+        'payment_method': donation.payment_method,
+        'reference_number': donation.reference_number,
+        'notes': donation.notes,
+        'is_verified': bool(donation.is_verified),
+        'created_at': donation.created_at.strftime('%Y-%m-%d %H:%M:%S') if donation.created_at else '',
+        'created_by': created_by
+    }
+
+
+def synced_donation_sheet_data(donation):
+    """Status update for the sheet row a synced donation was imported from"""
+    return {
+        'id': donation.donor_id,
+        'donor_name': donation.donor_name,
+        'is_verified': bool(donation.is_verified),
+        'status_only': True
+    }
+
+
+def enqueue_donation_write(donation, worksheet_name, created_by):
+    """Queue a sheet write for a donation in the current session (caller commits)
+
+    A still-pending entry for the same donation is updated in place, so
+    add-then-verify results in a single sheet write. Returns None for a
+    synced donation without a donor ID, whose row can't be found again.
+    """
+    if donation.donor_id:
+        # Already in the sheet: imported by the sync or written by the outbox
+        worksheet_name = donation.worksheet or worksheet_name
+        payload = json.dumps(synced_donation_sheet_data(donation))
+    elif donation.sheet_fingerprint:
+        return None
+    else:
+        payload = json.dumps(donation_sheet_data(donation, created_by))
+
+    entry = SheetsOutbox.query.filter_by(donation_id=donation.id, status='pending').first()
+    if entry:
+        entry.worksheet = worksheet_name
+        entry.payload = payload
+        return entry
+
+    entry = SheetsOutbox(donation_id=donation.id, worksheet=worksheet_name, payload=payload)
+    db.session.add(entry)
+    return entry
+
+
+def pending_donation_ids():
+    """Ids of donations whose sheet write has not happened yet"""
+    return {
+        donation_id for (donation_id,) in db.session.query(SheetsOutbox.donation_id).filter(
+            SheetsOutbox.status.in_(['pending', 'processing'])
+        )
+    }
+
+
+def _due_condition(now):
+    return or_(
+        and_(SheetsOutbox.status == 'pending', SheetsOutbox.next_attempt_at <= now),
+        and_(SheetsOutbox.status == 'processing', SheetsOutbox.claimed_at < now - OUTBOX_CLAIM_TIMEOUT)
+    )
+
+
+def _claim_entries(now, limit):
+    """Claim due entries for this flusher so concurrent workers don't double-write"""
+    due_ids = [entry_id for (entry_id,) in db.session.query(SheetsOutbox.id).filter(
+        _due_condition(now)
+    ).order_by(SheetsOutbox.id).limit(limit)]
+    if not due_ids:
+        return []
+
+    token = str(uuid.uuid4())
+    SheetsOutbox.query.filter(SheetsOutbox.id.in_(due_ids), _due_condition(now)).update(
+        {'status': 'processing', 'claim_token': token, 'claimed_at': now},
+        synchronize_session=False
+    )
+    db.session.commit()
+    return SheetsOutbox.query.filter_by(claim_token=token).order_by(SheetsOutbox.id).all()
+
+
+def flush_outbox(manager=None, limit=OUTBOX_BATCH_SIZE):
+    """Write due outbox entries to Google Sheets, batched per worksheet
+
+    Returns a dict of counters: written, updated, appended, retried, failed.
+    """
+    stats = {'written': 0, 'updated': 0, 'appended': 0, 'retried': 0, 'failed': 0}
+    manager = manager or get_sheets_manager()
+    if not manager.is_connected():
+        return stats
+
+    now = datetime.utcnow()
+    entries = _claim_entries(now, limit)
+    if not entries:
+        return stats
+
+    # Coalesce: only the newest entry per donation is written
+    latest = {}
+    for entry in entries:
+        latest[entry.donation_id] = entry
+
+    by_worksheet = {}
+    for entry in latest.values():
+        by_worksheet.setdefault(entry.worksheet, []).append(entry)
+
+    rewritten_ids = []  # Donations whose sheet row changed
+    written_rows = {}  # donation id -> worksheet of rows written in full
+    for worksheet_name, worksheet_entries in by_worksheet.items():
+        payloads = [json.loads(entry.payload) for entry in worksheet_entries]
+        try:
+            rows = [payload for payload in payloads if not payload.get('status_only')]
+            if rows:
+                updated, appended = manager.upsert_donations(worksheet_name, rows)
+                stats['updated'] += updated
+                stats['appended'] += appended
+            statuses = [payload for payload in payloads if payload.get('status_only')]
+            found = manager.update_donation_statuses(worksheet_name, statuses) if statuses else set()
+            stats['updated'] += len(found)
+            stats['written'] += len(worksheet_entries)
+            for entry, payload in zip(worksheet_entries, payloads):
+                entry.status = 'done'
+                entry.processed_at = datetime.utcnow()
+                entry.last_error = None
+                if not payload.get('status_only'):
+                    written_rows[entry.donation_id] = worksheet_name
+                elif (str(payload['id']), payload['donor_name']) in found:
+                    rewritten_ids.append(entry.donation_id)
+                else:
+                    entry.last_error = 'Row not found in the sheet'
+        except Exception as e:
+            print(f"⚠️  Error writing outbox entries for {worksheet_name}: {e}")
+            for entry in worksheet_entries:
+                entry.attempts = (entry.attempts or 0) + 1
+                entry.last_error = str(e)[:500]
+                entry.claim_token = None
+                if entry.attempts >= OUTBOX_MAX_ATTEMPTS:
+                    entry.status = 'failed'
+                    stats['failed'] += 1
+                else:
+                    delay = min(OUTBOX_BACKOFF_BASE * 2 ** (entry.attempts - 1), OUTBOX_BACKOFF_MAX)
+                    entry.status = 'pending'
+                    entry.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+                    stats['retried'] += 1
+
+    # Older entries superseded by a newer one for the same donation
+    for entry in entries:
+        if latest[entry.donation_id] is not entry:
+            entry.status = 'done'
+            entry.processed_at = datetime.utcnow()
+
+    if rewritten_ids:
+        OfflineDonation.query.filter(OfflineDonation.id.in_(rewritten_ids)).update(
+            {'sheet_fingerprint': None}, synchronize_session=False
+        )
+    if written_rows:
+        # The row's ID column now holds the donation ID: link it for the next sync
+        for donation in OfflineDonation.query.filter(OfflineDonation.id.in_(list(written_rows))):
+            donation.donor_id = str(donation.id)
+            donation.worksheet = written_rows[donation.id]
+            donation.sheet_fingerprint = None
+    db.session.commit()
+    return stats
+
+
+def _flusher_loop(app):
+    while True:
+        _wakeup.wait(OUTBOX_FLUSH_INTERVAL)
+        _wakeup.clear()
+        with app.app_context():
+            try:
+                if not has_unsent_entries():
+                    continue
+                stats = flush_outbox()
+                if stats['written'] or stats['retried'] or stats['failed']:
+                    print(f"📤 Sheets outbox flushed: {stats}")
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ Error flushing Sheets outbox: {e}")
+            finally:
+                db.session.remove()
+
+
+def has_unsent_entries():
+    """Whether any write is still waiting to be (re)tried"""
+    return db.session.query(SheetsOutbox.id).filter(
+        SheetsOutbox.status.in_(['pending', 'processing'])
+    ).first() is not None
+
+
+def start_flusher(app):
+    """Start this process's background flusher if it isn't running (no I/O)"""
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_flusher_loop, args=(app,), daemon=True)
+            _worker.start()
+
+
+def notify_outbox(app):
+    """Wake the background flusher, starting it in this process if needed"""
+    start_flusher(app)
+    _wakeup.set()
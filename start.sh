@@ -1,5 +1,5 @@
 #!/bin/bash
-# Railway start script - ensures gunicorn binds to Railway's PORT
+# Start script (Railway, Render) - ensures gunicorn binds to the platform's PORT
 # Railway sets PORT environment variable automatically
 
 # Get PORT from environment, Railway sets this automatically
@@ -19,11 +19,24 @@ if [ -z "$SECRET_KEY" ]; then
     echo "⚠️  Warning: SECRET_KEY not set - using default (NOT RECOMMENDED FOR PRODUCTION)"
 fi
 
+# Precompress text assets (.br/.gz) - only changed files are redone
+flask --app app compress-assets || echo "⚠️  Could not precompress static assets, serving them uncompressed"
+
+# Compile templates ahead of time so workers don't on their first requests
+flask --app app precompile-templates || echo "⚠️  Could not precompile templates, compiling them on demand"
+
+# Write Google Sheets updates left pending by the previous deploy (each
+# worker's background flusher retries whatever is still waiting)
+flask --app app flush-sheets-outbox || echo "⚠️  Could not flush the Sheets outbox, workers will retry it"
+
 # Start gunicorn with proper configuration
+# Threaded workers: open chat streams (/api/chat/stream) each hold a thread, not a whole worker
 echo "🔄 Starting Gunicorn server..."
 exec gunicorn app:app \
     --bind 0.0.0.0:$PORT \
     --workers 2 \
+    --worker-class gthread \
+    --threads ${GUNICORN_THREADS:-16} \
     --timeout 120 \
     --access-logfile - \
     --error-logfile - \
@@ -18,8 +18,11 @@ document.addEventListener('DOMContentLoaded', function () {
     // State
     let isOpen = false;
     let lastMessageId = 0;
-    let pollInterval = null;
-    const POLL_RATE = 10000; // 10 seconds
+    let oldestMessageId = null; // Cursor for loading earlier messages
+    let hasOlderMessages = false;
+    let loadingOlder = false;
+    let eventSource = null; // Pushes new messages while the window is open
+    const PAGE_SIZE = 50;
     const CSRF_TOKEN = document.querySelector('meta[name="csrf-token"]')?.getAttribute('content') || '';
 
     // Events
@@ -29,6 +32,9 @@ document.addEventListener('DOMContentLoaded', function () {
     chatInput.addEventListener('keypress', function (e) {
         if (e.key === 'Enter') sendMessage();
     });
+    chatMessages.addEventListener('scroll', function () {
+        if (chatMessages.scrollTop === 0) loadOlderMessages();
+    });
 
     // Toggle Chat Window
     function toggleChat() {
@@ -37,13 +43,12 @@ document.addEventListener('DOMContentLoaded', function () {
             chatWindow.style.display = 'flex';
             chatFab.style.display = 'none';
             chatInput.focus();
-            loadMessages();
-            startPolling();
+            loadMessages().then(startStream);
             scrollToBottom();
         } else {
             chatWindow.style.display = 'none';
             chatFab.style.display = 'flex';
-            stopPolling();
+            stopStream();
         }
     }
 
@@ -53,13 +58,14 @@ document.addEventListener('DOMContentLoaded', function () {
         if (!message) return;
 
         // Optimistic UI - add message immediately
-        appendMessage({
+        const tempDiv = appendMessage({
             message: message,
             is_from_admin: false,
             timestamp: new Date().toISOString(),
             sender_id: 'me', // temporary
             id: 'temp-' + Date.now()
         });
+        tempDiv.dataset.pending = 'true';
 
         const originalInput = chatInput.value;
         chatInput.value = '';
@@ -77,11 +83,9 @@ document.addEventListener('DOMContentLoaded', function () {
             const data = await response.json();
 
             if (data.success) {
-                // Determine if we need to replace temp message or just reload
-                // For simplicity, we just reload or let polling handle it next time
-                // But better to just remove temp and show real if needed
-                // Actually, let's just refresh list to sync IDs
-                // Or just ignore since we already showed it.
+                // Tag the optimistic message so the stream doesn't show it twice
+                tempDiv.dataset.messageId = data.message.id;
+                delete tempDiv.dataset.pending;
             } else {
                 alert('Error sending message: ' + (data.error || 'Unknown error'));
                 chatInput.value = originalInput; // Restore
@@ -92,10 +96,11 @@ document.addEventListener('DOMContentLoaded', function () {
         }
     }
 
-    // Load Messages
+    // Load Messages (latest page on first open, only newer ones after that)
     async function loadMessages() {
         try {
-            const response = await fetch('/api/chat/history');
+            const url = lastMessageId ? `/api/chat/history?after_id=${lastMessageId}` : `/api/chat/history?limit=${PAGE_SIZE}`;
+            const response = await fetch(url);
             const messages = await response.json();
 
             if (messages.error) {
@@ -103,7 +108,11 @@ document.addEventListener('DOMContentLoaded', function () {
                 return;
             }
 
-            renderMessages(messages);
+            if (lastMessageId) {
+                messages.forEach(receiveMessage);
+            } else {
+                renderMessages(messages);
+            }
         } catch (error) {
             console.error('Error loading chat:', error);
         }
@@ -130,17 +139,75 @@ document.addEventListener('DOMContentLoaded', function () {
                 lastMessageId = msg.id;
             }
         });
+        oldestMessageId = messages[0].id;
+        hasOlderMessages = messages.length >= PAGE_SIZE;
+
+        scrollToBottom();
+    }
+
+    // Prepend the previous page when scrolled to the top
+    async function loadOlderMessages() {
+        if (!hasOlderMessages || loadingOlder) return;
+        loadingOlder = true;
+        try {
+            const response = await fetch(`/api/chat/history?before_id=${oldestMessageId}&limit=${PAGE_SIZE}`);
+            const messages = await response.json();
+            if (messages.error || messages.length === 0) {
+                hasOlderMessages = false;
+                return;
+            }
+
+            const previousHeight = chatMessages.scrollHeight;
+            const firstMessage = chatMessages.firstChild;
+            messages.forEach(msg => {
+                chatMessages.insertBefore(createMessageElement(msg), firstMessage);
+            });
+            oldestMessageId = messages[0].id;
+            hasOlderMessages = messages.length >= PAGE_SIZE;
+            // Keep the messages that were in view in place
+            chatMessages.scrollTop = chatMessages.scrollHeight - previousHeight;
+        } catch (error) {
+            console.error('Error loading older messages:', error);
+        } finally {
+            loadingOlder = false;
+        }
+    }
+
+    // Add a message pushed by the server (skipping ones already shown)
+    function receiveMessage(msg) {
+        if (msg.id > lastMessageId) {
+            lastMessageId = msg.id;
+        }
+        if (chatMessages.querySelector(`[data-message-id="${msg.id}"]`)) return;
+
+        // Our own message can arrive before the send request returns
+        const pending = msg.is_from_admin ? null : chatMessages.querySelector('[data-pending]');
+        if (pending) {
+            pending.dataset.messageId = msg.id;
+            delete pending.dataset.pending;
+            return;
+        }
 
+        const placeholder = chatMessages.querySelector('.chat-placeholder');
+        if (placeholder) placeholder.remove();
+
+        appendMessage(msg);
         scrollToBottom();
     }
 
     // Append Single Message
     function appendMessage(msg) {
-        // Check if already exists (deduplication)
-        // This is a naive check; better to use ID data attributes
+        const div = createMessageElement(msg);
+        chatMessages.appendChild(div);
+        return div;
+    }
 
+    function createMessageElement(msg) {
         const div = document.createElement('div');
         div.className = `chat-message ${msg.is_from_admin ? 'admin' : 'user'}`;
+        if (typeof msg.id === 'number') {
+            div.dataset.messageId = msg.id;
+        }
 
         const time = new Date(msg.timestamp).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
 
@@ -151,17 +218,25 @@ document.addEventListener('DOMContentLoaded', function () {
             <div class="message-time">${time}</div>
         `;
 
-        chatMessages.appendChild(div);
+        return div;
     }
 
-    // Poll for new messages
-    function startPolling() {
-        if (pollInterval) clearInterval(pollInterval);
-        pollInterval = setInterval(loadMessages, POLL_RATE);
+    // Stream new messages (Server-Sent Events). The browser reconnects on its
+    // own and resumes after the last received message via Last-Event-ID.
+    function startStream() {
+        stopStream();
+        if (!isOpen) return;
+        eventSource = new EventSource(`/api/chat/stream?since_id=${lastMessageId}`);
+        eventSource.addEventListener('message', function (event) {
+            receiveMessage(JSON.parse(event.data));
+        });
     }
 
-    function stopPolling() {
-        if (pollInterval) clearInterval(pollInterval);
+    function stopStream() {
+        if (eventSource) {
+            eventSource.close();
+            eventSource = null;
+        }
     }
 
     // Utilities
@@ -0,0 +1,366 @@
+    document.addEventListener('DOMContentLoaded', function () {
+        setupUserActions();
+        setupRequestActions();
+        setupAccessFormValidation();
+        setupPasswordModal();
+    });
+
+    function setupUserActions() {
+        document.querySelectorAll('.approve-user').forEach(btn => {
+            btn.addEventListener('click', function () {
+                const userId = this.dataset.userId;
+                executeUserAction(userId, 'approve', 'Approved via user detail page');
+            });
+        });
+
+        document.querySelectorAll('.reject-user').forEach(btn => {
+            btn.addEventListener('click', function () {
+                const userId = this.dataset.userId;
+                openConfirmModal('Are you sure you want to reject this user? This action cannot be undone.', function () {
+                    executeUserAction(userId, 'reject', 'Rejected via user detail page');
+                });
+            });
+        });
+
+        document.querySelectorAll('.suspend-user').forEach(btn => {
+            btn.addEventListener('click', function () {
+                const userId = this.dataset.userId;
+                openConfirmModal('Are you sure you want to suspend this user? They will lose access to all content.', function () {
+                    executeUserAction(userId, 'suspend', 'Suspended via user detail page');
+                });
+            });
+        });
+
+        document.querySelectorAll('.reactivate-user').forEach(btn => {
+            btn.addEventListener('click', function () {
+                const userId = this.dataset.userId;
+                executeUserAction(userId, 'approve', 'Reactivated via user detail page');
+            });
+        });
+    }
+
+    function setupRequestActions() {
+        document.querySelectorAll('.btn-approve-request').forEach(btn => {
+            btn.addEventListener('click', function () {
+                const requestId = this.dataset.requestId;
+                handleStageRequest(requestId, 'approve');
+            });
+        });
+
+        document.querySelectorAll('.btn-reject-request').forEach(btn => {
+            btn.addEventListener('click', function () {
+                const requestId = this.dataset.requestId;
+                openConfirmModal('Are you sure you want to reject this access request?', function () {
+                    handleStageRequest(requestId, 'reject');
+                });
+            });
+        });
+    }
+
+    function setupAccessFormValidation() {
+        // Legacy support for toggle switches
+        const form = document.getElementById('accessForm');
+        const toggles = form.querySelectorAll('.toggle-switch input');
+
+        toggles.forEach(toggle => {
+            toggle.addEventListener('change', function () {
+                const item = this.closest('.access-item');
+                if (this.checked) {
+                    item.classList.remove('locked');
+                    item.classList.add('granted');
+                } else {
+                    item.classList.remove('granted');
+                    item.classList.add('locked');
+                }
+            });
+        });
+    }
+
+    // New toggle access function for clickable cards
+    function toggleAccess(card, inputName) {
+        const checkbox = card.querySelector('input[type="checkbox"]');
+        const statusBadge = card.querySelector('.access-status-badge i');
+        const statusText = card.querySelector('.access-card-status');
+
+        // Toggle checkbox
+        checkbox.checked = !checkbox.checked;
+
+        // Add click animation
+        card.classList.add('click-effect');
+        setTimeout(() => card.classList.remove('click-effect'), 300);
+
+        // Update visual state
+        if (checkbox.checked) {
+            card.classList.remove('locked');
+            card.classList.add('granted');
+            statusBadge.classList.remove('fa-lock');
+            statusBadge.classList.add('fa-check');
+            statusText.innerHTML = '<i class="fas fa-unlock"></i> Granted';
+        } else {
+            card.classList.remove('granted');
+            card.classList.add('locked');
+            statusBadge.classList.remove('fa-check');
+            statusBadge.classList.add('fa-lock');
+            statusText.innerHTML = '<i class="fas fa-lock"></i> Locked';
+        }
+    }
+
+    function executeUserAction(userId, action, notes) {
+        const csrfToken = PAGE_CONFIG.csrfToken;
+
+        fetch(PAGE_CONFIG.approveUserUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/x-www-form-urlencoded',
+            },
+            body: new URLSearchParams({
+                'user_id': userId,
+                'action': action,
+                'notes': notes,
+                'csrf_token': csrfToken
+            })
+        })
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    showToast(data.message, 'success');
+                    setTimeout(() => location.reload(), 1500);
+                } else {
+                    showToast('Error: ' + data.message, 'error');
+                }
+            })
+            .catch(error => {
+                showToast('An error occurred. Please try again.', 'error');
+                console.error('Error:', error);
+            });
+    }
+
+    function handleStageRequest(requestId, action) {
+        const csrfToken = PAGE_CONFIG.csrfToken;
+        const btn = document.querySelector(`.btn-approve-request[data-request-id="${requestId}"], .btn-reject-request[data-request-id="${requestId}"]`);
+
+        if (btn) {
+            btn.disabled = true;
+            btn.innerHTML = '<i class="fas fa-spinner fa-spin"></i>';
+        }
+
+        fetch(`/auth/admin/approve_stage_request/${requestId}`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/x-www-form-urlencoded',
+            },
+            body: new URLSearchParams({
+                'action': action,
+                'csrf_token': csrfToken
+            })
+        })
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    showToast(data.message, 'success');
+                    const requestItem = document.querySelector(`.request-item[data-request-id="${requestId}"]`);
+                    if (requestItem) {
+                        requestItem.style.animation = 'fadeOut 0.3s ease-out forwards';
+                        setTimeout(() => {
+                            requestItem.remove();
+                            setTimeout(() => location.reload(), 500);
+                        }, 300);
+                    }
+                } else {
+                    showToast('Error: ' + data.message, 'error');
+                    if (btn) {
+                        btn.disabled = false;
+                        btn.innerHTML = action === 'approve' ? '<i class="fas fa-check"></i> Approve' : '<i class="fas fa-times"></i> Reject';
+                    }
+                }
+            })
+            .catch(error => {
+                showToast('An error occurred. Please try again.', 'error');
+                console.error('Error:', error);
+                if (btn) {
+                    btn.disabled = false;
+                    btn.innerHTML = action === 'approve' ? '<i class="fas fa-check"></i> Approve' : '<i class="fas fa-times"></i> Reject';
+                }
+            });
+    }
+
+    function openConfirmModal(message, onConfirm) {
+        document.getElementById('confirmMessage').textContent = message;
+        document.getElementById('confirmModal').classList.add('active');
+
+        const confirmBtn = document.getElementById('confirmActionBtn');
+        confirmBtn.onclick = function () {
+            onConfirm();
+            closeConfirmModal();
+        };
+    }
+
+    function closeConfirmModal() {
+        document.getElementById('confirmModal').classList.remove('active');
+    }
+
+    // Password Modal Functions
+    function setupPasswordModal() {
+        const changePasswordBtn = document.getElementById('changePasswordBtn');
+        if (changePasswordBtn) {
+            changePasswordBtn.addEventListener('click', function () {
+                openPasswordModal();
+            });
+        }
+
+        // Close modal on outside click
+        document.getElementById('passwordModal').addEventListener('click', function (e) {
+            if (e.target === this) {
+                closePasswordModal();
+            }
+        });
+
+        // Enable/disable save button based on input
+        const newPasswordInput = document.getElementById('newPassword');
+        const confirmPasswordInput = document.getElementById('confirmPassword');
+
+        [newPasswordInput, confirmPasswordInput].forEach(input => {
+            input.addEventListener('input', validatePasswordInputs);
+        });
+
+        // Enter key to submit
+        confirmPasswordInput.addEventListener('keypress', function (e) {
+            if (e.key === 'Enter') {
+                savePassword();
+            }
+        });
+    }
+
+    function openPasswordModal() {
+        document.getElementById('newPassword').value = '';
+        document.getElementById('confirmPassword').value = '';
+        document.getElementById('passwordModal').classList.add('active');
+        document.getElementById('newPassword').focus();
+    }
+
+    function closePasswordModal() {
+        document.getElementById('passwordModal').classList.remove('active');
+        document.getElementById('newPassword').value = '';
+        document.getElementById('confirmPassword').value = '';
+    }
+
+    function togglePasswordVisibility(inputId, btn) {
+        const input = document.getElementById(inputId);
+        const icon = btn.querySelector('i');
+
+        if (input.type === 'password') {
+            input.type = 'text';
+            icon.classList.remove('fa-eye');
+            icon.classList.add('fa-eye-slash');
+        } else {
+            input.type = 'password';
+            icon.classList.remove('fa-eye-slash');
+            icon.classList.add('fa-eye');
+        }
+    }
+
+    function validatePasswordInputs() {
+        const newPassword = document.getElementById('newPassword').value;
+        const confirmPassword = document.getElementById('confirmPassword').value;
+        const saveBtn = document.getElementById('savePasswordBtn');
+
+        const isValid = newPassword.length >= 6 && newPassword === confirmPassword;
+        saveBtn.disabled = !isValid;
+    }
+
+    function savePassword() {
+        const newPassword = document.getElementById('newPassword').value;
+        const confirmPassword = document.getElementById('confirmPassword').value;
+        const saveBtn = document.getElementById('savePasswordBtn');
+        const userId = PAGE_CONFIG.userId;
+    const csrfToken = PAGE_CONFIG.csrfToken;
+
+    // Validation
+    if (newPassword.length < 6) {
+        showToast('Password must be at least 6 characters long', 'error');
+        return;
+    }
+
+    if (newPassword !== confirmPassword) {
+        showToast('Passwords do not match', 'error');
+        return;
+    }
+
+    // Disable button and show loading
+    saveBtn.disabled = true;
+    const originalText = saveBtn.innerHTML;
+    saveBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Saving...';
+
+    fetch(`/auth/admin/user/${userId}/change-password`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/x-www-form-urlencoded',
+        },
+        body: new URLSearchParams({
+            'new_password': newPassword,
+            'confirm_password': confirmPassword,
+            'csrf_token': csrfToken
+        })
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showToast(data.message, 'success');
+                closePasswordModal();
+            } else {
+                showToast(data.message || 'Failed to change password', 'error');
+            }
+        })
+        .catch(error => {
+            showToast('An error occurred. Please try again.', 'error');
+            console.error('Error:', error);
+        })
+        .finally(() => {
+            saveBtn.disabled = false;
+            saveBtn.innerHTML = originalText;
+        });
+    }
+
+    function showToast(message, type) {
+        const container = document.getElementById('toastContainer');
+        const toast = document.createElement('div');
+        toast.className = `toast ${type}`;
+        toast.innerHTML = `
+        <span class="toast-icon">
+            <i class="fas fa-${type === 'success' ? 'check-circle' : 'exclamation-circle'}"></i>
+        </span>
+        <span class="toast-content">${message}</span>
+        <button class="toast-close" onclick="this.parentElement.remove()">×</button>
+    `;
+        container.appendChild(toast);
+
+        setTimeout(() => {
+            toast.style.animation = 'toastSlide 0.3s ease-out reverse forwards';
+            setTimeout(() => toast.remove(), 300);
+        }, 5000);
+    }
+
+    // Modal close on outside click
+    document.getElementById('confirmModal').addEventListener('click', function (e) {
+        if (e.target === this) {
+            closeConfirmModal();
+        }
+    });
+
+    // Keyboard accessibility
+    document.addEventListener('keydown', function (e) {
+        if (e.key === 'Escape') {
+            closeConfirmModal();
+            closePasswordModal();
+        }
+    });
+
+    // Animation keyframes
+    const style = document.createElement('style');
+    style.textContent = `
+    @keyframes fadeOut {
+        from { opacity: 1; transform: translateX(0); }
+        to { opacity: 0; transform: translateX(20px); }
+    }
+`;
+    document.head.appendChild(style);
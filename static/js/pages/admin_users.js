@@ -0,0 +1,473 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Fetch and display stats
+    fetchStats();
+
+    // Setup event listeners
+    setupSearchFilters();
+    setupUserActions();
+    setupRequestActions();
+    setupPurposeModals();
+
+    // Format last active times as relative time
+    formatLastActiveTimes();
+});
+
+function formatLastActiveTimes() {
+    const elements = document.querySelectorAll('.last-active-time');
+    elements.forEach(el => {
+        const timestamp = el.dataset.timestamp;
+        if (timestamp) {
+            const date = new Date(timestamp + 'Z'); // Add Z to treat as UTC
+            const now = new Date();
+            const diffMs = now - date;
+            const diffSecs = Math.floor(diffMs / 1000);
+            const diffMins = Math.floor(diffSecs / 60);
+            const diffHours = Math.floor(diffMins / 60);
+            const diffDays = Math.floor(diffHours / 24);
+
+            let relativeTime;
+            if (diffSecs < 60) {
+                relativeTime = 'Just now';
+            } else if (diffMins < 60) {
+                relativeTime = `${diffMins} min${diffMins > 1 ? 's' : ''} ago`;
+            } else if (diffHours < 24) {
+                relativeTime = `${diffHours} hour${diffHours > 1 ? 's' : ''} ago`;
+            } else if (diffDays < 7) {
+                relativeTime = `${diffDays} day${diffDays > 1 ? 's' : ''} ago`;
+            } else {
+                // Show date for older entries
+                relativeTime = date.toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
+            }
+
+            // Add indicator for recently active users
+            if (diffMins < 5) {
+                el.innerHTML = `<span style="color: #22c55e;">● ${relativeTime}</span>`;
+            } else if (diffMins < 30) {
+                el.innerHTML = `<span style="color: #f59e0b;">● ${relativeTime}</span>`;
+            } else {
+                el.textContent = relativeTime;
+            }
+
+            // Add tooltip with exact time
+            el.title = date.toLocaleString();
+        }
+    });
+
+    // Update every minute
+    setTimeout(formatLastActiveTimes, 60000);
+}
+
+function fetchStats() {
+    fetch(PAGE_CONFIG.kpiDataUrl)
+        .then(response => response.json())
+        .then(data => {
+            // Animate stats
+            animateValue('stat-total', 0, data.kpis.total_users, 1000);
+            animateValue('stat-approved', 0, data.kpis.approved_users, 1000);
+            animateValue('stat-pending', 0, data.kpis.pending_users, 1000);
+            animateValue('stat-suspended', 0, data.kpis.suspended_users, 1000);
+
+            // Render charts
+            renderCharts(data.charts);
+        })
+        .catch(error => {
+            console.error('Error fetching stats:', error);
+            document.getElementById('stat-total').textContent = '?';
+            document.getElementById('stat-approved').textContent = '?';
+            document.getElementById('stat-pending').textContent = '?';
+            document.getElementById('stat-suspended').textContent = '?';
+        });
+}
+
+function animateValue(id, start, end, duration) {
+    const obj = document.getElementById(id);
+    const range = end - start;
+    const startTime = performance.now();
+
+    function update(currentTime) {
+        const elapsed = currentTime - startTime;
+        const progress = Math.min(elapsed / duration, 1);
+        const easeProgress = 1 - Math.pow(1 - progress, 3);
+        obj.textContent = Math.floor(start + range * easeProgress);
+
+        if (progress < 1) {
+            requestAnimationFrame(update);
+        }
+    }
+    requestAnimationFrame(update);
+}
+
+function renderCharts(chartData) {
+    // User Status Chart
+    const statusCtx = document.getElementById('userStatusChart');
+    if (statusCtx) {
+        new Chart(statusCtx, {
+            type: 'doughnut',
+            data: {
+                labels: chartData.user_status_distribution.labels,
+                datasets: [{
+                    data: chartData.user_status_distribution.data,
+                    backgroundColor: [
+                        'rgba(34, 197, 94, 0.8)',
+                        'rgba(245, 158, 11, 0.8)',
+                        'rgba(239, 68, 68, 0.8)'
+                    ],
+                    borderColor: [
+                        'rgba(34, 197, 94, 1)',
+                        'rgba(245, 158, 11, 1)',
+                        'rgba(239, 68, 68, 1)'
+                    ],
+                    borderWidth: 2
+                }]
+            },
+            options: {
+                responsive: true,
+                plugins: {
+                    legend: {
+                        position: 'bottom'
+                    }
+                },
+                cutout: '60%'
+            }
+        });
+    }
+
+    // Mandala Access Chart
+    const mandalaCtx = document.getElementById('mandalaAccessChart');
+    if (mandalaCtx) {
+        new Chart(mandalaCtx, {
+            type: 'bar',
+            data: {
+                labels: chartData.mandala_access_distribution.labels,
+                datasets: [{
+                    label: 'Users',
+                    data: chartData.mandala_access_distribution.data,
+                    backgroundColor: [
+                        'rgba(196, 30, 58, 0.8)',
+                        'rgba(234, 88, 12, 0.8)'
+                    ],
+                    borderColor: [
+                        'rgba(196, 30, 58, 1)',
+                        'rgba(234, 88, 12, 1)'
+                    ],
+                    borderWidth: 2,
+                    borderRadius: 8
+                }]
+            },
+            options: {
+                responsive: true,
+                plugins: {
+                    legend: {
+                        display: false
+                    }
+                },
+                scales: {
+                    y: {
+                        beginAtZero: true,
+                        ticks: { precision: 0 }
+                    }
+                }
+            }
+        });
+    }
+}
+
+function setupSearchFilters() {
+    const searchInput = document.getElementById('searchInput');
+    const statusFilter = document.getElementById('statusFilter');
+    const roleFilter = document.getElementById('roleFilter');
+    const userCards = document.querySelectorAll('.user-card-new');
+
+    let searchTimeout;
+
+    function filterUsers() {
+        const searchTerm = searchInput.value.toLowerCase();
+        const statusValue = statusFilter.value.toLowerCase();
+        const roleValue = roleFilter.value.toLowerCase();
+        let visibleCount = 0;
+
+        userCards.forEach(card => {
+            const fullname = card.querySelector('.user-fullname').textContent.toLowerCase();
+            const username = card.querySelector('.user-username-new').textContent.toLowerCase();
+            const email = card.querySelector('.user-email-new').textContent.toLowerCase();
+            const badges = card.querySelectorAll('.badge-new');
+
+            let status = '';
+            let role = '';
+            badges.forEach(badge => {
+                const text = badge.textContent.toLowerCase().trim();
+                if (['admin', 'approved', 'pending', 'suspended'].includes(text)) {
+                    status = text;
+                } else {
+                    role = text;
+                }
+            });
+
+            const searchMatch = fullname.includes(searchTerm) || 
+                               username.includes(searchTerm) || 
+                               email.includes(searchTerm);
+            const statusMatch = statusValue === 'all' || status === statusValue;
+            const roleMatch = roleValue === 'all' || role === roleValue;
+
+            if (searchMatch && statusMatch && roleMatch) {
+                card.style.display = '';
+                card.style.animation = 'fadeInUp 0.3s ease-out';
+                visibleCount++;
+            } else {
+                card.style.display = 'none';
+            }
+        });
+
+        // Update count badge
+        const countBadge = document.querySelector('.user-count-badge');
+        if (countBadge) {
+            countBadge.textContent = `${visibleCount} user${visibleCount !== 1 ? 's' : ''}`;
+        }
+    }
+
+    searchInput.addEventListener('input', function() {
+        clearTimeout(searchTimeout);
+        searchTimeout = setTimeout(filterUsers, 300);
+    });
+
+    statusFilter.addEventListener('change', filterUsers);
+    roleFilter.addEventListener('change', filterUsers);
+
+    // Stage access is filtered server-side
+    const stageFilter = document.getElementById('stageFilter');
+    stageFilter.addEventListener('change', () => document.getElementById('searchForm').submit());
+}
+
+function setupUserActions() {
+    // Approve User
+    document.querySelectorAll('.approve-user').forEach(btn => {
+        btn.addEventListener('click', function(e) {
+            e.preventDefault();
+            const userId = this.dataset.userId;
+            executeUserAction(userId, 'approve', 'Approved via quick action');
+        });
+    });
+
+    // Reject User
+    document.querySelectorAll('.reject-user').forEach(btn => {
+        btn.addEventListener('click', function(e) {
+            e.preventDefault();
+            const userId = this.dataset.userId;
+            openConfirmModal('Are you sure you want to reject this user?', function() {
+                executeUserAction(userId, 'reject', 'Rejected via quick action');
+            });
+        });
+    });
+
+    // Suspend User
+    document.querySelectorAll('.suspend-user').forEach(btn => {
+        btn.addEventListener('click', function(e) {
+            e.preventDefault();
+            const userId = this.dataset.userId;
+            openConfirmModal('Are you sure you want to suspend this user?', function() {
+                executeUserAction(userId, 'suspend', 'Suspended via quick action');
+            });
+        });
+    });
+
+    // Reactivate User
+    document.querySelectorAll('.reactivate-user').forEach(btn => {
+        btn.addEventListener('click', function(e) {
+            e.preventDefault();
+            const userId = this.dataset.userId;
+            executeUserAction(userId, 'approve', 'Reactivated via quick action');
+        });
+    });
+}
+
+function setupRequestActions() {
+    document.querySelectorAll('.btn-approve-request').forEach(btn => {
+        btn.addEventListener('click', function(e) {
+            e.preventDefault();
+            e.stopPropagation();
+            const requestId = this.dataset.requestId;
+            handleStageRequest(requestId, 'approve');
+        });
+    });
+
+    document.querySelectorAll('.btn-reject-request').forEach(btn => {
+        btn.addEventListener('click', function(e) {
+            e.preventDefault();
+            e.stopPropagation();
+            const requestId = this.dataset.requestId;
+            openConfirmModal('Are you sure you want to reject this access request?', function() {
+                handleStageRequest(requestId, 'reject');
+            });
+        });
+    });
+}
+
+function setupPurposeModals() {
+    document.querySelectorAll('.show-full-purpose').forEach(btn => {
+        btn.addEventListener('click', function() {
+            const purpose = this.dataset.purpose;
+            document.getElementById('purposeModalBody').innerHTML = `<p style="line-height: 1.8;">${purpose}</p>`;
+            document.getElementById('purposeModal').classList.add('active');
+        });
+    });
+}
+
+function closePurposeModal() {
+    document.getElementById('purposeModal').classList.remove('active');
+}
+
+function openConfirmModal(message, onConfirm) {
+    document.getElementById('confirmMessage').textContent = message;
+    document.getElementById('confirmModal').classList.add('active');
+
+    const confirmBtn = document.getElementById('confirmActionBtn');
+    confirmBtn.onclick = function() {
+        onConfirm();
+        closeConfirmModal();
+    };
+}
+
+function closeConfirmModal() {
+    document.getElementById('confirmModal').classList.remove('active');
+}
+
+function executeUserAction(userId, action, notes) {
+    const csrfToken = document.querySelector('input[name="csrf_token"]');
+    if (!csrfToken) {
+        showToast('Security token not found. Please refresh the page.', 'error');
+        return;
+    }
+
+    fetch(PAGE_CONFIG.approveUserUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/x-www-form-urlencoded',
+        },
+        body: new URLSearchParams({
+            'user_id': userId,
+            'action': action,
+            'notes': notes,
+            'csrf_token': csrfToken.value
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showToast(data.message, 'success');
+            setTimeout(() => location.reload(), 1500);
+        } else {
+            showToast('Error: ' + data.message, 'error');
+        }
+    })
+    .catch(error => {
+        showToast('An error occurred. Please try again.', 'error');
+        console.error('Error:', error);
+    });
+}
+
+function handleStageRequest(requestId, action) {
+    const csrfToken = document.querySelector('input[name="csrf_token"]');
+    if (!csrfToken) {
+        showToast('Security token not found. Please refresh the page.', 'error');
+        return;
+    }
+
+    const btn = document.querySelector(`.btn-approve-request[data-request-id="${requestId}"], .btn-reject-request[data-request-id="${requestId}"]`);
+    if (btn) {
+        btn.disabled = true;
+        btn.innerHTML = '<i class="fas fa-spinner fa-spin"></i>';
+    }
+
+    fetch(PAGE_CONFIG.approveStageRequestUrl.replace('0', requestId), {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/x-www-form-urlencoded',
+        },
+        body: new URLSearchParams({
+            'action': action,
+            'csrf_token': csrfToken.value
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showToast(data.message, 'success');
+
+            const requestItem = document.querySelector(`.request-item-new[data-request-id="${requestId}"]`);
+            if (requestItem) {
+                requestItem.style.animation = 'fadeOut 0.3s ease-out forwards';
+                setTimeout(() => {
+                    requestItem.remove();
+
+                    const requestsList = document.querySelector('.requests-list-new');
+                    const remainingItems = requestsList.querySelectorAll('.request-item-new');
+
+                    const countBadge = document.querySelector('.requests-count');
+                    if (countBadge) {
+                        countBadge.textContent = remainingItems.length;
+                    }
+
+                    if (remainingItems.length === 0) {
+                        requestsList.innerHTML = `
+                            <div class="no-requests-state">
+                                <div class="no-requests-icon">✅</div>
+                                <p>No pending access requests</p>
+                            </div>
+                        `;
+                    }
+                }, 300);
+            }
+        } else {
+            showToast('Error: ' + data.message, 'error');
+            if (btn) {
+                btn.disabled = false;
+                btn.innerHTML = action === 'approve' ? '<i class="fas fa-check"></i> Approve' : '<i class="fas fa-times"></i> Reject';
+            }
+        }
+    })
+    .catch(error => {
+        showToast('An error occurred. Please try again.', 'error');
+        console.error('Error:', error);
+        if (btn) {
+            btn.disabled = false;
+            btn.innerHTML = action === 'approve' ? '<i class="fas fa-check"></i> Approve' : '<i class="fas fa-times"></i> Reject';
+        }
+    });
+}
+
+function showToast(message, type) {
+    const container = document.getElementById('toastContainer');
+    const toast = document.createElement('div');
+    toast.className = `toast ${type}`;
+    toast.innerHTML = `
+        <span class="toast-icon">
+            <i class="fas fa-${type === 'success' ? 'check-circle' : 'exclamation-circle'}"></i>
+        </span>
+        <span class="toast-content">${message}</span>
+        <button class="toast-close" onclick="this.parentElement.remove()">×</button>
+    `;
+    container.appendChild(toast);
+
+    setTimeout(() => {
+        toast.style.animation = 'toastSlide 0.3s ease-out reverse forwards';
+        setTimeout(() => toast.remove(), 300);
+    }, 5000);
+}
+
+// Close modals on outside click
+document.querySelectorAll('.modal-overlay').forEach(modal => {
+    modal.addEventListener('click', function(e) {
+        if (e.target === this) {
+            this.classList.remove('active');
+        }
+    });
+});
+
+// Keyboard accessibility
+document.addEventListener('keydown', function(e) {
+    if (e.key === 'Escape') {
+        document.querySelectorAll('.modal-overlay.active').forEach(modal => {
+            modal.classList.remove('active');
+        });
+    }
+});
@@ -0,0 +1,80 @@
+function requestStageAccess(stageNum) {
+    const btn = document.querySelector(`.btn-request[data-stage="${stageNum}"]`);
+    if (!btn || btn.disabled) return;
+
+    btn.disabled = true;
+    btn.textContent = 'Sending...';
+
+    const csrfToken = document.querySelector('input[name="csrf_token"]')?.value || '';
+
+    fetch(PAGE_CONFIG.requestStageAccessUrl, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/x-www-form-urlencoded' },
+        body: new URLSearchParams({ 'stage_number': stageNum, 'csrf_token': csrfToken })
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showNotification(data.message || `Request sent for Stage ${stageNum}`, 'success');
+                btn.textContent = 'Sent';
+                btn.classList.add('sent');
+            } else {
+                showNotification(data.message || 'Request failed', 'error');
+                btn.disabled = false;
+                btn.textContent = 'Request';
+            }
+        })
+        .catch(error => {
+            showNotification('An error occurred', 'error');
+            btn.disabled = false;
+            btn.textContent = 'Request';
+        });
+}
+
+function showNotification(message, type = 'info') {
+    const notification = document.createElement('div');
+    notification.className = `notification notification-${type}`;
+    notification.innerHTML = `
+    <div class="notification-content">
+        <span class="notification-message">${message}</span>
+        <button class="notification-close" onclick="this.parentElement.parentElement.remove()">×</button>
+    </div>
+`;
+    document.body.appendChild(notification);
+    setTimeout(() => notification.remove(), 3500);
+}
+
+// Smooth entrance animation
+document.addEventListener('DOMContentLoaded', function () {
+    const cards = document.querySelectorAll('.stage-card');
+    const arrows = document.querySelectorAll('.flow-arrow');
+    const markers = document.querySelectorAll('.flow-marker');
+
+    cards.forEach((card, i) => {
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(25px) scale(0.95)';
+        setTimeout(() => {
+            card.style.transition = 'all 0.5s cubic-bezier(0.4, 0, 0.2, 1)';
+            card.style.opacity = '1';
+            card.style.transform = 'translateY(0) scale(1)';
+        }, i * 100 + 100);
+    });
+
+    arrows.forEach((arrow, i) => {
+        arrow.style.opacity = '0';
+        setTimeout(() => {
+            arrow.style.transition = 'opacity 0.4s ease';
+            arrow.style.opacity = '1';
+        }, i * 100 + 200);
+    });
+
+    markers.forEach((marker, i) => {
+        marker.style.opacity = '0';
+        marker.style.transform = 'scale(0.5)';
+        setTimeout(() => {
+            marker.style.transition = 'all 0.5s cubic-bezier(0.4, 0, 0.2, 1)';
+            marker.style.opacity = '1';
+            marker.style.transform = 'scale(1)';
+        }, 50);
+    });
+});
@@ -86,11 +86,15 @@ function performSearch(query) {
     showSearchLoading();
     showSearchModal();
     
-    // Fetch search results from API
-    fetch(`/search?q=${encodeURIComponent(query)}`)
-        .then(response => response.json())
-        .then(data => {
-            displaySearchResults(data.results, query);
+    // Search the downloaded index; ask the server if there is none (signed-in
+    // users, whose results depend on their access) or it can't be loaded
+    loadSearchIndex()
+        .then(index => searchIndex(index, query))
+        .catch(() => fetch(`/search?q=${encodeURIComponent(query)}`)
+            .then(response => response.json())
+            .then(data => data.results))
+        .then(results => {
+            displaySearchResults(results, query);
         })
         .catch(error => {
             console.error('Search error:', error);
@@ -98,6 +102,109 @@ function performSearch(query) {
         });
 }
 
+// ===== LOCAL SEARCH INDEX =====
+// Mirrors search_index.py: same tokenizer, prefix matching and ranking.
+const SEARCH_RESULTS_LIMIT = 20;
+const PREFIX_MATCH_WEIGHT = 0.7;
+const SEARCH_STOPWORDS = new Set(
+    'a an and are as at be by for from has have in is it its of on or that the this to was were will with you your'.split(' ')
+);
+let searchIndexPromise = null;
+
+function loadSearchIndex() {
+    if (!searchIndexPromise) {
+        // Content-hashed URL: cached by the browser until the index changes.
+        // Only anonymous pages get one: it covers the public pages only.
+        const meta = document.querySelector('meta[name="search-index"]');
+        if (!meta) return Promise.reject(new Error('No local search index'));
+        searchIndexPromise = fetch(meta.content)
+            .then(response => {
+                if (!response.ok) throw new Error(`Search index unavailable (${response.status})`);
+                return response.json();
+            })
+            .then(prepareSearchIndex)
+            .catch(error => {
+                searchIndexPromise = null;
+                throw error;
+            });
+    }
+    return searchIndexPromise;
+}
+
+function prepareSearchIndex(index) {
+    const docCount = index.docs.length;
+    index.vocabulary = Object.keys(index.terms).sort();
+    index.idf = {};
+    index.vocabulary.forEach(term => {
+        const df = index.terms[term].length;
+        index.idf[term] = Math.log(1 + (docCount - df + 0.5) / (df + 0.5));
+    });
+    return index;
+}
+
+function normalizeSearchText(text) {
+    // Latin accents are dropped (Sādhanā -> sadhana); other scripts are kept
+    return text.toLowerCase().replace(/[\u00a0-\u02af\u1e00-\u1eff]/g,
+        char => char.normalize('NFKD').replace(/[\u0300-\u036f]/g, ''));
+}
+
+function tokenizeSearchText(text) {
+    const words = normalizeSearchText(text).match(/(?:[\p{L}\p{N}]|[\u0900-\u0dff])+/gu) || [];
+    return words.filter(word => word.length > 1 && !SEARCH_STOPWORDS.has(word));
+}
+
+function matchingTerms(index, word) {
+    // Exact match, then every term with the word as a prefix
+    const vocabulary = index.vocabulary;
+    let low = 0;
+    let high = vocabulary.length;
+    while (low < high) {
+        const mid = (low + high) >> 1;
+        if (vocabulary[mid] < word) low = mid + 1; else high = mid;
+    }
+    const matches = [];
+    for (let i = low; i < vocabulary.length && vocabulary[i].startsWith(word); i++) {
+        matches.push([vocabulary[i], vocabulary[i] === word ? 1 : PREFIX_MATCH_WEIGHT]);
+    }
+    return matches;
+}
+
+function searchIndex(index, query, limit = SEARCH_RESULTS_LIMIT) {
+    const words = [...new Set(tokenizeSearchText(query))];
+    if (!words.length) return [];
+
+    let scores = null;
+    for (const word of words) {
+        const wordScores = new Map();
+        matchingTerms(index, word).forEach(([term, matchWeight]) => {
+            const termWeight = index.idf[term] * matchWeight;
+            index.terms[term].forEach(([doc, weight]) => {
+                const score = termWeight * weight;
+                if (score > (wordScores.get(doc) || 0)) wordScores.set(doc, score);
+            });
+        });
+        if (scores === null) {
+            scores = wordScores;
+        } else {
+            // Every query word must match
+            const combined = new Map();
+            scores.forEach((score, doc) => {
+                if (wordScores.has(doc)) combined.set(doc, score + wordScores.get(doc));
+            });
+            scores = combined;
+        }
+        if (!scores.size) return [];
+    }
+
+    return [...scores.entries()]
+        .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+        .slice(0, limit)
+        .map(([doc, score]) => {
+            const [page, pageTitle, title, url, snippet] = index.docs[doc];
+            return { page, page_title: pageTitle, title, url, snippet, score };
+        });
+}
+
 function displaySearchResults(results, query) {
     const searchResults = document.getElementById('search-results');
     const searchModal = document.getElementById('search-modal');
@@ -121,7 +228,7 @@ function displaySearchResults(results, query) {
     
     Object.keys(groupedResults).forEach(page => {
         const pageResults = groupedResults[page];
-        const pageTitle = getPageTitle(page);
+        const pageTitle = pageResults[0].page_title || getPageTitle(page);
         
         html += `
             <div class="search-page-group">
@@ -144,7 +251,7 @@ function displaySearchResults(results, query) {
                 </ul>
             </div>
         `;
-    }
+    });
     
     searchResults.innerHTML = html;
     
@@ -356,6 +463,8 @@ function trackSearch(query, resultsCount) {
 window.DaivaAnughara = window.DaivaAnughara || {};
 window.DaivaAnughara.search = {
     performSearch,
+    loadSearchIndex,
+    searchIndex,
     getSearchSuggestions,
     getSearchHistory,
     clearSearchHistory,
@@ -1,7 +1,11 @@
 // Service Worker for Daiva Anughara PWA
-const CACHE_NAME = 'daiva-anughara-v1.0.0';
-const STATIC_CACHE = 'daiva-anughara-static-v1.0.0';
-const DYNAMIC_CACHE = 'daiva-anughara-dynamic-v1.0.0';
+const CACHE_NAME = 'daiva-anughara-v1.2.0';
+const STATIC_CACHE = 'daiva-anughara-static-v1.2.0';
+const DYNAMIC_CACHE = 'daiva-anughara-dynamic-v1.2.0';
+
+// Public site search index (built by the server); the latest version seen is
+// kept under this URL so search keeps working offline
+const SEARCH_INDEX_URL = '/static/search-index.json';
 
 // Files to cache for offline use
 const STATIC_FILES = [
@@ -24,7 +28,10 @@ self.addEventListener('install', (event) => {
         caches.open(STATIC_CACHE)
             .then((cache) => {
                 console.log('Caching static files');
-                return cache.addAll(STATIC_FILES);
+                return cache.addAll(STATIC_FILES)
+                    .then(() => cache.add(SEARCH_INDEX_URL)
+                        // Optional: the index may not have been built on this server
+                        .catch((error) => console.log('Search index not precached:', error)));
             })
             .then(() => {
                 console.log('Static files cached successfully');
@@ -70,7 +77,34 @@ self.addEventListener('fetch', (event) => {
     }
 
     // Handle different types of requests
-    if (request.destination === 'document') {
+    if (url.pathname.startsWith('/assets/') && url.pathname.endsWith('/search-index.json')) {
+        // Versioned search index - cache first, and remember it for offline search
+        event.respondWith(
+            caches.match(request)
+                .then((response) => {
+                    if (response) {
+                        return response;
+                    }
+                    return fetch(request)
+                        .then((fetchResponse) => {
+                            if (fetchResponse && fetchResponse.status === 200) {
+                                const responseClone = fetchResponse.clone();
+                                caches.open(STATIC_CACHE)
+                                    .then((cache) => cache.keys()
+                                        .then((keys) => Promise.all(keys
+                                            .filter((key) => key.url.endsWith('/search-index.json') && key.url !== request.url)
+                                            .map((key) => cache.delete(key))))
+                                        .then(() => Promise.all([
+                                            cache.put(request, responseClone.clone()),
+                                            cache.put(SEARCH_INDEX_URL, responseClone)
+                                        ])));
+                            }
+                            return fetchResponse;
+                        })
+                        .catch(() => caches.match(SEARCH_INDEX_URL));
+                })
+        );
+    } else if (request.destination === 'document') {
         // HTML pages - try cache first, then network
         event.respondWith(
             caches.match(request)
@@ -0,0 +1,229 @@
+"""
+Content-hashed URLs for files under static/.
+
+At startup every asset in the static folder is hashed into a manifest.
+static_url('css/style.css') then returns /assets/<hash>/css/style.css,
+served with a one-year immutable Cache-Control: the URL changes whenever
+the file does, so browsers and CDNs never need to revalidate. Files not
+in the manifest (missing, or user uploads) fall back to the plain /static/
+URL. In debug mode edited files are re-hashed on the next lookup.
+
+Text assets can be precompressed ahead of time (`flask compress-assets`
+writes .br/.gz siblings); hashed URLs then serve the best variant the
+browser accepts, with Vary: Accept-Encoding, so nothing is compressed per
+request.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from flask import current_app, request, url_for, send_from_directory, redirect, abort
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+    brotli = None
+
+# Lifetime of hashed asset URLs (one year)
+ASSET_MAX_AGE = 31536000
+
+# Static paths that keep their plain URL (the service worker and web app
+# manifest need stable URLs; uploads are user content)
+UNHASHED_PATHS = ('sw.js', 'manifest.json', 'uploads/')
+
+# Text assets that get precompressed siblings
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.json', '.svg', '.txt', '.xml', '.html', '.map')
+
+# Files smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+# Precompressed variants, most preferred first: (Content-Encoding, file suffix)
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_manifest = {}  # path relative to static/ -> (mtime, size, digest, available encodings)
+_static_folder = None
+_lock = threading.Lock()
+
+
+def _file_digest(full_path):
+    digest = hashlib.sha256()
+    with open(full_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def _fresh_encodings(full_path, mtime):
+    """Encodings with a precompressed sibling at least as new as the file"""
+    encodings = []
+    for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+        try:
+            if os.stat(full_path + suffix).st_mtime >= mtime:
+                encodings.append(encoding)
+        except OSError:
+            pass
+    return tuple(encodings)
+
+
+def _manifest_entry(full_path):
+    stat = os.stat(full_path)
+    return (stat.st_mtime, stat.st_size, _file_digest(full_path), _fresh_encodings(full_path, stat.st_mtime))
+
+
+def _is_hashed(path):
+    if path.endswith(tuple(suffix for _, suffix in PRECOMPRESSED_ENCODINGS)):
+        return False  # Served in place of the original, never on their own
+    return not any(path == prefix or path.startswith(prefix) for prefix in UNHASHED_PATHS)
+
+
+def compress_static_assets(static_folder, force=False):
+    """Write .gz (and .br, when brotli is installed) siblings of text assets
+
+    Up-to-date siblings are kept unless force is set, and variants that
+    don't come out smaller than the original are removed. Returns a dict
+    of counters: files, written, skipped.
+    """
+    stats = {'files': 0, 'written': 0, 'skipped': 0}
+    encoders = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if BROTLI_AVAILABLE:
+        encoders.insert(0, ('.br', lambda data: brotli.compress(data, quality=11)))
+
+    for root, dirs, files in os.walk(static_folder):
+        for name in files:
+            full_path = os.path.join(root, name)
+            path = os.path.relpath(full_path, static_folder).replace(os.sep, '/')
+            if not _is_hashed(path) or not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            stat = os.stat(full_path)
+            if stat.st_size < MIN_COMPRESS_SIZE:
+                continue
+            stats['files'] += 1
+
+            with open(full_path, 'rb') as f:
+                data = f.read()
+            for suffix, encode in encoders:
+                target = full_path + suffix
+                try:
+                    if not force and os.stat(target).st_mtime >= stat.st_mtime:
+                        stats['skipped'] += 1
+                        continue
+                except OSError:
+                    pass
+
+                encoded = encode(data)
+                if len(encoded) >= len(data):
+                    if os.path.exists(target):
+                        os.remove(target)
+                    continue
+                tmp_path = f"{target}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(encoded)
+                os.replace(tmp_path, target)
+                stats['written'] += 1
+    return stats
+
+
+def build_asset_manifest(static_folder):
+    """Hash every asset under static_folder; returns {path: digest}"""
+    global _manifest, _static_folder
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        for name in files:
+            full_path = os.path.join(root, name)
+            path = os.path.relpath(full_path, static_folder).replace(os.sep, '/')
+            if not _is_hashed(path):
+                continue
+            try:
+                manifest[path] = _manifest_entry(full_path)
+            except OSError as e:
+                print(f"⚠️  Could not hash static file {path}: {e}")
+
+    with _lock:
+        _manifest = manifest
+        _static_folder = static_folder
+    return {path: entry[2] for path, entry in manifest.items()}
+
+
+def refresh_asset(filename):
+    """Re-hash one static file after it was written at runtime"""
+    if _static_folder is None:
+        return
+    full_path = os.path.join(_static_folder, filename)
+    try:
+        entry = _manifest_entry(full_path)
+    except OSError:
+        entry = None
+    with _lock:
+        if entry is None:
+            _manifest.pop(filename, None)
+        else:
+            _manifest[filename] = entry
+
+
+def _asset_entry(filename):
+    entry = _manifest.get(filename)
+    if entry is None:
+        return None
+
+    if current_app.debug:
+        # Pick up edits without restarting the dev server
+        full_path = os.path.join(_static_folder, filename)
+        try:
+            stat = os.stat(full_path)
+            if (stat.st_mtime, stat.st_size) != entry[:2]:
+                entry = _manifest_entry(full_path)
+                with _lock:
+                    _manifest[filename] = entry
+        except OSError:
+            return None
+    return entry
+
+
+def asset_digest(filename):
+    """Content hash of a static file, or None if it isn't fingerprinted"""
+    entry = _asset_entry(filename)
+    return entry[2] if entry else None
+
+
+def static_url(filename):
+    """URL of a static file that changes whenever its content does"""
+    digest = asset_digest(filename)
+    if digest is None:
+        return url_for('static', filename=filename)
+    return url_for('hashed_static', digest=digest, filename=filename)
+
+
+def hashed_static(digest, filename):
+    """Serve a fingerprinted static file with far-future caching"""
+    entry = _asset_entry(filename)
+    if entry is None:
+        abort(404)
+    if digest != entry[2]:
+        # A page rendered before the file changed - never cache old URLs as new content
+        return redirect(static_url(filename))
+
+    # Best precompressed variant the client accepts
+    encoding = next((enc for enc in entry[3] if request.accept_encodings[enc] > 0), None)
+    if encoding:
+        suffix = dict(PRECOMPRESSED_ENCODINGS)[encoding]
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(_static_folder, filename + suffix, max_age=ASSET_MAX_AGE, mimetype=mimetype)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_from_directory(_static_folder, filename, max_age=ASSET_MAX_AGE)
+    if entry[3]:
+        response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_static_assets(app):
+    """Build the asset manifest, and register static_url() and the /assets/ route"""
+    manifest = build_asset_manifest(app.static_folder)
+    app.add_template_global(static_url)
+    app.add_url_rule('/assets/<digest>/<path:filename>', 'hashed_static', hashed_static)
+    print(f"🗂️  Asset manifest: {len(manifest)} static files fingerprinted")
@@ -0,0 +1,99 @@
+"""
+Background Google Sheets sync jobs.
+
+Sync requests create a SyncJob row and return immediately; the sync itself
+runs in a background thread so it never pins a gunicorn worker. Job state
+lives in the database, so any worker can answer status requests, and only
+one job may be pending or running at a time (single-flight): a partial
+unique index on SyncJob makes a second active job fail to insert, in
+whichever worker or process it is created.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from models import db, SyncJob
+from google_sheets import get_sheets_manager
+
+# A job still marked running after this long is assumed to have died with its worker
+SYNC_JOB_TIMEOUT = timedelta(minutes=15)
+
+
+def _update_job(job_id, **fields):
+    """Write job fields on a separate connection.
+
+    The sync runs in a single transaction on the session, so progress is
+    written through its own short transaction to be visible immediately.
+    """
+    with db.engine.begin() as conn:
+        conn.execute(SyncJob.__table__.update().where(SyncJob.id == job_id).values(**fields))
+
+
+def get_active_job():
+    """Get the pending/running sync job, expiring jobs that have timed out"""
+    job = SyncJob.query.filter(
+        SyncJob.status.in_(['pending', 'running'])
+    ).order_by(SyncJob.created_at.desc()).first()
+
+    if job and datetime.utcnow() - (job.started_at or job.created_at) > SYNC_JOB_TIMEOUT:
+        job.status = 'failed'
+        job.message = 'Sync timed out (worker stopped?)'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return None
+    return job
+
+
+def start_sync_job(app, requested_by=None):
+    """Start a background sync unless one is already in flight.
+
+    Returns (job, started): started is False when an existing active job
+    was returned instead of creating a new one.
+    """
+    job = get_active_job()
+    if job:
+        return job, False
+
+    job = SyncJob(status='pending', requested_by=requested_by)
+    db.session.add(job)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker created a job since the check above - join it
+        db.session.rollback()
+        job = get_active_job()
+        if job is None:
+            raise
+        return job, False
+
+    thread = threading.Thread(target=run_sync_job, args=(app, job.id), daemon=True)
+    thread.start()
+    return job, True
+
+
+def run_sync_job(app, job_id):
+    """Run a sync job to completion (executed in the background thread)"""
+    with app.app_context():
+        _update_job(job_id, status='running', started_at=datetime.utcnow())
+
+        def progress(**counters):
+            _update_job(job_id, **counters)
+
+        try:
+            success, message = get_sheets_manager().sync_donations_from_sheets(progress=progress)
+        except Exception as e:
+            success, message = False, f"Error syncing donations: {e}"
+
+        try:
+            _update_job(
+                job_id,
+                status='completed' if success else 'failed',
+                message=message,
+                finished_at=datetime.utcnow()
+            )
+        except Exception as e:
+            print(f"❌ Error recording sync job {job_id} result: {e}")
+        finally:
+            db.session.remove()
+
+        print(f"{'✅' if success else '❌'} Sync job {job_id}: {message}")
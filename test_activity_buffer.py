@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the buffered last_active writes (activity_buffer.py).
+
+Usage: python -m pytest test_activity_buffer.py
+"""
+
+from datetime import datetime, timedelta
+import pytest
+import activity_buffer
+from activity_buffer import record_activity, flush_activity
+from models import db, User
+
+
+@pytest.fixture(autouse=True)
+def no_flusher_thread(monkeypatch):
+    """Touches stay buffered until the test flushes them itself"""
+    monkeypatch.setattr(activity_buffer, '_ensure_worker', lambda app: None)
+    activity_buffer._pending.clear()
+    yield
+    activity_buffer._pending.clear()
+
+
+def add_users(count):
+    users = [User(username=f'user{n}', email=f'user{n}@example.com', full_name=f'User {n}',
+                  purpose='Practice', password_hash='-') for n in range(count)]
+    db.session.add_all(users)
+    db.session.commit()
+    return [user.id for user in users]
+
+
+def last_active(user_id):
+    return db.session.query(User.last_active).filter(User.id == user_id).scalar()
+
+
+def test_flush_updates_every_buffered_user(app, monkeypatch):
+    monkeypatch.setattr(activity_buffer, 'ACTIVITY_BATCH_SIZE', 2)  # Several UPDATE batches
+    user_ids = add_users(4) + [1]
+    base = datetime(2024, 1, 1, 12, 0)
+    expected = {user_id: base + timedelta(minutes=n) for n, user_id in enumerate(user_ids)}
+    for user_id, when in expected.items():
+        record_activity(app, user_id, when)
+    # Only the newest touch per user is written
+    record_activity(app, user_ids[0], base - timedelta(hours=1))
+
+    assert flush_activity() == len(user_ids)
+    assert {user_id: last_active(user_id) for user_id in user_ids} == expected
+    assert flush_activity() == 0  # Nothing left buffered
+
+
+def test_flush_never_moves_last_active_backwards(app):
+    user_id, = add_users(1)
+    newer = datetime(2024, 1, 2)
+    db.session.get(User, user_id).last_active = newer
+    db.session.commit()
+
+    record_activity(app, user_id, datetime(2024, 1, 1))
+    assert flush_activity() == 0
+    assert last_active(user_id) == newer
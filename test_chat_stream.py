@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for chat history paging and the admins' unread counter (chat_stream.py).
+
+Usage: python -m pytest test_chat_stream.py
+"""
+
+import pytest
+from models import db, User, ChatMessage
+import chat_stream
+from chat_stream import get_conversation_page, get_unread_chat_count, notify_chat_message, notify_chat_read
+
+
+@pytest.fixture
+def user(app):
+    user = User(username='seeker', email='seeker@example.com', full_name='Seeker',
+                purpose='Practice', password_hash='-')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def add_messages(user, count):
+    """Alternate user and admin messages in the user's conversation; returns their ids"""
+    messages = [
+        ChatMessage(sender_id=1 if n % 2 else user.id, recipient_id=user.id if n % 2 else None,
+                    message=f'message {n}', is_from_admin=bool(n % 2), conversation_id=user.id)
+        for n in range(count)
+    ]
+    db.session.add_all(messages)
+    db.session.commit()
+    return [message.id for message in messages]
+
+
+def test_scrolling_back_covers_the_conversation_once(app, user):
+    other = db.session.get(User, 1)
+    add_messages(other, 2)  # Another conversation, with ids on both sides
+    ids = add_messages(user, 11)
+    add_messages(other, 2)
+
+    for limit in (1, 3, 4, 11, 50):
+        page = get_conversation_page(user.id, limit=limit)
+        seen = [m.id for m in page]
+        while len(page) == limit:
+            page = get_conversation_page(user.id, before_id=seen[0], limit=limit)
+            seen = [m.id for m in page] + seen
+        assert seen == ids
+
+
+def test_catching_up_covers_the_conversation_once(app, user):
+    ids = add_messages(user, 7)
+    for limit in (1, 2, 7, 50):
+        seen = []
+        page = get_conversation_page(user.id, after_id=0, limit=limit)
+        while page:
+            seen += [m.id for m in page]
+            page = get_conversation_page(user.id, after_id=seen[-1], limit=limit)
+        assert seen == ids
+
+
+def test_latest_page_is_the_newest_messages_oldest_first(app, user):
+    ids = add_messages(user, 5)
+    assert [m.id for m in get_conversation_page(user.id, limit=3)] == ids[-3:]
+    assert get_conversation_page(user.id, before_id=ids[0]) == []
+
+
+@pytest.fixture
+def unread_counter(app):
+    """The counter is per process, so start each test without one"""
+    chat_stream._unread_count = None
+    yield
+    chat_stream._unread_count = None
+
+
+def send(user, text='hello'):
+    message = ChatMessage(sender_id=user.id, message=text, conversation_id=user.id)
+    db.session.add(message)
+    db.session.commit()
+    notify_chat_message(message)
+    return message
+
+
+def test_unread_count_is_maintained_by_sends_and_reads(app, user, unread_counter):
+    assert get_unread_chat_count() == 0
+    last = send(user)
+    last = send(user)
+    assert chat_stream._unread_count[:2] == (2, last.id)  # Counted without a recount
+    assert get_unread_chat_count() == 2
+
+    read = ChatMessage.query.filter_by(is_from_admin=False, is_read=False).update({'is_read': True})
+    db.session.commit()
+    notify_chat_read(read)
+    assert chat_stream._unread_count[0] == 0
+    assert get_unread_chat_count() == 0
+
+
+def test_message_from_another_worker_forces_a_recount(app, user, unread_counter):
+    send(user)
+    assert get_unread_chat_count() == 1
+
+    # Committed elsewhere: this process is never notified
+    db.session.add(ChatMessage(sender_id=user.id, message='from another worker', conversation_id=user.id))
+    db.session.commit()
+    assert get_unread_chat_count() == 2
+
+    # A message after a gap in the counted ids is not added, but recounted
+    db.session.add(ChatMessage(sender_id=user.id, message='unseen', conversation_id=user.id))
+    db.session.commit()
+    send(user)
+    assert get_unread_chat_count() == 4
+
+
+def test_reads_through_another_worker_apply_after_ttl(app, user, unread_counter, monkeypatch):
+    send(user)
+    assert get_unread_chat_count() == 1
+    ChatMessage.query.update({'is_read': True})
+    db.session.commit()
+    assert get_unread_chat_count() == 1  # Not seen until the periodic recount
+
+    monkeypatch.setattr(chat_stream, 'UNREAD_CHAT_COUNT_TTL', 0)
+    assert get_unread_chat_count() == 0
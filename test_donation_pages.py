@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the keyset-paginated donation listings (donation_summary.py).
+
+Usage: python -m pytest test_donation_pages.py
+"""
+
+from datetime import date, datetime
+import pytest
+from models import db, OfflineDonation
+from donation_summary import encode_cursor, decode_cursor, get_worksheet_donations_page, get_worksheet_summaries
+
+
+def add_donations(dates, worksheet='Annadan'):
+    """Add one donation per date (ids increase in list order)"""
+    for n, donation_date in enumerate(dates):
+        db.session.add(OfflineDonation(
+            donor_name=f'Donor {n}', amount=100 + n, purpose_id=1, worksheet=worksheet,
+            donation_date=donation_date, payment_method='Cash', created_by=1
+        ))
+    db.session.commit()
+
+
+def all_pages(worksheet, limit):
+    pages = []
+    cursor = None
+    while True:
+        donations, cursor = get_worksheet_donations_page(worksheet, cursor=cursor, limit=limit)
+        pages.append([d.id for d in donations])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    donation = OfflineDonation(id=42, donation_date=date(2024, 3, 9))
+    assert encode_cursor(donation) == '2024-03-09_42'
+    assert decode_cursor('2024-03-09_42') == (date(2024, 3, 9), 42)
+
+
+@pytest.mark.parametrize('cursor', ['', 'garbage', '2024-03-09', '2024-13-01_5', '2024-03-09_x'])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_pages_cover_every_row_once_in_order(app):
+    # Several donations share a date, so page boundaries fall inside a date
+    dates = [date(2024, 1, day) for day in (5, 5, 5, 4, 4, 3, 5, 1, 4, 3, 3)]
+    add_donations(dates)
+
+    expected = [d.id for d in sorted(
+        OfflineDonation.query.all(), key=lambda d: (d.donation_date, d.id), reverse=True
+    )]
+    for limit in (1, 2, 3, 4, 11, 50):
+        pages = all_pages('Annadan', limit)
+        assert [donation_id for page in pages for donation_id in page] == expected
+        assert all(len(page) <= limit for page in pages)
+        assert pages[-1]  # no trailing empty page
+
+
+def test_exact_multiple_of_page_size_has_no_empty_last_page(app):
+    add_donations([date(2024, 1, 1)] * 4)
+    pages = all_pages('Annadan', 2)
+    assert [len(page) for page in pages] == [2, 2]
+
+
+def test_deleted_donations_are_not_listed_or_counted(app):
+    add_donations([date(2024, 1, 1)] * 3)
+    OfflineDonation.query.filter_by(id=2).update({'deleted_at': datetime.utcnow()})
+    db.session.commit()
+
+    assert all_pages('Annadan', 10) == [[3, 1]]
+    assert get_worksheet_summaries()['Annadan']['total_donations'] == 2
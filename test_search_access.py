@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests that site search never returns sections of pages the user can't open.
+
+Usage: python -m pytest test_search_access.py
+"""
+
+import os
+import time
+from flask import Flask
+from flask_login import AnonymousUserMixin
+import search_index
+from search_index import SEARCH_PAGES, build_search_index, search
+
+GATED_PAGES = {page for page, _, _, _, _, access in SEARCH_PAGES if access != 'public'}
+
+
+class StageUser:
+    """Signed-in user with access to a fixed set of stages"""
+    is_authenticated = True
+
+    def __init__(self, stages):
+        self.stages = set(stages)
+
+    def has_mandala_access(self, stage_number):
+        return stage_number in self.stages
+
+
+def create_test_app():
+    """App with the searchable pages' endpoints, for building URLs"""
+    app = Flask(__name__, root_path=os.path.dirname(os.path.abspath(__file__)))
+    for page, page_title, template, endpoint, values, access in SEARCH_PAGES:
+        rule = '/stage/<int:stage_num>' if values else f'/{endpoint}'
+        app.add_url_rule(rule, endpoint, lambda **kwargs: '')
+    return app
+
+
+def load_test_index():
+    """Build the index from the real templates and make it the loaded one"""
+    search_index._load(build_search_index(create_test_app()), None)
+    search_index._checked_at = time.monotonic()
+
+
+def test_anonymous_search_has_no_gated_sections():
+    load_test_index()
+    for query in ('kara nyasa', 'guru mantra', 'padati', 'sadhana', 'mandala'):
+        for result in search(query, 50, user=AnonymousUserMixin()):
+            assert result['page'] not in GATED_PAGES, (query, result['page'])
+    assert search('kara nyasa', 50, user=None) == []
+
+
+def test_stage_page_needs_stage_access():
+    load_test_index()
+    without_access = {r['page'] for r in search('kara nyasa', 50, user=StageUser([1, 2]))}
+    with_access = {r['page'] for r in search('kara nyasa', 50, user=StageUser([7]))}
+    assert 'stage_7' not in without_access
+    assert 'stage_7' in with_access
+
+
+def test_public_pages_are_searchable_anonymously():
+    load_test_index()
+    assert search('bhairava', 5, user=AnonymousUserMixin())
+
+
+def test_browser_index_has_public_pages_only():
+    browser_index = build_search_index(create_test_app(), public_only=True)
+    assert browser_index['docs']
+    assert not {doc[0] for doc in browser_index['docs']} & GATED_PAGES
+    assert all(doc[5] == 'public' for doc in browser_index['docs'])
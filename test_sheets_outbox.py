@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the Google Sheets write-behind outbox (sheets_outbox.py), run
+against the local file-backed spreadsheet (local_sheets.LocalSpreadsheet).
+
+Usage: python -m pytest test_sheets_outbox.py
+"""
+
+import csv
+import json
+import os
+from datetime import date, datetime, timedelta
+import pytest
+from models import db, OfflineDonation, SheetsOutbox
+from google_sheets import GoogleSheetsManager, WORKSHEET_HEADERS
+from sheets_outbox import (enqueue_donation_write, flush_outbox, pending_donation_ids,
+                           OUTBOX_BACKOFF_BASE, OUTBOX_MAX_ATTEMPTS)
+
+WORKSHEET = 'Annadan'
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return GoogleSheetsManager(backend='local', local_dir=str(tmp_path))
+
+
+class FailingManager:
+    """Connected sheet whose writes always fail"""
+
+    def is_connected(self):
+        return True
+
+    def upsert_donations(self, purpose_name, donations):
+        raise RuntimeError('quota exceeded')
+
+
+def add_donation(donor_name='Donor A', amount=100):
+    donation = OfflineDonation(
+        donor_name=donor_name, amount=amount, purpose_id=1, donation_date=date(2024, 1, 1),
+        payment_method='Cash', created_by=1
+    )
+    db.session.add(donation)
+    db.session.flush()
+    enqueue_donation_write(donation, WORKSHEET, 'admin')
+    db.session.commit()
+    return donation
+
+
+def sheet_rows(manager):
+    with open(os.path.join(manager.local_dir, f"{WORKSHEET}.csv"), newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))[1:]
+
+
+def test_add_then_verify_is_one_sheet_write(app, manager):
+    donation = add_donation()
+    donation.is_verified = True
+    enqueue_donation_write(donation, WORKSHEET, 'admin')
+    db.session.commit()
+    assert SheetsOutbox.query.count() == 1
+
+    stats = flush_outbox(manager=manager)
+    assert stats['appended'] == 1
+    rows = sheet_rows(manager)
+    assert len(rows) == 1
+    assert rows[0][11] == 'Verified'
+
+
+def test_claimed_entries_are_coalesced_per_donation(app, manager):
+    donation = add_donation()
+    # A second entry for the same donation, e.g. queued while the first was being written
+    newer = json.loads(SheetsOutbox.query.one().payload)
+    newer['amount'] = 250
+    db.session.add(SheetsOutbox(donation_id=donation.id, worksheet=WORKSHEET, payload=json.dumps(newer)))
+    db.session.commit()
+
+    stats = flush_outbox(manager=manager)
+    assert stats['written'] == 1
+    assert [row[4] for row in sheet_rows(manager)] == ['250']
+    assert {entry.status for entry in SheetsOutbox.query} == {'done'}
+    assert pending_donation_ids() == set()
+
+
+def test_written_row_is_updated_in_place(app, manager):
+    donation = add_donation()
+    flush_outbox(manager=manager)
+
+    donation.is_verified = True
+    enqueue_donation_write(donation, WORKSHEET, 'admin')
+    db.session.commit()
+    stats = flush_outbox(manager=manager)
+    assert (stats['updated'], stats['appended']) == (1, 0)
+    assert [row[11] for row in sheet_rows(manager)] == ['Verified']
+
+
+def test_failed_writes_back_off_then_fail(app):
+    donation = add_donation()
+
+    stats = flush_outbox(manager=FailingManager())
+    entry = SheetsOutbox.query.one()
+    assert stats['retried'] == 1
+    assert (entry.status, entry.attempts) == ('pending', 1)
+    delay = (entry.next_attempt_at - datetime.utcnow()).total_seconds()
+    assert OUTBOX_BACKOFF_BASE - 5 < delay <= OUTBOX_BACKOFF_BASE
+    assert donation.id in pending_donation_ids()
+
+    # Not due yet: nothing is claimed
+    assert flush_outbox(manager=FailingManager())['retried'] == 0
+
+    entry.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    flush_outbox(manager=FailingManager())
+    entry = SheetsOutbox.query.one()
+    assert entry.attempts == 2
+    delay = (entry.next_attempt_at - datetime.utcnow()).total_seconds()
+    assert 2 * OUTBOX_BACKOFF_BASE - 5 < delay <= 2 * OUTBOX_BACKOFF_BASE
+
+    entry.attempts = OUTBOX_MAX_ATTEMPTS - 1
+    entry.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    assert flush_outbox(manager=FailingManager())['failed'] == 1
+    assert SheetsOutbox.query.one().status == 'failed'
+    assert pending_donation_ids() == set()
+
+
+def test_verifying_a_synced_donation_updates_its_row(app, manager):
+    with open(os.path.join(manager.local_dir, f"{WORKSHEET}.csv"), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(WORKSHEET_HEADERS + ['Doner_ID'])
+        writer.writerow([7, 'Donor S', '', '', 500, 'INR', WORKSHEET, '2024-01-02', 'Cash', '', 'note', 'Pending', '', 'x', 7])
+    assert manager.sync_donations_from_sheets()[0]
+    donation = OfflineDonation.query.filter_by(donor_id='7').one()
+
+    donation.is_verified = True
+    enqueue_donation_write(donation, WORKSHEET, 'admin')
+    db.session.commit()
+    assert flush_outbox(manager=manager)['updated'] == 1
+    # Only the Status cell changed
+    assert sheet_rows(manager) == [['7', 'Donor S', '', '', '500', 'INR', WORKSHEET, '2024-01-02', 'Cash', '', 'note', 'Verified', '', 'x', '7']]
+
+    # The next sync keeps the same donation, now verified
+    assert manager.sync_donations_from_sheets()[0]
+    live = OfflineDonation.query.filter(OfflineDonation.deleted_at.is_(None)).all()
+    assert [(d.id, d.is_verified) for d in live] == [(donation.id, True)]
+    assert live[0].sheet_fingerprint is not None
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental Google Sheets sync, run against the local
+file-backed spreadsheet (local_sheets.LocalSpreadsheet).
+
+Usage: python -m pytest test_sheets_sync.py
+"""
+
+import csv
+import os
+import pytest
+from models import db, OfflineDonation, SheetsOutbox
+from google_sheets import GoogleSheetsManager, WORKSHEET_HEADERS
+from sheets_outbox import enqueue_donation_write, flush_outbox
+
+WORKSHEET = 'Annadan'
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return GoogleSheetsManager(backend='local', local_dir=str(tmp_path))
+
+
+def sheet_row(donor_id, donor_name, amount, status='Verified', date='2024-01-01'):
+    return [donor_id, donor_name, '', '', amount, 'INR', WORKSHEET, date, 'Cash', '', '', status, '', 'admin', donor_id]
+
+
+def write_sheet(manager, rows):
+    """Replace the worksheet with the given rows (header added)"""
+    with open(os.path.join(manager.local_dir, f"{WORKSHEET}.csv"), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(WORKSHEET_HEADERS + ['Doner_ID'])
+        writer.writerows(rows)
+
+
+def live_donations():
+    return OfflineDonation.query.filter(OfflineDonation.deleted_at.is_(None)).order_by(OfflineDonation.id).all()
+
+
+def sync(manager):
+    success, message = manager.sync_donations_from_sheets()
+    assert success, message
+    return message
+
+
+def test_first_sync_inserts_rows_and_resync_changes_nothing(app, manager):
+    write_sheet(manager, [sheet_row(1, 'Donor A', 100), sheet_row(2, 'Donor B', 200)])
+    assert '2 added' in sync(manager)
+    ids = [d.id for d in live_donations()]
+
+    assert '2 unchanged' in sync(manager)
+    assert [d.id for d in live_donations()] == ids
+
+
+def test_edited_row_replaces_its_donation(app, manager):
+    write_sheet(manager, [sheet_row(1, 'Donor A', 100), sheet_row(2, 'Donor B', 200)])
+    sync(manager)
+
+    write_sheet(manager, [sheet_row(1, 'Donor A', 150), sheet_row(2, 'Donor B', 200)])
+    message = sync(manager)
+    assert '1 added' in message and '1 removed' in message and '1 unchanged' in message
+    assert sorted(d.amount for d in live_donations()) == [150, 200]
+
+
+def test_deleted_row_is_soft_deleted_and_restored_when_readded(app, manager):
+    write_sheet(manager, [sheet_row(1, 'Donor A', 100), sheet_row(2, 'Donor B', 200)])
+    sync(manager)
+    donation_b = OfflineDonation.query.filter_by(donor_name='Donor B').one()
+
+    write_sheet(manager, [sheet_row(1, 'Donor A', 100)])
+    assert '1 removed' in sync(manager)
+    assert [d.donor_name for d in live_donations()] == ['Donor A']
+    assert db.session.get(OfflineDonation, donation_b.id).deleted_at is not None
+
+    write_sheet(manager, [sheet_row(1, 'Donor A', 100), sheet_row(2, 'Donor B', 200)])
+    assert '1 restored' in sync(manager)
+    assert db.session.get(OfflineDonation, donation_b.id).deleted_at is None
+    assert OfflineDonation.query.count() == 2
+
+
+def test_identical_rows_are_separate_donations(app, manager):
+    write_sheet(manager, [sheet_row(1, 'Donor A', 100)] * 3)
+    sync(manager)
+    assert len(live_donations()) == 3
+    assert len({d.sheet_fingerprint for d in live_donations()}) == 3
+
+    write_sheet(manager, [sheet_row(1, 'Donor A', 100)] * 2)
+    assert '1 removed' in sync(manager)
+    assert len(live_donations()) == 2
+
+
+def test_pending_outbox_donation_survives_sync(app, manager):
+    write_sheet(manager, [sheet_row(1, 'Donor A', 100)])
+    sync(manager)
+
+    # Added in the app, its sheet write still waiting in the outbox
+    donation = OfflineDonation(
+        donor_name='Donor C', amount=300, purpose_id=live_donations()[0].purpose_id,
+        donation_date=live_donations()[0].donation_date, payment_method='Cash', created_by=1
+    )
+    db.session.add(donation)
+    db.session.flush()
+    enqueue_donation_write(donation, WORKSHEET, 'admin')
+    db.session.commit()
+
+    sync(manager)
+    assert db.session.get(OfflineDonation, donation.id).deleted_at is None
+
+    # Once the write is no longer pending, a row missing from the sheet is removed
+    SheetsOutbox.query.update({'status': 'done'})
+    db.session.commit()
+    sync(manager)
+    assert db.session.get(OfflineDonation, donation.id).deleted_at is not None
+
+
+def test_empty_sheet_keeps_existing_data(app, manager):
+    write_sheet(manager, [sheet_row(1, 'Donor A', 100)])
+    sync(manager)
+
+    write_sheet(manager, [])
+    success, message = manager.sync_donations_from_sheets()
+    assert not success
+    assert len(live_donations()) == 1
+
+
+def test_flushed_donation_keeps_its_id_after_sync(app, manager):
+    write_sheet(manager, [sheet_row(1, 'Donor A', 100)])
+    sync(manager)
+
+    donation = OfflineDonation(
+        donor_name='Donor C', amount=300, purpose_id=live_donations()[0].purpose_id,
+        donation_date=live_donations()[0].donation_date, payment_method='Cash',
+        notes='cash at the gate', created_by=1
+    )
+    db.session.add(donation)
+    db.session.flush()
+    enqueue_donation_write(donation, WORKSHEET, 'admin')
+    db.session.commit()
+    assert flush_outbox(manager=manager)['appended'] == 1
+
+    message = sync(manager)
+    assert '0 added' in message and '0 removed' in message and '1 updated' in message
+    assert [d.id for d in live_donations()][-1] == donation.id
+    assert db.session.get(OfflineDonation, donation.id).notes == 'cash at the gate'
+
+    # Verifying it later updates the same row, and the next sync keeps it
+    donation = db.session.get(OfflineDonation, donation.id)
+    donation.is_verified = True
+    assert enqueue_donation_write(donation, WORKSHEET, 'admin') is not None
+    db.session.commit()
+    assert flush_outbox(manager=manager)['updated'] == 1
+    assert '0 added' in sync(manager)
+    assert db.session.get(OfflineDonation, donation.id).is_verified
+    assert len(live_donations()) == 2
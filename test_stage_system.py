@@ -8,7 +8,7 @@ Usage: python test_stage_system.py
 
 import sys
 from datetime import datetime
-from models import User, db
+from models import User, UserStageProgress, STAGES, STAGE_BITS, db
 
 def create_test_user():
     """Create a test user with sample stage data"""
@@ -87,6 +87,73 @@ def test_stage_completion():
 
     print("🎉 Stage completion working correctly!")
 
+def save_user(username):
+    """Save a user with no stage progress rows (registry defaults apply)"""
+    user = User(username=username, email=f'{username}@example.com', full_name=username,
+                purpose='Testing spiritual progress system', password_hash='-')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def assert_access_matches_rows(user):
+    """Stage access and stage_access_mask agree with the progress rows (and defaults where there is no row)"""
+    rows = {progress.stage_id: progress.has_access for progress in
+            UserStageProgress.query.filter_by(user_id=user.id)}
+    for stage in STAGES:
+        expected = rows.get(stage.stage_id, stage.default_access)
+        assert bool(user.stage_access_mask & STAGE_BITS[stage.stage_id]) == expected, stage.key
+        assert user.has_mandala_access(stage.stage_id) == expected, stage.key
+
+def test_set_stage_access_updates_progress_rows(app):
+    """Granting and revoking is stored in the stage's progress row"""
+    user = save_user('access_user')
+    assert_access_matches_rows(user)
+
+    user.set_stage_access(2, True)
+    user.mandala_3_access = True  # Legacy property goes through set_stage_access
+    user.set_stage_access(1, False)  # Revoking a default-open stage stores a row
+    db.session.commit()
+    db.session.expire_all()
+    user = db.session.get(User, user.id)
+    assert_access_matches_rows(user)
+    assert user.has_mandala_access(2) and user.has_mandala_access(3)
+    assert not user.has_mandala_access(1)
+
+    user.set_stage_access(2, False)
+    db.session.commit()
+    db.session.expire_all()
+    user = db.session.get(User, user.id)
+    assert_access_matches_rows(user)
+    assert not user.get_stage_info(2)['has_access']
+
+def test_users_with_access(app):
+    """users_with_access covers default-open stages for users without a row"""
+    no_rows = save_user('no_rows')
+    revoked = save_user('revoked')
+    granted = save_user('granted')
+    revoked.set_stage_access(1, False)
+    granted.set_stage_access(2, True)
+    db.session.commit()
+
+    # The fixture's admin has no progress rows either
+    assert {u.username for u in UserStageProgress.users_with_access(1)} == {'admin', 'no_rows', 'granted'}
+    assert {u.username for u in UserStageProgress.users_with_access(2)} == {'granted'}
+    assert UserStageProgress.users_with_access(3).count() == 0
+    assert no_rows.stage_progress == []
+
+def test_stage_filter(app):
+    """The admin users stage_filter bit test matches has_mandala_access"""
+    save_user('no_rows')
+    save_user('revoked').set_stage_access(1, False)
+    save_user('granted').set_stage_access(7, True)
+    db.session.commit()
+
+    for stage in STAGES:
+        filtered = {u.username for u in User.query.filter(User.stage_access_filter(stage.stage_id))}
+        expected = {u.username for u in User.query.all() if u.has_mandala_access(stage.stage_id)}
+        assert filtered == expected, stage.key
+    assert {u.username for u in User.query.filter(User.stage_access_filter(7))} == {'granted'}
+
 if __name__ == "__main__":
     print("🕉️ Daiva Anughara - Stage System Test")
     print("=" * 50)
@@ -95,6 +162,7 @@ if __name__ == "__main__":
         test_stage_methods()
         print()
         test_stage_completion()
+        print()
 
         print("\n✅ All tests passed! The spiritual progress tracking system is working correctly.")
         print("\n📋 Test Results:")
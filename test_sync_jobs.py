@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for single-flight background sync jobs (sync_jobs.py).
+
+Usage: python -m pytest test_sync_jobs.py
+"""
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+import sync_jobs
+from sync_jobs import start_sync_job
+from models import db, SyncJob
+
+
+@pytest.fixture(autouse=True)
+def no_sync_thread(monkeypatch):
+    """Started jobs stay pending instead of syncing in a thread"""
+    monkeypatch.setattr(sync_jobs, 'run_sync_job', lambda app, job_id: None)
+
+
+def test_second_start_joins_the_active_job(app):
+    job, started = start_sync_job(app, requested_by=1)
+    assert started and job.status == 'pending'
+
+    again, started = start_sync_job(app, requested_by=1)
+    assert (again.id, started) == (job.id, False)
+    assert SyncJob.query.count() == 1
+
+
+def test_database_rejects_a_second_active_job(app):
+    db.session.add(SyncJob(status='running'))
+    db.session.commit()
+    db.session.add(SyncJob(status='pending'))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+    # Finished jobs don't count
+    db.session.add_all([SyncJob(status='completed'), SyncJob(status='failed')])
+    db.session.commit()
+    assert SyncJob.query.count() == 3
+
+
+def test_concurrent_start_returns_the_job_that_won(app, monkeypatch):
+    winner = SyncJob(status='pending')
+    db.session.add(winner)
+    db.session.commit()
+
+    # This worker checked before the other one's job was committed
+    real_get_active_job = sync_jobs.get_active_job
+    calls = []
+
+    def get_active_job():
+        calls.append(1)
+        return None if len(calls) == 1 else real_get_active_job()
+    monkeypatch.setattr(sync_jobs, 'get_active_job', get_active_job)
+
+    job, started = start_sync_job(app)
+    assert (job.id, started) == (winner.id, False)
+    assert len(calls) == 2
+    assert SyncJob.query.count() == 1
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-process identity cache (user_cache.py).
+
+Usage: python -m pytest test_user_cache.py
+"""
+
+import pytest
+from sqlalchemy import text
+from models import db, User
+import user_cache
+from user_cache import load_principal, invalidate_user
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(app):
+    """Cached identities are per process, so clear them around each test"""
+    invalidate_user()
+    yield
+    invalidate_user()
+
+
+def test_committed_change_is_seen_on_next_load(app):
+    assert load_principal(1).role == 'admin'
+    user = db.session.get(User, 1)
+    user.role = 'user'
+    db.session.commit()
+    assert load_principal(1).role == 'user'
+
+
+def test_cached_identity_skips_the_database(app):
+    principal = load_principal(1)
+    # Changed behind the session's back, as another worker would
+    db.session.execute(text('UPDATE "user" SET is_active = 0 WHERE id = 1'))
+    db.session.commit()
+    assert load_principal(1).is_active == principal.is_active
+
+
+def test_other_workers_changes_apply_after_ttl(app, monkeypatch):
+    assert load_principal(1).is_active
+    db.session.execute(text('UPDATE "user" SET is_active = 0 WHERE id = 1'))
+    db.session.commit()
+
+    monkeypatch.setattr(user_cache, 'USER_CACHE_TTL', 0)
+    assert not load_principal(1).is_active
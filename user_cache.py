@@ -0,0 +1,176 @@
+"""
+Short-TTL identity cache for Flask-Login's user loader.
+
+load_user used to SELECT the full, very wide User row on every
+authenticated request. Instead, the columns needed for authentication and
+stage gating are cached per user in a small in-process LRU and wrapped in a
+lightweight UserPrincipal. Anything else (profile fields, stage dates,
+get_stage_info, ...) transparently loads the full User row, at most once per
+request.
+
+Every committed change to a User or its stage progress bumps that user's
+cache version (via a session hook), so edits made by the admin routes in
+auth.py, profile updates, approvals and deletions are seen by the next
+request in this process without any per-request query. Other worker
+processes re-read the user within USER_CACHE_TTL, which is kept short for
+that reason: a deactivation, revoked approval or role change made through
+another worker applies there after at most that many seconds.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, User, UserStageProgress, STAGES
+
+# Seconds a cached identity is trusted without re-reading the database
+# (how long other workers may act on a user's old role or status)
+USER_CACHE_TTL = 10
+
+# Maximum number of users kept in the cache
+USER_CACHE_SIZE = 1024
+
+# User columns cached for auth and stage gating
+PRINCIPAL_FIELDS = [
+    'id', 'username', 'email', 'full_name', 'role', 'is_approved', 'is_active',
+    'profile_picture', 'stage_access_mask'
+]
+
+_cache = OrderedDict()  # user id -> (version, loaded_at, fields)
+_versions = {}          # user id -> version, bumped on every committed change
+_lock = threading.Lock()
+
+
+class UserPrincipal:
+    """Cached view of a User for the current request
+
+    Reads of cached fields never touch the database. Other attributes and
+    all writes go to the full User row, loaded on first use.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    # Shared with the model (these only read cached fields / stage_access_mask)
+    is_admin = User.is_admin
+    can_login = User.can_login
+    get_stage_access_mask = User.get_stage_access_mask
+    has_mandala_access = User.has_mandala_access
+    get_current_stage = User.get_current_stage
+    get_next_required_stage = User.get_next_required_stage
+
+    def __init__(self, fields):
+        self.__dict__['_fields'] = dict(fields)
+        self.__dict__['_user'] = None
+
+    def get_id(self):
+        return str(self._fields['id'])
+
+    def get_user(self):
+        """The full User row (loaded once per request)"""
+        if self._user is None:
+            self.__dict__['_user'] = db.session.get(User, self._fields['id'])
+        return self._user
+
+    def __getattr__(self, name):
+        fields = self.__dict__['_fields']
+        if name in fields:
+            return fields[name]
+        if name.startswith('__') or not hasattr(User, name):
+            # Unknown attributes (e.g. template probes) don't need the row
+            raise AttributeError(name)
+        return getattr(self.get_user(), name)
+
+    def __setattr__(self, name, value):
+        # Writes must reach the session so they are committed
+        setattr(self.get_user(), name, value)
+        self._fields.pop(name, None)
+        if name.endswith('_access'):
+            # Stage flags live in the mask
+            self._fields.pop('stage_access_mask', None)
+
+    def __eq__(self, other):
+        if isinstance(other, (UserPrincipal, User)):
+            return self.get_id() == other.get_id()
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash(self.get_id())
+
+    def __repr__(self):
+        return f"<UserPrincipal {self._fields['id']} {self._fields['username']}>"
+
+
+def _stage_access_property(stage_id):
+    return property(lambda self: self.has_mandala_access(stage_id))
+
+
+# Read-only {key}_access flags answered from the cached mask
+for _stage in STAGES:
+    setattr(UserPrincipal, f'{_stage.key}_access', _stage_access_property(_stage.stage_id))
+
+
+def load_principal(user_id):
+    """Return a UserPrincipal for user_id, or None if the user does not exist"""
+    now = time.monotonic()
+    with _lock:
+        version = _versions.get(user_id, 0)
+        cached = _cache.get(user_id)
+        if cached and cached[0] == version and now - cached[1] < USER_CACHE_TTL:
+            _cache.move_to_end(user_id)
+            return UserPrincipal(cached[2])
+
+    # Version is read before the SELECT, so a change committed meanwhile
+    # leaves this entry outdated instead of caching stale data as current
+    row = db.session.query(
+        *[getattr(User, field) for field in PRINCIPAL_FIELDS]
+    ).filter(User.id == user_id).first()
+    if row is None:
+        invalidate_user(user_id)
+        return None
+
+    fields = dict(zip(PRINCIPAL_FIELDS, row))
+    with _lock:
+        _cache[user_id] = (version, now, fields)
+        _cache.move_to_end(user_id)
+        while len(_cache) > USER_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return UserPrincipal(fields)
+
+
+def invalidate_user(user_id=None):
+    """Drop cached identities (all of them when user_id is None)"""
+    with _lock:
+        if user_id is None:
+            for cached_id in _cache:
+                _versions[cached_id] = _versions.get(cached_id, 0) + 1
+            _cache.clear()
+        else:
+            _versions[user_id] = _versions.get(user_id, 0) + 1
+            _cache.pop(user_id, None)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault('changed_user_ids', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            changed.add(obj.id)
+        elif isinstance(obj, UserStageProgress) and obj.user_id is not None:
+            changed.add(obj.user_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop('changed_user_ids', ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop('changed_user_ids', None)